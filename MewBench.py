@@ -0,0 +1,309 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import zipfile
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+from datetime import datetime
+from PIL import Image
+import MewUpdater as mu
+BENCH_VERSION = 1
+MODES = ("zip-stream", "zip-extract", "folder")
+STARTUP_PROBES = {
+    "python": "pass",
+    "import_core": "import MewUpdater",
+    "headless_ready": "import MewUpdater as mu; mu.load_slicer_mappings_cached(mu.SLICER_TXT)",
+    "gui_window": "import tkinter as tk, MewUpdaterGUI as gui; root = tk.Tk(); app = gui.MewApp(master=root); root.update(); "
+                  "app._loaded_mappings(); root.destroy()",
+}
+STARTUP_GUI_MODULES = ("tkinter", "customtkinter", "PIL.ImageTk", "PIL.ImageFont")
+def _noise_image(size, rng):
+    """RGBA noise that compresses roughly like real pack art (not flat, not pure random)."""
+    w, h = size
+    bands = [Image.effect_noise((w, h), rng.randint(20, 90)) for _ in range(3)]
+    alpha = Image.new("L", (w, h), 255)
+    return Image.merge("RGBA", bands + [alpha])
+def _save_png(root, rel, img):
+    full = os.path.join(root, rel.replace("/", os.sep))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    img.save(full, "PNG")
+def _write_text(root, rel, text):
+    full = os.path.join(root, rel.replace("/", os.sep))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w", encoding="utf-8") as f:
+        f.write(text)
+def generate_synthetic_pack(dest, mappings, armor=20, trims=10, resolution=16, models=2000, match_ratio=0.2, seed=1):
+    """
+    Write a synthetic old-format pack folder at dest:
+      armor materials (layer_1/layer_2 plus the leather overlays), trims (+ _leggings),
+      every slicer.txt input at the given resolution (16 = vanilla size), and model JSONs of
+      which match_ratio reference old armor layers. Returns a dict describing what was generated.
+    """
+    rng = random.Random(seed)
+    scale = max(1, resolution // 16)
+    if os.path.exists(dest):
+        shutil.rmtree(dest)
+    _write_text(dest, "pack.mcmeta", json.dumps({"pack": {"pack_format": 15, "description": "synthetic"}}, indent=4))
+    troot = "assets/minecraft/textures/"
+    armor_size = (64 * scale, 32 * scale)
+    for i in range(armor):
+        for layer in (1, 2):
+            _save_png(dest, f"{troot}models/armor/mat{i}_layer_{layer}.png", _noise_image(armor_size, rng))
+    for layer in (1, 2):
+        _save_png(dest, f"{troot}models/armor/leather_layer_{layer}_overlay.png", _noise_image(armor_size, rng))
+    for i in range(trims):
+        _save_png(dest, f"{troot}trims/models/armor/trim{i}.png", _noise_image(armor_size, rng))
+        _save_png(dest, f"{troot}trims/models/armor/trim{i}_leggings.png", _noise_image(armor_size, rng))
+    for in_path, out_list in mappings.items():
+        ref_w = max(box[4] for _, box, _ in out_list)
+        ref_h = max(box[5] for _, box, _ in out_list)
+        _save_png(dest, in_path, _noise_image((ref_w * scale, ref_h * scale), rng))
+    matched = 0
+    for i in range(models):
+        if rng.random() < match_ratio:
+            tex = f"minecraft:models/armor/mat{rng.randrange(max(1, armor))}_layer_{rng.choice((1, 2))}"
+            matched += 1
+        else:
+            tex = f"minecraft:item/synthetic_{i}"
+        body = {"parent": "minecraft:item/generated", "textures": {"layer0": tex}}
+        _write_text(dest, f"assets/minecraft/models/item/synthetic_{i}.json", json.dumps(body, indent=2))
+    return {"armor": armor, "trims": trims, "resolution": resolution, "models": models,
+            "models_matching": matched, "slicer_inputs": len(mappings), "seed": seed}
+def zip_folder(src_dir, out_zip):
+    with zipfile.ZipFile(out_zip, "w", zipfile.ZIP_DEFLATED) as z:
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for f in sorted(files):
+                full = os.path.join(root, f)
+                z.write(full, os.path.relpath(full, src_dir).replace(os.sep, "/"))
+def folder_stats(path):
+    files = 0
+    size = 0
+    for root, dirs, names in os.walk(path):
+        for n in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, n))
+    return {"files": files, "bytes": size}
+def time_stages(mode, folder, zip_path, mappings, workdir, slice_workers=None, json_workers=None):
+    """Run one conversion of the synthetic pack in the given mode, timing every stage separately."""
+    stages = {}
+    log = []
+    noop = lambda: None
+    def timed(name, fn, *args, **kwargs):
+        t = time.perf_counter()
+        result = fn(*args, **kwargs)
+        stages[name] = time.perf_counter() - t
+        return result
+    out_zip = os.path.join(workdir, f"out-{mode}.zip")
+    tmp = tempfile.mkdtemp(prefix="mewbench_", dir=workdir)
+    pack = None
+    try:
+        if mode == "zip-stream":
+            pack = timed("open_index", mu.ZipStreamPack, zip_path)
+        elif mode == "zip-extract":
+            timed("extract", mu.extract_zip_to_dir, zip_path, tmp)
+            pack = mu.DirPack(tmp)
+            timed("open_index", lambda: len(pack.index))
+        else:
+            work = os.path.join(tmp, "work")
+            timed("copytree", shutil.copytree, folder, work)
+            pack = mu.DirPack(work)
+            timed("open_index", lambda: len(pack.index))
+        timed("skeleton", mu.ensure_skeleton, pack)
+        timed("armor", mu.transform_armor_textures, pack, log, noop)
+        timed("trims", mu.transform_trims, pack, log, noop)
+        timed("slicer", mu.apply_slicer_mappings, pack, mappings, log, noop, workers=slice_workers)
+        timed("model_json", mu.update_model_json_paths, pack, log, noop, workers=json_workers)
+        timed("mcmeta", mu.update_pack_mcmeta, pack, log, noop)
+        timed("validate", mu.validate_pack, pack, mappings)
+        if mode == "zip-stream":
+            timed("zip", pack.save, out_zip)
+        else:
+            timed("zip", mu.create_zip_from_dir, pack.root, out_zip)
+        stages["total"] = sum(stages.values())
+        stages["output_bytes"] = os.path.getsize(out_zip)
+    finally:
+        if mode == "zip-stream" and pack is not None:
+            pack.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+        if os.path.exists(out_zip):
+            os.remove(out_zip)
+    return stages
+def time_startup(code, cwd):
+    """Wall time of a fresh interpreter running code, interpreter start included; None when it fails (e.g. no display)."""
+    t = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t
+    if proc.returncode != 0:
+        return None, (proc.stderr.strip().splitlines() or ["exit status %d" % proc.returncode])[-1]
+    return elapsed, None
+def run_startup_benchmark(args):
+    """Time the headless and GUI start paths in fresh processes; probes that cannot run here are left out."""
+    cwd = os.path.dirname(os.path.abspath(mu.__file__))
+    runs, skipped = [], {}
+    for _ in range(max(1, args.repeat)):
+        run = {}
+        for name, code in STARTUP_PROBES.items():
+            if name == "gui_window" and args.no_gui or name in skipped:
+                continue
+            elapsed, error = time_startup(code, cwd)
+            if elapsed is None:
+                skipped[name] = error
+            else:
+                run[name] = elapsed
+        runs.append(run)
+    runs = [{k: v for k, v in run.items() if k not in skipped} for run in runs]
+    probe = subprocess.run([sys.executable, "-c", f"import sys, MewUpdater; print(','.join(m for m in {STARTUP_GUI_MODULES!r} if m in sys.modules))"],
+                           cwd=cwd, capture_output=True, text=True)
+    return {
+        "version": BENCH_VERSION, "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "repeat": max(1, args.repeat), "core_gui_modules": [m for m in probe.stdout.strip().split(",") if m],
+        "skipped": skipped, "results": {"startup": summarize(runs)},
+    }
+def summarize(runs):
+    keys = runs[0].keys()
+    out = {}
+    for k in keys:
+        values = [r[k] for r in runs]
+        if k == "output_bytes":
+            out[k] = values[-1]
+        else:
+            out[k] = {"min": min(values), "median": statistics.median(values), "max": max(values)}
+    return out
+def run_benchmark(args):
+    mappings = mu.load_slicer_mappings(args.slicer)
+    parse_runs = []
+    for _ in range(max(1, args.repeat)):
+        t = time.perf_counter()
+        mu.load_slicer_mappings(args.slicer)
+        parse_runs.append(time.perf_counter() - t)
+    workdir = tempfile.mkdtemp(prefix="mewbench_")
+    try:
+        if args.pack:
+            if os.path.isdir(args.pack):
+                folder = args.pack
+                zip_path = os.path.join(workdir, "pack.zip")
+                zip_folder(folder, zip_path)
+            else:
+                zip_path = args.pack
+                folder = os.path.join(workdir, "pack")
+                mu.extract_zip_to_dir(zip_path, folder)
+            generated = {"source": os.path.abspath(args.pack)}
+        else:
+            folder = os.path.join(workdir, "pack")
+            zip_path = os.path.join(workdir, "pack.zip")
+            generated = generate_synthetic_pack(folder, mappings, args.armor, args.trims, args.resolution,
+                                                args.models, args.match_ratio, args.seed)
+            zip_folder(folder, zip_path)
+        results = {}
+        for mode in args.modes:
+            runs = [time_stages(mode, folder, zip_path, mappings, workdir, args.slice_workers, args.json_workers)
+                    for _ in range(max(1, args.repeat))]
+            results[mode] = summarize(runs)
+        stats = folder_stats(folder)
+        stats["zip_bytes"] = os.path.getsize(zip_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "version": BENCH_VERSION, "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "repeat": max(1, args.repeat), "pack": generated, "pack_stats": stats,
+        "slicer_parse": {"min": min(parse_runs), "median": statistics.median(parse_runs), "max": max(parse_runs)},
+        "results": results,
+    }
+def compare_results(old, new, threshold, min_delta=0.005):
+    """Return a list of (mode, stage, old_median, new_median) where new is slower by more than threshold."""
+    regressions = []
+    pairs = [("-", "slicer_parse", old.get("slicer_parse"), new.get("slicer_parse"))]
+    for mode, stages in new.get("results", {}).items():
+        for stage, value in stages.items():
+            if isinstance(value, dict):
+                pairs.append((mode, stage, old.get("results", {}).get(mode, {}).get(stage), value))
+    for mode, stage, before, after in pairs:
+        if not before or not after:
+            continue
+        a, b = before["median"], after["median"]
+        if b > a * (1 + threshold) and b - a > min_delta:
+            regressions.append((mode, stage, a, b))
+    return regressions
+def print_table(result, out=sys.stderr):
+    for mode, stages in result["results"].items():
+        print(f"[{mode}]", file=out)
+        for stage, value in stages.items():
+            if isinstance(value, dict):
+                print(f"  {stage:<12} {value['median'] * 1000:10.1f} ms  (min {value['min'] * 1000:.1f})", file=out)
+    if "slicer_parse" in result:
+        print(f"slicer_parse   {result['slicer_parse']['median'] * 1000:10.1f} ms", file=out)
+    for name, error in result.get("skipped", {}).items():
+        print(f"  {name:<12} skipped: {error}", file=out)
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="MewBench", description="Synthetic pack generator and per-stage benchmark for MewUpdater.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    def add_pack_args(p):
+        p.add_argument("--armor", type=int, default=20, help="armor materials (layer_1 + layer_2 each)")
+        p.add_argument("--trims", type=int, default=10, help="trim patterns (plus _leggings variants)")
+        p.add_argument("--resolution", type=int, default=16, choices=(16, 32, 64, 128, 256, 512), help="pack resolution (16 = vanilla)")
+        p.add_argument("--models", type=int, default=2000, help="model JSON files")
+        p.add_argument("--match-ratio", type=float, default=0.2, help="fraction of model JSONs that reference old armor layers")
+        p.add_argument("--seed", type=int, default=1)
+        p.add_argument("--slicer", default=mu.SLICER_TXT, help="path to slicer.txt")
+    g = sub.add_parser("generate", help="write a synthetic pack as a folder and a .zip")
+    g.add_argument("dest", help="output folder (the .zip is written next to it)")
+    add_pack_args(g)
+    r = sub.add_parser("run", help="time every conversion stage and print JSON results")
+    add_pack_args(r)
+    r.add_argument("--pack", help="benchmark an existing pack (.zip or folder) instead of a synthetic one")
+    r.add_argument("--modes", default=",".join(MODES), help=f"comma separated subset of {','.join(MODES)}")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--slice-workers", type=int, default=None)
+    r.add_argument("--json-workers", type=int, default=None)
+    r.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    r.add_argument("--compare", help="previous results JSON; exit 1 if any stage regressed")
+    r.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a stage counts as regressed")
+    st = sub.add_parser("startup", help="time interpreter start, core import, headless ready and GUI first frame in fresh processes")
+    st.add_argument("--repeat", type=int, default=5)
+    st.add_argument("--no-gui", action="store_true", help="skip the GUI probe")
+    st.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    st.add_argument("--compare", help="previous startup results JSON; exit 1 if any probe regressed")
+    st.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a probe counts as regressed")
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        mappings = mu.load_slicer_mappings(args.slicer)
+        info = generate_synthetic_pack(args.dest, mappings, args.armor, args.trims, args.resolution,
+                                       args.models, args.match_ratio, args.seed)
+        zip_folder(args.dest, args.dest.rstrip("/\\") + ".zip")
+        print(json.dumps(info, indent=2))
+        return 0
+    if args.command == "startup":
+        result = run_startup_benchmark(args)
+    else:
+        args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+        unknown = [m for m in args.modes if m not in MODES]
+        if unknown:
+            parser.error(f"unknown mode(s): {', '.join(unknown)}")
+        result = run_benchmark(args)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    print_table(result)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(previous, result, args.threshold)
+        for mode, stage, a, b in regressions:
+            print(f"REGRESSION {mode}/{stage}: {a * 1000:.1f} ms -> {b * 1000:.1f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import os
+import json
+import hmac
+import time
+import secrets
+import zipfile
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from MewUpdater import (DAEMON_HOST, DAEMON_JOB_LIMIT, DAEMON_PORT, SUFFIX, ZIP_DEFLATE_LEVEL, JobQueue,
+                        SpriteCache, json_process_pool, now_str)
+DAEMON_KEEP_JOBS = 500
+DAEMON_PUMP_MS = 50
+DAEMON_STATS_WINDOW = 300
+DAEMON_CLOSE_TIMEOUT = 30
+DAEMON_JOB_OPTIONS = {"replace_originals": bool, "stream": bool, "incremental": bool, "reproducible": bool, "validate": bool,
+                      "write_report": bool, "prune_sprites": bool, "vanilla_assets": str, "zip_level": int, "slice_workers": int,
+                      "zip_workers": int}
+DAEMON_TOTALS = ("bytes_read", "bytes_written", "images_decoded", "sprite_cache_hits", "outputs_reused")
+DAEMON_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+def previous_output_zip(path):
+    """True when path is a zip written by MewUpdater (a -mewupdated name and a mew_updater block in its pack.mcmeta)."""
+    if SUFFIX not in os.path.basename(path) or not path.lower().endswith(".zip"):
+        return False
+    try:
+        with zipfile.ZipFile(path) as z:
+            return "mew_updater" in json.loads(z.read("pack.mcmeta").decode("utf-8"))
+    except Exception:
+        return False
+def daemon_job_view(job):
+    """JSON-safe status of a daemon job; the summary (without its log) once it has finished."""
+    view = {"id": job.id, "input": job.path, "output": job.out_zip, "status": job.status,
+            "options": {k: v for k, v in job.options.items() if k in DAEMON_JOB_OPTIONS}}
+    if job.summary is not None:
+        report = job.summary.get("report") or {}
+        view["summary"] = {"ok": job.summary.get("ok"), "error": job.summary.get("error"), "cancelled": job.summary.get("cancelled"),
+                           "counts": job.summary.get("counts"), "seconds": job.summary.get("seconds"),
+                           "counters": report.get("counters"), "report_path": job.summary.get("report_path")}
+    return view
+class ConversionDaemon:
+    """
+    Long-lived local conversion service. The slicer mapping, the sprite cache and a process pool for large JSON
+    rewrites are loaded once and shared by every job; conversions run on a JobQueue. serve_forever() answers a
+    small JSON API over HTTP (bound to localhost by default):
+      POST /jobs {"input", "output"?, "options"?}    queue a pack, 201 with the job
+      GET  /jobs, GET /jobs/<id>                     job status, plus the summary once finished
+      GET  /jobs/<id>/events?since=N                 NDJSON stream of status/log/progress events, ends with "done"
+      POST /jobs/<id>/cancel (or DELETE /jobs/<id>)  cancel a job
+      POST /pause, POST /resume                      hold or release the whole queue
+      GET  /stats, GET /health                       queue depth, totals and throughput
+    Every request needs "Authorization: Bearer <token>"; without a token one is generated (self.token). Requests
+    carrying an Origin header or a Host other than loopback or the bound address get 403, so web pages cannot reach
+    it; POST /jobs must be application/json. Paths are on the daemon's machine, and an existing output is only
+    replaced when it is an earlier MewUpdater output.
+    """
+    def __init__(self, host=DAEMON_HOST, port=DAEMON_PORT, limit=DAEMON_JOB_LIMIT, mappings=None, sprite_cache=True,
+                 json_workers=None, token=None, log=None):
+        self.queue = JobQueue(limit, mappings or None)
+        self.sprite_cache = SpriteCache() if sprite_cache is True else sprite_cache or None
+        self.json_pool = json_process_pool(json_workers or os.cpu_count() or 1)
+        self.token = token or secrets.token_urlsafe(24)
+        self.log = log or (lambda msg: None)
+        self.started = time.time()
+        self.events = {}
+        self._running = set()
+        self._recent = deque()
+        self._totals = {"completed": 0, "failed": 0, "cancelled": 0, "seconds": 0.0, **{k: 0 for k in DAEMON_TOTALS}}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self.server = ThreadingHTTPServer((host, port), type("Handler", (_DaemonHandler,), {"service": self}))
+        self.server.daemon_threads = True
+        self.address = self.server.server_address[:2]
+        self.hosts = {h.lower() for h in (*DAEMON_LOOPBACK_HOSTS, host, self.address[0])}
+    def job(self, job_id):
+        for job in self.queue.jobs:
+            if str(job.id) == job_id:
+                return job
+        return None
+    def submit(self, body):
+        """Check a POST /jobs body and queue it; raises ValueError with a message for the client."""
+        if not isinstance(body, dict) or not isinstance(body.get("input"), str):
+            raise ValueError('"input" (a pack .zip or folder path) is required')
+        path = os.path.abspath(body["input"])
+        if not os.path.exists(path):
+            raise ValueError(f"{path} does not exist")
+        out = body.get("output")
+        if out is not None:
+            if not isinstance(out, str):
+                raise ValueError('"output" must be a path')
+            out = os.path.abspath(out)
+            if not os.path.isdir(os.path.dirname(out)):
+                raise ValueError(f"{os.path.dirname(out)} is not a folder")
+            if os.path.exists(out) and not previous_output_zip(out):
+                raise ValueError(f"{out} exists and is not a previous {SUFFIX} zip; refusing to replace it")
+        options = body.get("options") or {}
+        if not isinstance(options, dict):
+            raise ValueError('"options" must be an object')
+        for key, value in options.items():
+            kind = DAEMON_JOB_OPTIONS.get(key)
+            if kind is None:
+                raise ValueError(f"unknown option {key!r} (known: {', '.join(DAEMON_JOB_OPTIONS)})")
+            if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+                raise ValueError(f"option {key!r} must be {kind.__name__}")
+        if not 0 <= options.get("zip_level", ZIP_DEFLATE_LEVEL) <= 9:
+            raise ValueError("option 'zip_level' must be 0-9")
+        with self._cond:
+            job = self.queue.submit(path, out, sprite_cache=self.sprite_cache,
+                                    json_workers=self.json_pool, **options)
+            self._emit(job, "status", status="queued")
+        self.log(f"{now_str()} — Job {job.id} queued: {path} -> {job.out_zip}")
+        return job
+    def _emit(self, job, kind, **fields):
+        events = self.events.setdefault(job.id, [])
+        events.append({"seq": len(events), "type": kind, "time": time.time(), **fields})
+    def _pump(self):
+        """Move every job's LogChannel output into its event list (what /events streams) and keep the totals."""
+        while not self._stop.wait(DAEMON_PUMP_MS / 1000):
+            changed = False
+            with self._cond:
+                for job in list(self.queue.jobs):
+                    if job.status == "running" and job.id not in self._running:
+                        self._running.add(job.id)
+                        self._emit(job, "status", status="running")
+                        changed = True
+                    lines, progress, summary = job.channel.drain()
+                    for line in lines:
+                        self._emit(job, "log", message=line)
+                    if progress is not None:
+                        self._emit(job, "progress", value=progress)
+                    if summary is not None:
+                        self._running.discard(job.id)
+                        self._record(job)
+                        self._emit(job, "done", **daemon_job_view(job))
+                    changed = changed or bool(lines) or progress is not None or summary is not None
+                for job in self.queue.prune(DAEMON_KEEP_JOBS):
+                    self.events.pop(job.id, None)
+                if changed:
+                    self._cond.notify_all()
+    def _record(self, job):
+        summary = job.summary
+        self._totals["completed" if summary.get("ok") else "cancelled" if summary.get("cancelled") else "failed"] += 1
+        if summary.get("ok"):
+            self._totals["seconds"] += summary.get("seconds") or 0.0
+            self._recent.append(time.time())
+        counters = (summary.get("report") or {}).get("counters") or {}
+        for key in DAEMON_TOTALS:
+            self._totals[key] += counters.get(key, 0)
+        self.log(f"{now_str()} — Job {job.id} {job.status} in {summary.get('seconds', 0.0):.2f}s: {job.path}")
+    def stats(self):
+        now = time.time()
+        jobs = list(self.queue.jobs)
+        with self._cond:
+            while self._recent and self._recent[0] < now - DAEMON_STATS_WINDOW:
+                self._recent.popleft()
+            totals = dict(self._totals)
+            recent = len(self._recent)
+        uptime = now - self.started
+        return {"uptime_seconds": round(uptime, 3), "limit": self.queue.limit, "paused": self.queue.paused,
+                "queued": sum(j.status == "queued" for j in jobs), "running": sum(j.status == "running" for j in jobs),
+                **totals, "packs_per_minute": round(recent * 60 / max(1.0, min(uptime, DAEMON_STATS_WINDOW)), 3),
+                "mean_seconds": round(totals["seconds"] / totals["completed"], 3) if totals["completed"] else None,
+                "mappings": len(self.queue.mappings or {}), "sprite_cache": self.sprite_cache is not None}
+    def serve_forever(self):
+        pump = threading.Thread(target=self._pump, name="mew-daemon-pump", daemon=True)
+        pump.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+    def shutdown(self):
+        """Stop serve_forever() from another thread."""
+        self.server.shutdown()
+    def close(self):
+        """Cancel every job, wait (up to DAEMON_CLOSE_TIMEOUT) for running ones to clean up, then release the port and the JSON pool."""
+        self._stop.set()
+        self.queue.cancel_all()
+        self.server.server_close()
+        if not self.queue.join(DAEMON_CLOSE_TIMEOUT):
+            self.log(f"{now_str()} — Some jobs did not stop within {DAEMON_CLOSE_TIMEOUT}s; shutting down anyway")
+        self.json_pool.shutdown(wait=False)
+        with self._cond:
+            self._cond.notify_all()
+class _DaemonHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a ConversionDaemon (the `service` class attribute)."""
+    service = None
+    def log_message(self, fmt, *args):
+        self.service.log(f"{now_str()} — {self.address_string()} {fmt % args}")
+    def _reply(self, code, obj):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    def _stream(self, job, since):
+        """Write the job's events from `since` on as NDJSON, following new ones until its "done" event."""
+        svc = self.service
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        with svc._cond:
+            events = svc.events.setdefault(job.id, [])
+        try:
+            while True:
+                with svc._cond:
+                    while len(events) <= since and not svc._stop.is_set():
+                        svc._cond.wait(1.0)
+                    batch = events[since:]
+                since += len(batch)
+                self.wfile.write(b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in batch))
+                self.wfile.flush()
+                if not batch or batch[-1]["type"] == "done":
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+    def _allowed(self):
+        """Reject browsers: any Origin header (cross-site fetches carry one) and Host names other than ours (DNS rebinding)."""
+        if self.headers.get("Origin") is not None:
+            return False
+        host = self.headers.get("Host")
+        if host is None:
+            return True
+        host = host.strip().lower()
+        if host.startswith("["):
+            host = host[1:host.find("]")] if "]" in host else host
+        elif host.count(":") == 1:
+            host = host.split(":", 1)[0]
+        return host in self.service.hosts
+    def _route(self, method):
+        svc = self.service
+        if not self._allowed():
+            return self._reply(403, {"error": "cross-origin and non-local Host requests are refused"})
+        if not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {svc.token}"):
+            return self._reply(401, {"error": "missing or wrong token"})
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts[:1] == ["jobs"] and len(parts) >= 2:
+            job = svc.job(parts[1])
+            if job is None:
+                return self._reply(404, {"error": f"no job {parts[1]}"})
+            if method == "GET" and len(parts) == 2:
+                return self._reply(200, daemon_job_view(job))
+            if method == "GET" and parts[2:] == ["events"]:
+                try:
+                    since = max(0, int(parse_qs(url.query).get("since", ["0"])[0]))
+                except ValueError:
+                    return self._reply(400, {"error": "since must be an integer"})
+                return self._stream(job, since)
+            if (method == "DELETE" and len(parts) == 2) or (method == "POST" and parts[2:] == ["cancel"]):
+                if not job.finished:
+                    svc.queue.cancel(job)
+                return self._reply(202, daemon_job_view(job))
+        elif method == "POST" and parts == ["jobs"]:
+            if self.headers.get("Content-Type", "").split(";", 1)[0].strip().lower() != "application/json":
+                return self._reply(415, {"error": "POST /jobs needs Content-Type: application/json"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                job = svc.submit(body)
+            except ValueError as e:
+                return self._reply(400, {"error": str(e)})
+            return self._reply(201, daemon_job_view(job))
+        elif method == "GET" and parts == ["jobs"]:
+            return self._reply(200, [daemon_job_view(j) for j in list(svc.queue.jobs)])
+        elif method == "GET" and parts in (["stats"], ["health"]):
+            return self._reply(200, svc.stats() if parts == ["stats"] else {"ok": True})
+        elif method == "POST" and parts in (["pause"], ["resume"]):
+            svc.queue.pause() if parts == ["pause"] else svc.queue.resume()
+            return self._reply(200, svc.stats())
+        return self._reply(404, {"error": f"no route {method} {url.path}"})
+    def do_GET(self):
+        self._route("GET")
+    def do_POST(self):
+        self._route("POST")
+    def do_DELETE(self):
+        self._route("DELETE")
@@ -3,22 +3,30 @@ import sys
 import json
 import re
 import zipfile
+import zlib
+import struct
+import bisect
+import hashlib
+import textwrap
 import shutil
 import tempfile
 import threading
+import multiprocessing
 import time
-from datetime import datetime
+import glob
+import argparse
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
 from io import BytesIO
-import customtkinter as ctk
-from tkinter import filedialog, messagebox
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import Image
 APP_NAME = "MewUpdater"
 SUFFIX = "-mewupdated"
-PINK = "#ff7ab6"
-PINK_HOVER = "#ff9fcf"
-GRADIENT_LEFT = (255, 255, 255)
-GRADIENT_RIGHT = (255, 122, 182)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_JOB_LIMIT = 2 if (os.cpu_count() or 1) >= 4 else 1
 MCMETA_TEXT_COMPONENT = {
     "text": "",
     "extra": [
@@ -34,7 +42,7 @@ def resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
     except Exception:
-        base_path = os.path.abspath(".")
+        base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 def now_str():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -51,13 +59,42 @@ def write_json_file(path, obj):
 def extract_zip_to_dir(zip_path, dest_dir):
     with zipfile.ZipFile(zip_path, "r") as z:
         z.extractall(dest_dir)
-def create_zip_from_dir(src_dir, out_zip):
-    with zipfile.ZipFile(out_zip, "w", zipfile.ZIP_DEFLATED) as z:
+def create_zip_from_dir(src_dir, out_zip, **zip_options):
+    """Zip a folder through ParallelZipWriter (zip_options: workers, level, store_exts, reproducible, cancel)."""
+    with ParallelZipWriter(out_zip, **zip_options) as z:
         for root, dirs, files in os.walk(src_dir):
-            for f in files:
+            dirs.sort()
+            for f in sorted(files):
                 full = os.path.join(root, f)
                 arc = os.path.relpath(full, start=src_dir).replace(os.sep, "/")
                 z.write(full, arc)
+FICLONE = 0x40049409
+def clone_file(src, dst, hardlink=False):
+    """
+    Copy src to dst as cheaply as the filesystem allows: a reflink (copy-on-write clone) where supported,
+    else a hardlink if allowed, else a regular copy. Returns "reflink", "hardlink" or "copy".
+    An existing dst is unlinked first, never truncated: it may be a hardlink to a user's file.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return "reflink"
+        except (OSError, ImportError):
+            if os.path.lexists(dst):
+                os.remove(dst)
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
 def read_pack_mcmeta(packdir):
     p = os.path.join(packdir, "pack.mcmeta")
     if not os.path.isfile(p):
@@ -66,267 +103,1670 @@ def read_pack_mcmeta(packdir):
         return json.load(open(p, "r", encoding="utf-8"))
     except Exception:
         return None
+REPORT_VERSION = 1
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None where it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+        except Exception:
+            pass
+    return None
+def _cpu_seconds():
+    t = os.times()
+    return time.process_time() + t.children_user + t.children_system
+class ConversionReport:
+    """
+    Structured timings and counters for one conversion: wall/CPU seconds per stage plus bytes
+    read/written, images decoded/encoded, files scanned/skipped and peak RSS. Thread-safe counters;
+    written as JSON next to the output pack.
+    """
+    COUNTERS = ("bytes_read", "bytes_written", "images_decoded", "images_encoded", "files_scanned", "files_skipped", "outputs_reused", "sprite_cache_hits",
+                "sprites_empty", "sprites_vanilla", "sprites_shared", "sprite_bytes_saved")
+    def __init__(self, input_path=None):
+        self._lock = threading.Lock()
+        self.input = input_path
+        self.output = None
+        self.started = now_str()
+        self.stages = {}
+        self.counters = {k: 0 for k in self.COUNTERS}
+        self.counts = {}
+        self.ok = None
+        self.error = None
+        self.validation = None
+        self._t0 = time.perf_counter()
+        self._c0 = _cpu_seconds()
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        c0 = _cpu_seconds()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = _cpu_seconds() - c0
+            with self._lock:
+                s = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                s["wall"] += wall
+                s["cpu"] += cpu
+    def add(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+    def finish(self, output=None, ok=True, error=None, counts=None):
+        self.output = output
+        self.ok = ok
+        self.error = error
+        if counts:
+            self.counts = dict(counts)
+    def to_dict(self):
+        with self._lock:
+            return {
+                "version": REPORT_VERSION, "app": APP_NAME, "input": self.input, "output": self.output,
+                "started": self.started, "ok": self.ok, "error": self.error,
+                "wall_seconds": time.perf_counter() - self._t0, "cpu_seconds": _cpu_seconds() - self._c0,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "counters": dict(self.counters), "counts": dict(self.counts), "validation": self.validation,
+            }
+    def write(self, path):
+        write_json_file(path, self.to_dict())
+        return path
+def report_count(pack, counter, n=1):
+    report = getattr(pack, "report", None)
+    if report is not None:
+        report.add(counter, n)
+class ConversionCancelled(Exception):
+    """Raised from CancelToken.check() once the conversion it guards has been cancelled."""
+class CancelToken:
+    """
+    Cooperative cancel/pause switch shared by a conversion and whoever started it. Transforms call check()
+    between files and crop jobs: it blocks while paused and raises ConversionCancelled once cancel() was
+    called. Cancelling also wakes a paused conversion so it stops right away.
+    """
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    @property
+    def paused(self):
+        return not self._running.is_set()
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+    def pause(self):
+        if not self._cancelled.is_set():
+            self._running.clear()
+    def resume(self):
+        self._running.set()
+    def sleep(self, seconds):
+        """Wait up to seconds, waking early on cancel; returns True once cancelled."""
+        return self._cancelled.wait(seconds)
+    def check(self):
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise ConversionCancelled("conversion cancelled")
+def check_cancel(pack):
+    """Honour the CancelToken attached to a pack view (pack.cancel), if any."""
+    cancel = getattr(pack, "cancel", None)
+    if cancel is not None:
+        cancel.check()
+def format_report(report):
+    """Human-readable per-stage table for a report dict (used by the GUI and the CLI)."""
+    lines = [f"{'stage':<12} {'wall ms':>10} {'cpu ms':>10}"]
+    for name, s in report["stages"].items():
+        lines.append(f"{name:<12} {s['wall'] * 1000:10.1f} {s['cpu'] * 1000:10.1f}")
+    c = report["counters"]
+    lines.append(f"read {c['bytes_read']} B, wrote {c['bytes_written']} B, decoded {c['images_decoded']} / encoded {c['images_encoded']} images, "
+                 f"scanned {c['files_scanned']} / skipped {c['files_skipped']} files")
+    if c.get("outputs_reused") or c.get("sprite_cache_hits"):
+        lines.append(f"reused {c.get('outputs_reused', 0)} outputs, {c.get('sprite_cache_hits', 0)} sprite cache hits")
+    if c.get("sprites_empty") or c.get("sprites_vanilla") or c.get("sprites_shared"):
+        lines.append(f"dropped {c.get('sprites_empty', 0)} empty and {c.get('sprites_vanilla', 0)} vanilla sprites "
+                     f"(~{c.get('sprite_bytes_saved', 0)} B saved), {c.get('sprites_shared', 0)} duplicate crops encoded once")
+    if report.get("peak_rss_bytes"):
+        lines.append(f"peak RSS {report['peak_rss_bytes'] / 1048576:.1f} MB")
+    return lines
+def report_path_for(out_zip):
+    return os.path.splitext(out_zip)[0] + ".report.json"
+def zip_pack_prefix(names):
+    """
+    Return "" when pack.mcmeta sits at the archive root, or "<folder>/" when the whole pack is nested
+    in a single top-level folder (a common way packs get zipped by hand). macOS's __MACOSX/ resource-fork
+    folder and dot-files (.DS_Store) next to that folder do not count.
+    """
+    names = [n for n in names if not n.endswith("/")]
+    if "pack.mcmeta" in names or not names:
+        return ""
+    tops = {top for top in (n.split("/", 1)[0] for n in names) if top != "__MACOSX" and not top.startswith(".")}
+    if len(tops) == 1:
+        top = tops.pop() + "/"
+        if top + "pack.mcmeta" in names:
+            return top
+    return ""
+def zip_read_raw(zin, info):
+    """Return the stored (still compressed) bytes of one member of an open ZipFile."""
+    with zin._lock:
+        zin.fp.seek(info.header_offset)
+        header = zin.fp.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        zin.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_len + extra_len)
+        return zin.fp.read(info.compress_size)
+def zip_read_member(zin, info):
+    """
+    zin.read(info) without the per-member ZipExtFile machinery: read the raw bytes and inflate them in one
+    call, still checking size and CRC. Encrypted members and other compression methods go through zipfile.
+    """
+    if info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        return zin.read(info)
+    raw = zip_read_raw(zin, info)
+    data = zlib.decompress(raw, -15, max(1, info.file_size)) if info.compress_type == zipfile.ZIP_DEFLATED else raw
+    if len(data) != info.file_size or zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return data
+def zip_write_raw(zout, zinfo, raw):
+    """Append an already-compressed member (zinfo.CRC/compress_size/file_size must be set) to an open ZipFile."""
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    with zout._lock:
+        zinfo.header_offset = zout.fp.tell()
+        zout._writecheck(zinfo)
+        zout._didModify = True
+        zout.fp.write(zinfo.FileHeader(zip64))
+        zout.fp.write(raw)
+        zout.filelist.append(zinfo)
+        zout.NameToInfo[zinfo.filename] = zinfo
+        zout.start_dir = zout.fp.tell()
+ZIP_STORE_EXTS = (".png", ".ogg")
+ZIP_DEFLATE_LEVEL = 6
+ZIP_FIXED_DATE = (1980, 1, 1, 0, 0, 0)
+def reproducible_datetime():
+    """Build time for reproducible output: SOURCE_DATE_EPOCH when set, else the zip epoch (1980-01-01)."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch and epoch.isdigit():
+        return max(datetime(*ZIP_FIXED_DATE), datetime.fromtimestamp(int(epoch), timezone.utc).replace(tzinfo=None))
+    return datetime(*ZIP_FIXED_DATE)
+class ParallelZipWriter:
+    """
+    Zip writer that compresses members on a thread pool (zlib releases the GIL) and appends them in a fixed
+    order: insertion order, or sorted by name when reproducible. Members whose extension is in store_exts
+    (already-compressed PNG/OGG) are stored, everything else is deflated at `level`; raw copies from another
+    zip keep their compressed bytes. reproducible also pins timestamps and permissions so identical inputs
+    produce byte-identical archives. Use writestr()/write()/copy_raw(), then close(). A CancelToken passed as
+    cancel is checked between members; close() then stops and leaves the caller to delete the partial file.
+    """
+    def __init__(self, out_zip, workers=None, level=ZIP_DEFLATE_LEVEL, store_exts=ZIP_STORE_EXTS, reproducible=False, cancel=None):
+        self.zout = zipfile.ZipFile(out_zip, "w", zipfile.ZIP_DEFLATED)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.level = level
+        self.store_exts = tuple(store_exts)
+        self.reproducible = reproducible
+        self.date_time = reproducible_datetime().timetuple()[:6] if reproducible else None
+        self.cancel = cancel
+        self.entries = []
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zout.close()
+    def writestr(self, name, data):
+        self.entries.append((name, "data", data))
+    def write(self, path, name):
+        self.entries.append((name, "file", path))
+    def copy_raw(self, zin, info, name=None):
+        self.entries.append((name or info.filename, "raw", (zin, info)))
+    def _zipinfo(self, name, date_time=None, external_attr=None):
+        zi = zipfile.ZipInfo(name, self.date_time or date_time or time.localtime(time.time())[:6])
+        zi.create_system = 3
+        if self.reproducible or external_attr is None:
+            zi.external_attr = 0o644 << 16
+        else:
+            zi.external_attr = external_attr
+        return zi
+    def _prepare(self, name, kind, value):
+        if kind == "raw":
+            zin, info = value
+            zi = self._zipinfo(name, info.date_time, info.external_attr)
+            zi.compress_type = info.compress_type
+            zi.flag_bits = info.flag_bits & ~0x08
+            zi.CRC = info.CRC
+            zi.compress_size = info.compress_size
+            zi.file_size = info.file_size
+            return zi, zip_read_raw(zin, info)
+        if kind == "file":
+            st = os.stat(value)
+            with open(value, "rb") as f:
+                data = f.read()
+            date_time = time.localtime(st.st_mtime)[:6]
+            zi = self._zipinfo(name, date_time if date_time >= ZIP_FIXED_DATE else ZIP_FIXED_DATE, (st.st_mode & 0xFFFF) << 16)
+        else:
+            data = value
+            zi = self._zipinfo(name)
+        zi.CRC = zlib.crc32(data)
+        zi.file_size = len(data)
+        raw = None
+        if self.level and not name.lower().endswith(self.store_exts):
+            comp = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+            raw = comp.compress(data) + comp.flush()
+            if len(raw) >= len(data):
+                raw = None
+        if raw is None:
+            zi.compress_type = zipfile.ZIP_STORED
+            raw = data
+        else:
+            zi.compress_type = zipfile.ZIP_DEFLATED
+        zi.compress_size = len(raw)
+        return zi, raw
+    def close(self):
+        entries = sorted(self.entries, key=lambda e: e[0]) if self.reproducible else self.entries
+        self.entries = []
+        pending = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mew-zip") as pool:
+                for entry in entries:
+                    check_cancel(self)
+                    while len(pending) >= self.workers * 4:
+                        zip_write_raw(self.zout, *pending.popleft().result())
+                    pending.append(pool.submit(self._prepare, *entry))
+                while pending:
+                    check_cancel(self)
+                    zip_write_raw(self.zout, *pending.popleft().result())
+        finally:
+            self.zout.close()
+class PackEntry:
+    __slots__ = ("path", "basename", "size", "mtime", "crc")
+    def __init__(self, path, size=0, mtime=None, crc=None):
+        self.path = path
+        self.basename = path.rsplit("/", 1)[-1]
+        self.size = size
+        self.mtime = mtime
+        self.crc = crc
+class PackIndex:
+    """
+    Flat index of every file in a pack, built once per run from a folder scan or a zip central directory.
+    Paths are pack-relative with "/" separators. Lookups by basename and by prefix; transforms that
+    create, copy or move files keep it current through add()/remove().
+    """
+    def __init__(self):
+        self.entries = {}
+        self.by_basename = {}
+        self._paths = []
+    @classmethod
+    def from_dir(cls, root):
+        index = cls()
+        stack = [("", root)]
+        found = []
+        while stack:
+            rel, full = stack.pop()
+            with os.scandir(full) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=True):
+                        stack.append((rel + e.name + "/", e.path))
+                    elif e.is_file(follow_symlinks=True):
+                        st = e.stat()
+                        found.append(PackEntry(rel + e.name, st.st_size, st.st_mtime))
+        index._load(found)
+        return index
+    @classmethod
+    def from_zip(cls, zin, prefix=""):
+        index = cls()
+        found = []
+        for info in zin.infolist():
+            if info.is_dir() or not info.filename.startswith(prefix):
+                continue
+            try:
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+            except (OverflowError, ValueError):
+                mtime = None
+            found.append(PackEntry(info.filename[len(prefix):], info.file_size, mtime, info.CRC))
+        index._load(found)
+        return index
+    def _load(self, found):
+        for entry in found:
+            self.entries[entry.path] = entry
+            self.by_basename.setdefault(entry.basename, []).append(entry.path)
+        for paths in self.by_basename.values():
+            paths.sort()
+        self._paths = sorted(self.entries)
+    def __len__(self):
+        return len(self.entries)
+    def __contains__(self, path):
+        return path in self.entries
+    def get(self, path):
+        return self.entries.get(path)
+    def add(self, path, size=0, mtime=None, crc=None):
+        if path not in self.entries:
+            bisect.insort(self._paths, path)
+            bisect.insort(self.by_basename.setdefault(path.rsplit("/", 1)[-1], []), path)
+        entry = PackEntry(path, size, mtime, crc)
+        self.entries[path] = entry
+        return entry
+    def remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return
+        i = bisect.bisect_left(self._paths, path)
+        if i < len(self._paths) and self._paths[i] == path:
+            del self._paths[i]
+        same = self.by_basename.get(entry.basename)
+        if same:
+            same.remove(path)
+            if not same:
+                del self.by_basename[entry.basename]
+    def find_basename(self, name, prefix=""):
+        return [p for p in self.by_basename.get(name, ()) if p.startswith(prefix)]
+    def under(self, prefix=""):
+        if not prefix:
+            return list(self._paths)
+        lo = bisect.bisect_left(self._paths, prefix)
+        hi = bisect.bisect_left(self._paths, prefix + "\U0010ffff")
+        return self._paths[lo:hi]
+    def namespaces(self):
+        """Sorted namespaces with files under assets/; one bisect jump per namespace, not a pass over every path."""
+        paths = self._paths
+        found = []
+        i = bisect.bisect_left(paths, "assets/")
+        while i < len(paths) and paths[i].startswith("assets/"):
+            ns, sep, _ = paths[i][len("assets/"):].partition("/")
+            if not sep:
+                i += 1
+                continue
+            found.append(ns)
+            i = bisect.bisect_left(paths, f"assets/{ns}/\U0010ffff", i)
+        return sorted(found)
+    def total_size(self):
+        return sum(e.size for e in self.entries.values())
+class DirPack:
+    """
+    Pack view over a plain folder. Transforms read and write pack-relative "a/b/c.png" paths through it.
+    With hardlink set (scratch folders only) copies may be hardlinks; write() always replaces the file
+    instead of overwriting it in place, so a linked twin never changes with it. touched, when set to a set,
+    collects every path written, copied or moved to (PackWatcher uses it to refresh only those zip members).
+    """
+    report = None
+    cancel = None
+    touched = None
+    def __init__(self, root, hardlink=False):
+        self.root = root
+        self.label = root
+        self.hardlink = hardlink
+        self._index = None
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = PackIndex.from_dir(self.root) if os.path.isdir(self.root) else PackIndex()
+        return self._index
+    def path(self, rel):
+        return os.path.join(self.root, rel.replace("/", os.sep)) if rel else self.root
+    def display(self, rel):
+        return self.path(rel)
+    def names(self, prefix=""):
+        return self.index.under(prefix)
+    def isfile(self, rel):
+        return rel in self.index
+    def isdir(self, rel):
+        return os.path.isdir(self.path(rel))
+    def read(self, rel):
+        with open(self.path(rel), "rb") as f:
+            data = f.read()
+        report_count(self, "bytes_read", len(data))
+        return data
+    def open(self, rel):
+        e = self.index.get(rel)
+        report_count(self, "bytes_read", e.size if e else 0)
+        return open(self.path(rel), "rb")
+    def _track(self, rel):
+        st = os.stat(self.path(rel))
+        self.index.add(rel, st.st_size, st.st_mtime)
+        if self.touched is not None:
+            self.touched.add(rel)
+    def write(self, rel, data):
+        full = self.path(rel)
+        safe_mkdir(os.path.dirname(full))
+        if os.path.lexists(full):
+            os.remove(full)
+        with open(full, "wb") as f:
+            f.write(data)
+        report_count(self, "bytes_written", len(data))
+        self._track(rel)
+    def copy(self, src, dst):
+        safe_mkdir(os.path.dirname(self.path(dst)))
+        how = clone_file(self.path(src), self.path(dst), hardlink=self.hardlink)
+        self._track(dst)
+        if how == "copy":
+            size = self.index.get(dst).size
+            report_count(self, "bytes_read", size)
+            report_count(self, "bytes_written", size)
+    def move(self, src, dst):
+        safe_mkdir(os.path.dirname(self.path(dst)))
+        shutil.move(self.path(src), self.path(dst))
+        self.index.remove(src)
+        self._track(dst)
+    def remove(self, rel):
+        os.remove(self.path(rel))
+        self.index.remove(rel)
+    def adopt(self, rel, zin, info):
+        """Take a file from another zip (a previous output) as-is."""
+        report_count(self, "bytes_read", info.compress_size)
+        self.write(rel, zip_read_member(zin, info))
+    def mkdir(self, rel):
+        full = self.path(rel)
+        if os.path.isdir(full):
+            return False
+        safe_mkdir(full)
+        return True
+class CopyOnWritePack:
+    """
+    Shared core of the pack views that never modify their original (ZipStreamPack, OverlayPack). Changes live in
+    overlay[rel] = (kind, value): ("data", bytes), ("foreign", (zip, info)) for a member adopted from a previous
+    output, or (SOURCE_KIND, source) aliasing an original file for copies and moves; removed holds deleted originals.
+    save() streams the result into a zip. Subclasses say what an original is: source(), read_source(), originals()
+    and save_source().
+    """
+    SOURCE_KIND = "source"
+    report = None
+    cancel = None
+    def close(self):
+        pass
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+    def display(self, rel):
+        return rel
+    def names(self, prefix=""):
+        return self.index.under(prefix)
+    def isfile(self, rel):
+        return rel in self.index
+    def isdir(self, rel):
+        return bool(self.index.under(rel.rstrip("/") + "/"))
+    def read(self, rel):
+        if rel in self.overlay:
+            kind, value = self.overlay[rel]
+            if kind == "data":
+                return value
+            if kind == "foreign":
+                zin, info = value
+                report_count(self, "bytes_read", info.compress_size)
+                return zip_read_member(zin, info)
+            return self.read_source(value)
+        source = self.source(rel)
+        if source is None:
+            raise FileNotFoundError(rel)
+        return self.read_source(source)
+    def open(self, rel):
+        return BytesIO(self.read(rel))
+    def write(self, rel, data):
+        self.overlay[rel] = ("data", bytes(data))
+        self.index.add(rel, len(data), time.time())
+    def copy(self, src, dst):
+        if src in self.overlay:
+            self.overlay[dst] = self.overlay[src]
+        else:
+            source = self.source(src)
+            if source is None:
+                raise FileNotFoundError(src)
+            self.overlay[dst] = (self.SOURCE_KIND, source)
+        e = self.index.get(src)
+        self.index.add(dst, e.size, e.mtime, e.crc)
+    def move(self, src, dst):
+        self.copy(src, dst)
+        if src != dst:
+            self.remove(src)
+    def remove(self, rel):
+        self.overlay.pop(rel, None)
+        self.removed.add(rel)
+        self.index.remove(rel)
+    def adopt(self, rel, zin, info):
+        """Take a member of another zip (a previous output); save() copies its compressed bytes raw."""
+        self.overlay[rel] = ("foreign", (zin, info))
+        self.index.add(rel, info.file_size, time.time(), info.CRC)
+    def mkdir(self, rel):
+        return False
+    def source(self, rel):
+        """The original behind rel, or None when the original pack has no such file (or it was removed)."""
+        raise NotImplementedError
+    def read_source(self, source):
+        raise NotImplementedError
+    def originals(self):
+        """(name, source) for every file of the original pack, in output order."""
+        raise NotImplementedError
+    def save_source(self, zout, source, name):
+        raise NotImplementedError
+    def save(self, out_zip, **zip_options):
+        """Write the pack through ParallelZipWriter (zip_options: workers, level, store_exts, reproducible, cancel)."""
+        with ParallelZipWriter(out_zip, **zip_options) as zout:
+            for name, source in self.originals():
+                if name in self.removed or name in self.overlay:
+                    continue
+                self.save_source(zout, source, name)
+            for name, (kind, value) in self.overlay.items():
+                if kind == "data":
+                    zout.writestr(name, value)
+                elif kind == "foreign":
+                    zout.copy_raw(value[0], value[1], name)
+                    report_count(self, "bytes_read", value[1].compress_size)
+                else:
+                    self.save_source(zout, value, name)
+        report_count(self, "bytes_written", os.path.getsize(out_zip))
+class ZipStreamPack(CopyOnWritePack):
+    """
+    Pack view that reads members straight from the input zip. New or changed files are kept in an overlay
+    (bytes, or an alias to an input member for copies/moves) and save() streams everything to the output:
+    untouched and aliased members are copied as raw compressed bytes, only overlay data is deflated.
+    A pack nested in a single top-level folder is read from that folder and written out flattened.
+    """
+    SOURCE_KIND = "member"
+    def __init__(self, zip_path):
+        self.label = zip_path
+        self.zin = zipfile.ZipFile(zip_path, "r")
+        self.prefix = zip_pack_prefix(self.zin.namelist())
+        self.members = {}
+        for info in self.zin.infolist():
+            if not info.is_dir() and info.filename.startswith(self.prefix):
+                self.members[info.filename[len(self.prefix):]] = info
+        self.index = PackIndex.from_zip(self.zin, self.prefix)
+        self.overlay = {}
+        self.removed = set()
+    def close(self):
+        self.zin.close()
+    def source(self, rel):
+        return self.members.get(rel) if rel not in self.removed else None
+    def read_source(self, info):
+        report_count(self, "bytes_read", info.compress_size)
+        return zip_read_member(self.zin, info)
+    def originals(self):
+        return self.members.items()
+    def save_source(self, zout, info, name):
+        zout.copy_raw(self.zin, info, name)
+        report_count(self, "bytes_read", info.compress_size)
+class OverlayPack(CopyOnWritePack):
+    """
+    Copy-on-write pack view over a folder that is never modified. New or changed files are kept in an overlay
+    (bytes, or an alias to a source file for copies/moves) and save() streams the result into a zip: unchanged
+    and aliased source files are read straight from the original folder, so no workspace copy is made at all.
+    """
+    SOURCE_KIND = "file"
+    def __init__(self, root):
+        self.root = root
+        self.label = root
+        self.index = PackIndex.from_dir(root)
+        self.sources = set(self.index.entries)
+        self.overlay = {}
+        self.removed = set()
+    def path(self, rel):
+        return os.path.join(self.root, rel.replace("/", os.sep)) if rel else self.root
+    def open(self, rel):
+        if rel in self.overlay or rel in self.removed:
+            return BytesIO(self.read(rel))
+        e = self.index.get(rel)
+        report_count(self, "bytes_read", e.size if e else 0)
+        return open(self.path(rel), "rb")
+    def source(self, rel):
+        return rel if rel in self.sources and rel not in self.removed else None
+    def read_source(self, rel):
+        with open(self.path(rel), "rb") as f:
+            data = f.read()
+        report_count(self, "bytes_read", len(data))
+        return data
+    def originals(self):
+        return ((name, name) for name in sorted(self.sources))
+    def save_source(self, zout, rel, name):
+        zout.write(self.path(rel), name)
+        report_count(self, "bytes_read", self.index.get(name).size)
+def as_pack(root):
+    return root if hasattr(root, "names") else DirPack(root)
+MANIFEST_VERSION = 1
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+def slicer_fingerprint(out_list):
+    return content_hash(json.dumps(out_list, separators=(",", ":")).encode("utf-8"))[:16]
+class ConversionManifest:
+    """
+    Input content hashes -> produced outputs for one conversion, stored in pack.mcmeta under
+    mew_updater.manifest so the next run against this output can reuse unchanged results:
+      slicer: { input_path: [input_hash, mapping_fingerprint, [outputs...]] }
+      json:   { path: [input_hash, refs_rewritten] }
+    """
+    def __init__(self):
+        self.slicer = {}
+        self.json = {}
+    def to_dict(self):
+        return {"version": MANIFEST_VERSION, "slicer": dict(sorted(self.slicer.items())), "json": dict(sorted(self.json.items()))}
+class PreviousOutput:
+    """A previous MewUpdater output zip plus its manifest; unchanged outputs are raw-copied from it."""
+    def __init__(self, zip_path):
+        self.path = zip_path
+        self.zin = zipfile.ZipFile(zip_path, "r")
+        self.infos = {i.filename: i for i in self.zin.infolist() if not i.is_dir()}
+        self.manifest = {}
+        try:
+            mc = json.loads(self.zin.read("pack.mcmeta").decode("utf-8"))
+            manifest = mc.get("mew_updater", {}).get("manifest") or {}
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.manifest = manifest
+        except Exception:
+            pass
+    def close(self):
+        self.zin.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+    def slicer_outputs(self, in_path, digest, fingerprint):
+        entry = self.manifest.get("slicer", {}).get(in_path)
+        if entry and entry[0] == digest and entry[1] == fingerprint and all(o in self.infos for o in entry[2]):
+            return entry[2]
+        return None
+    def json_output(self, rel, digest):
+        entry = self.manifest.get("json", {}).get(rel)
+        if entry and entry[0] == digest and rel in self.infos:
+            return entry[1]
+        return None
+class PlanOp:
+    """
+    One planned file operation. kind is "copy", "move", "delete" (of src), "crop" (data = (mapping input, box, metadata)),
+    "write-meta" (data = text, or None when the stage builds it) or "rewrite" (data = (body, refs, input hash),
+    body being new bytes or a (zip, info) member of a previous output). stage names the transform that runs it.
+    """
+    __slots__ = ("kind", "src", "dst", "data", "stage")
+    def __init__(self, kind, src, dst, data=None, stage=None):
+        self.kind = kind
+        self.src = src
+        self.dst = dst
+        self.data = data
+        self.stage = stage
+    def describe(self):
+        if self.kind == "copy":
+            return f"copy of {self.src}"
+        if self.kind == "move":
+            return f"moved from {self.src}"
+        if self.kind == "delete":
+            return f"{self.src} removed"
+        if self.kind == "crop":
+            return f"crop {','.join(map(str, self.data[1][:4]))} of {self.src}"
+        if self.kind == "rewrite":
+            return f"{self.data[1]} armor refs"
+        return "metadata"
+class UpdatePlan:
+    """
+    Declarative list of the file operations a conversion will perform, built by the plan_* functions before
+    anything is written and then run stage by stage. add() drops duplicates: an op whose destination is planned
+    again is superseded by the later one (as the last write won when transforms ran directly), and copies or
+    moves of a source that an earlier op already moved away are dropped. A superseded move still removed its
+    source when transforms ran directly, so it becomes a delete of that source instead of vanishing.
+    """
+    def __init__(self):
+        self.ops = []
+        self.dropped = 0
+        self.slicer_inputs = []
+        self.pruned = set()
+        self._by_dst = {}
+        self._moved = set()
+    def __len__(self):
+        return len(self.ops) - self.ops.count(None)
+    def add(self, op):
+        if op.kind in ("copy", "move") and op.src in self._moved:
+            self.dropped += 1
+            return False
+        prev = self._by_dst.get(op.dst)
+        if prev is not None:
+            old = self.ops[prev]
+            if old.kind == "move" and old.src != op.src:
+                self.ops[prev] = PlanOp("delete", old.src, None, stage=old.stage)
+            else:
+                if old.kind == "move":
+                    self._moved.discard(old.src)
+                self.ops[prev] = None
+            self.dropped += 1
+        self._by_dst[op.dst] = len(self.ops)
+        self.ops.append(op)
+        if op.kind == "move":
+            self._moved.add(op.src)
+        return True
+    def stage_ops(self, stage):
+        return [op for op in self.ops if op is not None and op.stage == stage]
+    def files_to_modify(self):
+        """Distinct paths the plan creates, changes or removes."""
+        return len(set(self._by_dst) | self._moved)
+    def summary(self):
+        kinds = {}
+        for op in self.ops:
+            if op is not None:
+                kinds[op.kind] = kinds.get(op.kind, 0) + 1
+        return {"operations": len(self), "files_to_modify": self.files_to_modify(), "duplicates_dropped": self.dropped, "kinds": kinds}
+    def diff(self, pack):
+        """One line per op against the pack as it is now: A(dded), M(odified) or R(enamed) paths."""
+        lines = []
+        for op in self.ops:
+            if op is None:
+                continue
+            if op.kind == "move":
+                lines.append(f"R {op.src} -> {op.dst}")
+            elif op.kind == "delete":
+                lines.append(f"D {op.src}")
+            elif pack.isfile(op.dst):
+                lines.append(f"M {op.dst}  ({op.describe()})")
+            else:
+                lines.append(f"A {op.dst}  ({op.describe()})")
+        return lines
 SLICER_TXT = resource_path("slicer.txt")
-SLICER_INPUT_RE = re.compile(r'input\(\s*"([^"]+)"\s*,', re.IGNORECASE)
-OUTPUT_FILE_RE = re.compile(r'new\s+OutputFile\(\s*"([^"]+)"\s*,\s*new\s+Box\(\s*([0-9\s,]+)\s*\)', re.IGNORECASE)
+SLICER_CACHE_VERSION = 1
 BOX_NUMS_RE = re.compile(r'(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)')
-METADATA_START_RE = re.compile(r'\.metadata\(\s*("""|")')
-METADATA_TRIPLE_RE = re.compile(r'\.metadata\(\s*("""\s*$(.*?)^\s*"""\s*\))', re.DOTALL | re.MULTILINE)
-METADATA_SINGLE_RE = re.compile(r'\.metadata\(\s*"([^"]+)"\s*\)', re.DOTALL)
+SLICER_TOKEN_RE = re.compile(
+    r'static\s+final\s+String\s+(?P<str_name>\w+)\s*=\s*"""(?P<str_text>.*?)"""'
+    r'|static\s+final\s+Box\s+(?P<box_name>\w+)\s*=\s*new\s+Box\(\s*(?P<box_const>[0-9\s,]+)\)'
+    r'|(?<![\w.])input\(\s*"(?P<input>[^"]+)"\s*,'
+    r'|new\s+OutputFile\(\s*"(?P<output>[^"]+)"\s*,\s*(?:new\s+Box\(\s*(?P<box>[0-9\s,]+)\)|(?P<box_ref>\w+))'
+    r'|\.metadata\(\s*(?:"""(?P<meta_triple>.*?)"""|"(?P<meta_single>(?:[^"\\]|\\.)*)"|(?P<meta_ref>\w+))\s*\)',
+    re.DOTALL)
+def _java_text_block(text):
+    return textwrap.dedent(text.lstrip(" \t").lstrip("\n")).strip()
 def load_slicer_mappings(slicer_path):
     """
     Parse slicer.txt and return a dict:
       { input_path: [ (output_path, (x,y,w,h,refW,refH), metadata_json_or_None), ... ] }
+    Single pass over the Java source: one combined tokenizer, so cost is linear in the file size.
+    .metadata(...) attaches to the OutputFile it is chained on; String/Box constants are resolved.
     """
     mappings = {}
     if not os.path.isfile(slicer_path):
         return mappings
-    text = open(slicer_path, "r", encoding="utf-8").read()
-    pos = 0
-    while True:
-        m = SLICER_INPUT_RE.search(text, pos)
-        if not m:
-            break
-        input_path = m.group(1)
-        start = m.end()
-        next_input = SLICER_INPUT_RE.search(text, start)
-        block_end = next_input.start() if next_input else len(text)
-        block = text[start:block_end]
-        outputs = []
-        for out_match in OUTPUT_FILE_RE.finditer(block):
-            out_path = out_match.group(1)
-            box_args = out_match.group(2)
-            bn = BOX_NUMS_RE.search(box_args)
+    with open(slicer_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    strings = {}
+    boxes = {}
+    outputs = None
+    last = None
+    for m in SLICER_TOKEN_RE.finditer(text):
+        if m.group("str_name"):
+            strings[m.group("str_name")] = _java_text_block(m.group("str_text"))
+        elif m.group("box_name"):
+            bn = BOX_NUMS_RE.search(m.group("box_const"))
             if bn:
-                x,y,w,h,refW,refH = map(int, bn.groups())
+                boxes[m.group("box_name")] = tuple(map(int, bn.groups()))
+        elif m.group("input"):
+            outputs = mappings.setdefault(m.group("input"), [])
+            last = None
+        elif m.group("output"):
+            last = None
+            if outputs is None:
+                continue
+            if m.group("box"):
+                bn = BOX_NUMS_RE.search(m.group("box"))
+                box = tuple(map(int, bn.groups())) if bn else None
             else:
+                box = boxes.get(m.group("box_ref"))
+            if box is None:
                 continue
-            metadata = None
-            after_pos = out_match.end()
-            triple = METADATA_TRIPLE_RE.search(block, after_pos, re.DOTALL)
-            single = METADATA_SINGLE_RE.search(block, after_pos, re.DOTALL)
-            if triple and triple.start() == triple.start():
-                metadata = triple.group(2).strip()
-            elif single:
-                metadata = single.group(1).strip()
-            outputs.append((out_path, (x,y,w,h,refW,refH), metadata))
-        if outputs:
-            mappings[input_path] = outputs
-        pos = block_end
-    return mappings
-def apply_slicer_mappings(pack_root, mappings, log, ui_progress_step):
-    """
-    For each mapping input -> outputs, locate the input image under pack_root (allowing realms namespace),
-    load the image, crop scaled boxes and write outputs (creating folders).
+            outputs.append((m.group("output"), box, None))
+            last = len(outputs) - 1
+        elif last is not None:
+            if m.group("meta_triple") is not None:
+                metadata = _java_text_block(m.group("meta_triple"))
+            elif m.group("meta_single") is not None:
+                metadata = m.group("meta_single").strip()
+            else:
+                metadata = strings.get(m.group("meta_ref"))
+            out_path, box, _ = outputs[last]
+            outputs[last] = (out_path, box, metadata or None)
+            last = None
+    return {k: v for k, v in mappings.items() if v}
+def config_dir():
+    """Per-user config folder (MEWUPDATER_CONFIG_DIR overrides it)."""
+    override = os.environ.get("MEWUPDATER_CONFIG_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), APP_NAME)
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), APP_NAME)
+    return os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"), APP_NAME.lower())
+def load_slicer_mappings_cached(slicer_path, cache_dir=None):
+    """
+    Load the slicer mapping from a compiled cache keyed by the sha256 of slicer.txt, parsing and
+    rewriting the cache only when the hash changes. Returns (mappings, info) where info holds
+    "source" ("cache", "parsed" or "missing"), "sha256" and "seconds".
+    """
+    started = time.perf_counter()
+    info = {"source": "missing", "sha256": None, "seconds": 0.0}
+    if not os.path.isfile(slicer_path):
+        return {}, info
+    with open(slicer_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    info["sha256"] = digest
+    cache_path = os.path.join(cache_dir or config_dir(), "slicer_cache.json")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == SLICER_CACHE_VERSION and cached.get("sha256") == digest:
+            mappings = {k: [(o, tuple(b), m) for o, b, m in v] for k, v in cached["mappings"].items()}
+            info["source"] = "cache"
+            info["seconds"] = time.perf_counter() - started
+            return mappings, info
+    except Exception:
+        pass
+    mappings = load_slicer_mappings(slicer_path)
+    info["source"] = "parsed"
+    try:
+        safe_mkdir(os.path.dirname(cache_path))
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": SLICER_CACHE_VERSION, "sha256": digest, "mappings": mappings}, f, separators=(",", ":"))
+        os.replace(tmp, cache_path)
+    except Exception:
+        pass
+    info["seconds"] = time.perf_counter() - started
+    return mappings, info
+def describe_slicer_load(mappings, info):
+    total_outputs = sum(len(v) for v in mappings.values())
+    how = "from cache" if info["source"] == "cache" else "parsed slicer.txt"
+    return f"{now_str()} — Loaded official slicer mapping ({how}, {info['seconds'] * 1000:.1f} ms): {total_outputs} outputs."
+SPRITE_CACHE_VERSION = 1
+SPRITE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+class SpriteCache:
+    """
+    On-disk cache of sliced sprite PNGs shared by every pack and process, stored as
+    <root>/<key[:2]>/<key>.png with key = hash(cache version, input image hash, mapping box). Entries are
+    written to a temp file and renamed into place, so concurrent batch workers never see partial files;
+    reads bump the mtime, and the oldest entries are evicted once the cache grows past max_bytes. With sprite
+    pruning on, <key>.json next to it keeps the crop's pixel facts (empty, pixel digest), so a SpritePruner
+    classifies a hit without decoding it; dropped crops get the facts alone, with no PNG.
+    """
+    def __init__(self, root=None, max_bytes=SPRITE_CACHE_MAX_BYTES):
+        self.root = root or os.path.join(config_dir(), "sprite_cache")
+        self.max_bytes = max_bytes
+        self._added = 0
+    def key(self, digest, box):
+        return content_hash(f"{SPRITE_CACHE_VERSION}:{digest}:{','.join(map(str, box))}".encode("ascii"))
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".png")
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    def facts(self, key):
+        """The pruning facts stored for an entry ({"empty": True, "blank": n} or {"empty": False, "digest": d}), or None."""
+        path = self._path(key)[:-len(".png")] + ".json"
+        try:
+            with open(path, "rb") as f:
+                facts = json.loads(f.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return facts if isinstance(facts, dict) else None
+    def put_facts(self, key, facts):
+        self.put(key, json.dumps(facts).encode("ascii"), ".json")
+    def put(self, key, data, ext=".png"):
+        path = self._path(key)[:-len(".png")] + ext
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            safe_mkdir(os.path.dirname(path))
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._added += len(data)
+        if self._added > self.max_bytes // 16:
+            self._added = 0
+            self.trim()
+    def trim(self):
+        """Delete least recently used entries until the cache fits in max_bytes; returns bytes freed."""
+        entries = []
+        total = 0
+        try:
+            subdirs = [e.path for e in os.scandir(self.root) if e.is_dir()]
+        except OSError:
+            return 0
+        for sub in subdirs:
+            try:
+                for e in os.scandir(sub):
+                    if e.name.endswith((".png", ".json")):
+                        st = e.stat()
+                        entries.append((st.st_mtime, st.st_size, e.path))
+                        total += st.st_size
+            except OSError:
+                continue
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        return freed
+def slicer_crop_box(iw, ih, box):
+    x,y,w,h,refW,refH = box
+    rx = int(round(x * iw / refW))
+    ry = int(round(y * ih / refH))
+    rww = int(round(w * iw / refW))
+    rhh = int(round(h * ih / refH))
+    rx = max(0, min(rx, iw-1))
+    ry = max(0, min(ry, ih-1))
+    rww = max(1, min(rww, iw-rx))
+    rhh = max(1, min(rhh, ih-ry))
+    return (rx, ry, rx + rww, ry + rhh)
+def slicer_metadata_text(metadata):
+    meta_text = metadata.strip()
+    meta_text = re.sub(r'^\s*"""', '', meta_text)
+    meta_text = re.sub(r'"""\s*$', '', meta_text)
+    return meta_text
+def find_slicer_input(pack, in_path):
+    """
+    Locate a mapping input: its own path, else the same path in another namespace of the pack (realms, or a
+    pack that keeps its GUI textures under its own namespace), else the first file with its basename under assets/.
+    """
+    if pack.isfile(in_path):
+        return in_path
+    parts = in_path.split("/", 2)
+    if len(parts) == 3 and parts[0] == "assets":
+        for ns in pack.index.namespaces():
+            alt = f"assets/{ns}/{parts[2]}"
+            if pack.isfile(alt):
+                return alt
+    found = pack.index.find_basename(os.path.basename(in_path), "assets/")
+    return found[0] if found else None
+SLICER_WORKERS = min(4, os.cpu_count() or 1)
+PIXEL_BUDGET_UNIT = 1 << 20
+PIXEL_BUDGET_PIXELS = 128 * PIXEL_BUDGET_UNIT
+class PixelBudget:
+    """
+    Caps the decoded image pixels alive at once, in 1-megapixel units. Slicer decodes acquire their image's
+    pixels before decoding and release them once its last crop is encoded; an image larger than the whole
+    budget waits until it can run alone. With shared=True the counters are multiprocessing semaphores, so
+    one budget built before a batch pool starts is enforced across all of its worker processes.
+    """
+    def __init__(self, max_pixels=PIXEL_BUDGET_PIXELS, shared=False):
+        ctx = multiprocessing if shared else threading
+        self.units = max(1, max_pixels // PIXEL_BUDGET_UNIT)
+        self._tokens = ctx.BoundedSemaphore(self.units)
+        self._lock = ctx.Lock()
+    def acquire(self, pixels):
+        """Block until `pixels` fit in the budget; returns the units to hand back to release()."""
+        n = min(self.units, max(1, -(-pixels // PIXEL_BUDGET_UNIT)))
+        with self._lock:
+            for _ in range(n):
+                self._tokens.acquire()
+        return n
+    def release(self, units):
+        for _ in range(units):
+            self._tokens.release()
+PIXEL_BUDGET = PixelBudget()
+PRUNE_LOG = {"empty": "Dropped empty sprite", "vanilla": "Dropped sprite identical to vanilla"}
+_VANILLA_DIGESTS = {}
+_VANILLA_LOCK = threading.Lock()
+def sprite_digest(img):
+    """Digest of an RGBA image's size and pixels; equal digests mean pixel-identical sprites."""
+    return content_hash(b"%dx%d:" % img.size + img.tobytes())
+def vanilla_sprite_digests(path, outputs):
+    """{output path: (pixel digest, PNG size)} for the default sprites among outputs, read once per process from a client jar, zip or assets folder."""
+    key = (os.path.abspath(path), os.path.getmtime(path), frozenset(outputs))
+    with _VANILLA_LOCK:
+        digests = _VANILLA_DIGESTS.get(key)
+        if digests is None:
+            digests = {}
+            with open_pack_view(path) as pack:
+                for rel in key[2]:
+                    if pack.isfile(rel):
+                        data = pack.read(rel)
+                        with Image.open(BytesIO(data)) as im:
+                            digests[rel] = (sprite_digest(im.convert("RGBA")), len(data))
+            _VANILLA_DIGESTS[key] = digests
+    return digests
+def report_pruned(pack, reason, saved):
+    report_count(pack, "sprites_" + reason)
+    report_count(pack, "sprite_bytes_saved", saved)
+class SpritePruner:
+    """
+    Optional slicer pass over each decoded input (prune_sprites), run on the decode worker before any crop
+    is encoded. Fully transparent crops are dropped, so the game falls back to its default sprite. Crops
+    whose pixels equal the default sprite in `vanilla` (a client jar, or a zip or folder of its assets) are
+    dropped too. A crop identical to one already encoded in this conversion reuses those bytes. The alpha
+    channel is split off once per image and each box is tested with getbbox() on it, a C-level scan of just
+    that box. Bytes saved are the vanilla PNG's size, or a blank PNG's for empty crops.
+    """
+    def __init__(self, vanilla=None, mappings=None):
+        outputs = [out for outs in (mappings or {}).values() for out, _, _ in outs]
+        self.vanilla = vanilla_sprite_digests(vanilla, outputs) if vanilla else {}
+        self.fingerprint = "prune:" + content_hash("".join(sorted(d for d, _ in self.vanilla.values())).encode("ascii"))[:16]
+        self._encoded = {}
+        self._blank = {}
+        self._lock = threading.Lock()
+    def _blank_size(self, size):
+        n = self._blank.get(size)
+        if n is None:
+            buf = BytesIO()
+            Image.new("RGBA", size).save(buf, "PNG")
+            n = self._blank[size] = len(buf.getvalue())
+        return n
+    def classify(self, img, items):
+        """
+        Pixel facts (see SpriteCache.facts) for [(out_path, crop_box)] of one decoded image, one dict per crop;
+        verdict() turns them into keep or drop.
+        """
+        rgba = img if img.mode == "RGBA" else img.convert("RGBA")
+        alpha = rgba.getchannel("A")
+        facts = []
+        for out_path, box in items:
+            if alpha.crop(box).getbbox() is None:
+                facts.append({"empty": True, "blank": self._blank_size((box[2] - box[0], box[3] - box[1]))})
+            else:
+                facts.append({"empty": False, "digest": sprite_digest(rgba.crop(box))})
+        return facts
+    def png_facts(self, data):
+        """The same facts for a sprite that is already encoded (a cache entry stored before pruning was on)."""
+        with Image.open(BytesIO(data)) as im:
+            rgba = im.convert("RGBA")
+        if rgba.getchannel("A").getbbox() is None:
+            return {"empty": True, "blank": len(data)}
+        return {"empty": False, "digest": sprite_digest(rgba)}
+    def verdict(self, out_path, facts):
+        """("empty" or "vanilla", bytes saved) for a crop to drop, (None, None) for one to encode; no pixels needed."""
+        if facts.get("empty"):
+            return "empty", facts.get("blank", 0)
+        ref = self.vanilla.get(out_path)
+        return ("vanilla", ref[1]) if ref and ref[0] == facts.get("digest") else (None, None)
+    def shared(self, digest, submit):
+        """(future, reused): the encode of the first crop with this pixel digest, started with submit() on a miss."""
+        with self._lock:
+            fut = self._encoded.get(digest)
+            if fut is not None:
+                return fut, True
+            fut = self._encoded[digest] = submit()
+            return fut, False
+def _slice_encode(img, crop_box):
+    """Crop from the decoded image as-is and convert only the crop, never a full-size RGBA copy."""
+    crop = img.crop(crop_box)
+    if crop.mode != "RGBA":
+        crop = crop.convert("RGBA")
+    buf = BytesIO()
+    crop.save(buf, "PNG")
+    return buf.getvalue()
+def _slice_decode(pack, in_path, img_file, out_list, pool, previous=None, cache=None, budget=None, prune=None):
+    """
+    Read and hash one input in a decode worker. If a previous output holds results for the same content and
+    mapping, return them for reuse. Otherwise serve what the SpriteCache has and, only if something is
+    missing, take the image's pixels from budget (a PixelBudget), decode it and fan the remaining
+    crop+encode jobs out to pool. The compressed bytes are dropped right after decoding and the decoded
+    image (and its budget) as soon as its last crop is encoded. Decodes and crop jobs check pack.cancel first.
+    With a SpritePruner, a crop it drops resolves to the reason ("empty"/"vanilla") instead of PNG bytes and
+    is never encoded, and identical crops share one encode.
+    """
+    check_cancel(pack)
+    data = pack.read(img_file)
+    digest = content_hash(data)
+    fingerprint = slicer_fingerprint(out_list if prune is None else out_list + [prune.fingerprint])
+    reused = previous.slicer_outputs(in_path, digest, fingerprint) if previous else None
+    if reused is not None:
+        return digest, fingerprint, reused, None
+    keys = [cache.key(digest, box) for _, box, _ in out_list] if cache else [None] * len(out_list)
+    crop_futs = []
+    for (out_path, _, _), key in zip(out_list, keys):
+        fut = Future()
+        facts = cache.facts(key) if cache and prune else None
+        reason, saved = prune.verdict(out_path, facts) if facts is not None else (None, None)
+        hit = None if reason or not cache else cache.get(key)
+        if hit is not None and prune and facts is None:
+            facts = prune.png_facts(hit)
+            cache.put_facts(key, facts)
+            reason, saved = prune.verdict(out_path, facts)
+        if reason or hit is not None:
+            report_count(pack, "sprite_cache_hits")
+            if reason:
+                report_pruned(pack, reason, saved)
+            fut.set_result(reason or hit)
+        crop_futs.append(fut)
+    if all(f.done() for f in crop_futs):
+        return digest, fingerprint, None, crop_futs
+    with BytesIO(data) as fh:
+        img = Image.open(fh)
+        iw, ih = img.size
+        units = budget.acquire(iw * ih) if budget else 0
+        try:
+            img.load()
+        except Exception:
+            if budget:
+                budget.release(units)
+            raise
+    del data
+    report_count(pack, "images_decoded")
+    state = {"img": img, "left": 1}
+    lock = threading.Lock()
+    def done_one():
+        with lock:
+            state["left"] -= 1
+            last = not state["left"]
+        if last:
+            state["img"] = None
+            if budget:
+                budget.release(units)
+    def encode(crop_box, key):
+        try:
+            check_cancel(pack)
+            out = _slice_encode(state["img"], crop_box)
+        finally:
+            done_one()
+        report_count(pack, "images_encoded")
+        if cache:
+            cache.put(key, out)
+        return out
+    def submit(i):
+        with lock:
+            state["left"] += 1
+        return pool.submit(encode, boxes[i], keys[i])
+    try:
+        todo = [i for i, fut in enumerate(crop_futs) if not fut.done()]
+        boxes = {i: slicer_crop_box(iw, ih, out_list[i][1]) for i in todo}
+        facts = prune.classify(img, [(out_list[i][0], boxes[i]) for i in todo]) if prune else [None] * len(todo)
+        del img
+        for i, f in zip(todo, facts):
+            reason, saved = prune.verdict(out_list[i][0], f) if prune else (None, None)
+            if prune and cache:
+                cache.put_facts(keys[i], f)
+            if reason:
+                report_pruned(pack, reason, saved)
+                crop_futs[i].set_result(reason)
+            elif prune:
+                crop_futs[i], reused_encode = prune.shared(f["digest"], lambda: submit(i))
+                if reused_encode:
+                    report_count(pack, "sprites_shared")
+            else:
+                crop_futs[i] = submit(i)
+    finally:
+        done_one()
+    return digest, fingerprint, None, crop_futs
+def plan_slicer(root, mappings, plan=None):
+    """
+    Locate each mapping input in the pack (in any namespace, see find_slicer_input) and add a crop op per output, plus a
+    write-meta op for outputs with animation/nine-slice metadata. Nothing is decoded.
+    """
+    pack = as_pack(root)
+    plan = plan if plan is not None else UpdatePlan()
+    for in_path, out_list in mappings.items():
+        img_file = find_slicer_input(pack, in_path)
+        plan.slicer_inputs.append((in_path, img_file))
+        if img_file is None:
+            continue
+        for out_path, box, metadata in out_list:
+            plan.add(PlanOp("crop", img_file, out_path, (in_path, box, metadata), "slicer"))
+            if metadata:
+                plan.add(PlanOp("write-meta", out_path, out_path + ".mcmeta", slicer_metadata_text(metadata), "slicer"))
+    return plan
+def apply_slicer_mappings(pack_root, mappings, log, ui_progress_step, workers=None, max_inflight=None, previous=None, manifest=None, cache=None, plan=None, budget=None, prune=None):
+    """
+    Run the slicer ops of plan (planned from mappings when not given): load each input image, crop
+    the scaled boxes and write the outputs and their metadata (creating folders).
     ui_progress_step should be a callable to increment UI progress.
+    Decoding and crop/encode run on two thread pools of `workers` threads each (Pillow releases the GIL
+    there); at most `max_inflight` inputs are in flight, decoded pixels are bounded by budget (default
+    PIXEL_BUDGET), and results are written and logged in mapping order on the calling thread, so output
+    and log stay deterministic. Decodes waiting for budget never block the encodes that free it.
+    With a PreviousOutput, inputs whose content hash and mapping are unchanged reuse its sprites
+    without decoding; every input is recorded in manifest (a ConversionManifest) when given.
+    cache, if given, is a SpriteCache consulted before decoding and filled with every new sprite.
+    prune, if given, is a SpritePruner: the sprites it drops (and their metadata) are not written and are
+    recorded in plan.pruned, so validation does not report them as missing.
+    A CancelToken on pack.cancel is checked before every input and output; pending jobs then bail out early.
     """
+    pack = as_pack(pack_root)
+    plan = plan if plan is not None else plan_slicer(pack, mappings)
+    groups = {}
+    metas = {}
+    for op in plan.stage_ops("slicer"):
+        if op.kind == "crop":
+            groups.setdefault(op.data[0], []).append((op.dst, op.data[1], op.data[2]))
+        else:
+            metas[op.src] = op.data
+    workers = max(1, workers or SLICER_WORKERS)
+    max_inflight = max(1, max_inflight or workers * 2)
     created = 0
-    for in_path, out_list in mappings.items():
-        candidates = [
-            os.path.join(pack_root, in_path.replace("/", os.sep)),
-            os.path.join(pack_root, in_path.replace("/", os.sep).replace("assets\\realms", "assets\\realms"))
-        ]
-        img_file = None
-        for c in candidates:
-            if os.path.isfile(c):
-                img_file = c
-                break
-        if not img_file:
-            base = os.path.basename(in_path)
-            for root, dirs, files in os.walk(os.path.join(pack_root, "assets")):
-                if base in files:
-                    img_file = os.path.join(root, base)
-                    break
-        if not img_file:
+    pending = deque()
+    def drain(in_path, out_list, img_file, decode_fut):
+        nonlocal created
+        if img_file is None:
             log.append(f"{now_str()} — SLICER: input image not found: {in_path}")
             ui_progress_step()
-            continue
+            return
+        check_cancel(pack)
         try:
-            img = Image.open(img_file).convert("RGBA")
+            digest, fingerprint, reused, crop_futs = decode_fut.result()
         except Exception as e:
-            log.append(f"{now_str()} — SLICER: failed to open {img_file}: {e}")
+            log.append(f"{now_str()} — SLICER: failed to open {pack.display(img_file)}: {e}")
             ui_progress_step()
-            continue
-        iw, ih = img.size
-        for out_path, box, metadata in out_list:
-            x,y,w,h,refW,refH = box
-            rx = int(round(x * iw / refW))
-            ry = int(round(y * ih / refH))
-            rww = int(round(w * iw / refW))
-            rhh = int(round(h * ih / refH))
-            rx = max(0, min(rx, iw-1))
-            ry = max(0, min(ry, ih-1))
-            rww = max(1, min(rww, iw-rx))
-            rhh = max(1, min(rhh, ih-ry))
-            crop = img.crop((rx, ry, rx + rww, ry + rhh))
-            out_full = os.path.join(pack_root, out_path.replace("/", os.sep))
-            safe_mkdir(os.path.dirname(out_full))
-            target_w = int(refW * rww / w) if False else rww
+            return
+        produced = []
+        dropped = 0
+        if reused is not None:
+            for out_path in reused:
+                pack.adopt(out_path, previous.zin, previous.infos[out_path])
+                produced.append(out_path)
+                if not out_path.endswith(".mcmeta"):
+                    created += 1
+                    log.append(f"{now_str()} — Reused sprite: {pack.display(out_path)}")
+            report_count(pack, "outputs_reused", len(reused))
+            if prune is not None:
+                plan.pruned.update(out_path for out_path, _, _ in out_list if out_path not in reused)
+            for _ in out_list:
+                ui_progress_step()
+            if manifest is not None:
+                manifest.slicer[in_path] = [digest, fingerprint, produced]
+            return
+        for (out_path, box, metadata), fut in zip(out_list, crop_futs):
+            check_cancel(pack)
+            out_full = pack.display(out_path)
             try:
-                crop.save(out_full)
+                data = fut.result()
+                if isinstance(data, str):
+                    dropped += 1
+                    plan.pruned.add(out_path)
+                    log.append(f"{now_str()} — {PRUNE_LOG[data]}: {out_full}")
+                    ui_progress_step()
+                    continue
+                pack.write(out_path, data)
+                produced.append(out_path)
                 created += 1
                 log.append(f"{now_str()} — Wrote sprite: {out_full}")
-                if metadata:
-                    meta_text = metadata.strip()
-                    meta_text = re.sub(r'^\s*"""', '', meta_text)
-                    meta_text = re.sub(r'"""\s*$', '', meta_text)
-                    meta_path = out_full + ".mcmeta"
+                meta_text = metas.get(out_path)
+                if meta_text is not None:
+                    meta_path = out_path + ".mcmeta"
+                    pack.write(meta_path, meta_text.encode("utf-8"))
+                    produced.append(meta_path)
                     try:
                         json.loads(meta_text)
-                        with open(meta_path, "w", encoding="utf-8") as mf:
-                            mf.write(meta_text)
-                        log.append(f"{now_str()} — Wrote sprite metadata: {meta_path}")
+                        log.append(f"{now_str()} — Wrote sprite metadata: {pack.display(meta_path)}")
                     except Exception:
-                        with open(meta_path, "w", encoding="utf-8") as mf:
-                            mf.write(meta_text)
-                        log.append(f"{now_str()} — Wrote raw sprite metadata: {meta_path}")
+                        log.append(f"{now_str()} — Wrote raw sprite metadata: {pack.display(meta_path)}")
             except Exception as e:
                 log.append(f"{now_str()} — Failed writing sprite {out_full}: {e}")
             ui_progress_step()
+        if manifest is not None and len(produced) >= len(out_list) - dropped:
+            manifest.slicer[in_path] = [digest, fingerprint, produced]
+    budget = budget or PIXEL_BUDGET
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mew-slicer") as pool, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mew-decode") as decode_pool:
+        for in_path, img_file in plan.slicer_inputs:
+            out_list = groups.get(in_path)
+            if img_file is not None and not out_list:
+                continue
+            check_cancel(pack)
+            while len(pending) >= max_inflight:
+                drain(*pending.popleft())
+            decode_fut = decode_pool.submit(_slice_decode, pack, in_path, img_file, out_list, pool, previous, cache, budget, prune) if img_file else None
+            pending.append((in_path, out_list, img_file, decode_fut))
+        while pending:
+            drain(*pending.popleft())
     return created
-ARMOR_LAYER_1_RE = re.compile(r"(?P<mat>.+?)_layer_1(\.png)$", re.IGNORECASE)
-ARMOR_LAYER_2_RE = re.compile(r"(?P<mat>.+?)_layer_2(\.png)$", re.IGNORECASE)
-LEATHER_OVERLAY_RE = re.compile(r"leather_layer_(?P<n>[12])_overlay(\.png)$", re.IGNORECASE)
+def textures_root(ns):
+    """The textures/ folder of a namespace; relocation rules apply under every namespace's own root."""
+    return f"assets/{ns}/textures/"
+ANY_DIR = "(?:.*/)?"
+RELOCATION_RULES = (
+    # (stage, keyword, pattern over the path under textures/, destination under textures/)
+    # keyword: lowercase text every path the rule can match contains in its last two segments (None = always try).
+    # pattern: case-sensitive except inside (?i:...); rules starting with ANY_DIR may look at the parent folder, no higher.
+    # destination: a format string over the pattern's named groups, or a callable taking the match. First match wins.
+    ("trims", None, r"trims/models/armor/(?P<fn>[^/]*_leggings[^/]*)", lambda m: "trims/entity/humanoid_leggings/" + m["fn"].replace("_leggings", "")),
+    ("trims", None, r"trims/models/armor/(?P<fn>[^/]+)", "trims/entity/humanoid/{fn}"),
+    ("armor", "_layer_1.png", ANY_DIR + r"(?P<mat>[^/]+?)(?i:_layer_1\.png)", "entity/equipment/humanoid/{mat}.png"),
+    ("armor", "_layer_2.png", ANY_DIR + r"(?P<mat>[^/]+?)(?i:_layer_2\.png)", "entity/equipment/humanoid_leggings/{mat}.png"),
+    ("armor", "leather_layer_", ANY_DIR + r"(?i:leather_layer_1_overlay\.png)", "entity/equipment/humanoid/leather_overlay.png"),
+    ("armor", "leather_layer_", ANY_DIR + r"(?i:leather_layer_2_overlay\.png)", "entity/equipment/humanoid_leggings/leather_overlay.png"),
+    ("armor", "wolf_armor", ANY_DIR + r"(?i:wolf_armor\.png)", "entity/equipment/wolf_body/armadillo_scute.png"),
+    ("armor", "wolf_armor", ANY_DIR + r"(?i:wolf_armor_overlay\.png)", "entity/equipment/wolf_body/armadillo_scute_overlay.png"),
+    ("armor", "turtle_layer_1", ANY_DIR + r"(?i:turtle_layer_1[^/]*)", "entity/equipment/turtle_scute.png"),
+    ("armor", "llama", ANY_DIR + r"(?P<fn>(?i:[^/]*llama[^/]*decor[^/]*|[^/]*decor[^/]*llama[^/]*))", "entity/equipment/llama_body/{fn}"),
+    ("armor", "llama", ANY_DIR + r"(?i:[^/]*decor[^/]*)/(?P<fn>(?i:[^/]*llama[^/]*))", "entity/equipment/llama_body/{fn}"),
+    ("armor", "horse", ANY_DIR + r"(?P<fn>(?i:[^/]*horse[^/]*armor[^/]*|[^/]*armor[^/]*horse[^/]*))", "entity/equipment/horse_body/{fn}"),
+    ("armor", "elytra.png", ANY_DIR + r"(?i:[^/]*elytra\.png)", "entity/equipment/wings/elytra.png"),
+)
+class RelocationMatcher:
+    """
+    A relocation rule table compiled for one pass over the texture index. Rules anchored at a folder are
+    joined into one alternation matched against the whole path; ANY_DIR rules into one matched against just
+    "parent/name", and only when that tail contains one of their keywords (a single literal search, which
+    rejects almost every texture). Alternatives keep the table order; the winning rule's own pattern runs
+    again only on a hit, to pull out its named groups.
+    """
+    def __init__(self, rules=RELOCATION_RULES):
+        self.rules = [(stage, re.compile(pattern), dst) for stage, keyword, pattern, dst in rules]
+        anchored, tail, keywords = [], [], set()
+        for i, (_, keyword, pattern, _) in enumerate(rules):
+            body = re.sub(r"\(\?P<\w+>", "(?:", pattern)
+            if body.startswith(ANY_DIR):
+                tail.append(f"(?P<_r{i}>(?:[^/]*/)?{body[len(ANY_DIR):]})")
+                keywords.add(keyword)
+            else:
+                anchored.append(f"(?P<_r{i}>{body})")
+        self._anchored = re.compile("|".join(anchored)) if anchored else None
+        self._tail = re.compile("|".join(tail)) if tail else None
+        self._keywords = None if None in keywords else re.compile("|".join(map(re.escape, sorted(keywords))))
+    def match(self, rel):
+        """Return (stage, destination) for a path relative to textures/, or None."""
+        m = self._anchored.fullmatch(rel) if self._anchored else None
+        if m is None and self._tail:
+            tail = rel[rel.rfind("/", 0, max(0, rel.rfind("/"))) + 1:]
+            if self._keywords is None or self._keywords.search(tail.lower()):
+                m = self._tail.fullmatch(tail)
+        if m is None:
+            return None
+        stage, pattern, dst = self.rules[int(m.lastgroup[2:])]
+        g = pattern.fullmatch(rel)
+        return stage, dst(g) if callable(dst) else dst.format(**g.groupdict())
+RELOCATIONS = RelocationMatcher()
+SKELETON_DIRS = [
+    "atlases","blockstates","equipment","font/include","items","lang","models/block","models/item",
+    "particles","post_effect","shaders/core","shaders/include","shaders/post",
+    "texts","textures/block","textures/colormap","textures/effect","textures/entity",
+    "textures/font","textures/gui/sprites","textures/item","textures/map","textures/misc",
+    "textures/mob_effect","textures/painting","textures/particle","textures/trims/entity/humanoid",
+    "textures/trims/entity/humanoid_leggings","textures/waypoint_style"
+]
 def ensure_skeleton(root):
-    base = os.path.join(root, "assets", "minecraft")
-    dirs = [
-        "atlases","blockstates","equipment","font/include","items","lang","models/block","models/item",
-        "particles","post_effect","shaders/core","shaders/include","shaders/post",
-        "texts","textures/block","textures/colormap","textures/effect","textures/entity",
-        "textures/font","textures/gui/sprites","textures/item","textures/map","textures/misc",
-        "textures/mob_effect","textures/painting","textures/particle","textures/trims/entity/humanoid",
-        "textures/trims/entity/humanoid_leggings","textures/waypoint_style"
-    ]
+    pack = as_pack(root)
     created = []
-    for d in dirs:
-        p = os.path.join(base, d)
-        if not os.path.isdir(p):
-            safe_mkdir(p)
-            created.append(p)
+    for d in SKELETON_DIRS:
+        rel = "assets/minecraft/" + d
+        if pack.mkdir(rel):
+            created.append(pack.display(rel))
     return created
-def transform_armor_textures(root, log, ui_progress_step, copy_only=True):
-    troot = os.path.join(root, "assets", "minecraft", "textures")
-    if not os.path.isdir(troot):
-        return 0
-    count = 0
-    for cur, dirs, files in os.walk(troot):
-        for fn in files:
-            src = os.path.join(cur, fn)
-            lower = fn.lower()
-            m1 = ARMOR_LAYER_1_RE.match(fn)
-            m2 = ARMOR_LAYER_2_RE.match(fn)
-            m3 = LEATHER_OVERLAY_RE.match(fn)
-            if m1:
-                mat = m1.group("mat")
-                dst = os.path.join(troot, "entity", "equipment", "humanoid", f"{mat}.png")
-            elif m2:
-                mat = m2.group("mat")
-                dst = os.path.join(troot, "entity", "equipment", "humanoid_leggings", f"{mat}.png")
-            elif m3:
-                n = m3.group("n")
-                if n == "1":
-                    dst = os.path.join(troot, "entity", "equipment", "humanoid", "leather_overlay.png")
-                else:
-                    dst = os.path.join(troot, "entity", "equipment", "humanoid_leggings", "leather_overlay.png")
-            elif lower in ("wolf_armor.png", "wolf_armor_overlay.png"):
-                base = "armadillo_scute" if "overlay" not in lower else "armadillo_scute_overlay"
-                dst = os.path.join(troot, "entity", "equipment", "wolf_body", f"{base}.png")
-            elif lower.startswith("turtle_layer_1"):
-                dst = os.path.join(troot, "entity", "equipment", "turtle_scute.png")
-            elif "llama" in lower and ("decor" in lower or "decor" in os.path.basename(cur).lower()):
-                dst = os.path.join(troot, "entity", "equipment", "llama_body", fn)
-            elif "horse" in lower and "armor" in lower:
-                dst = os.path.join(troot, "entity", "equipment", "horse_body", fn)
-            elif lower == "elytra.png" or fn.lower().endswith("elytra.png"):
-                dst = os.path.join(troot, "entity", "equipment", "wings", "elytra.png")
-            else:
+def relocation_for(rel):
+    """(stage, destination) for a pack path that RELOCATIONS moves within its own namespace, else None."""
+    parts = rel.split("/", 3)
+    if len(parts) < 4 or parts[0] != "assets" or parts[2] != "textures":
+        return None
+    hit = RELOCATIONS.match(parts[3])
+    if hit is None:
+        return None
+    dst = textures_root(parts[1]) + hit[1]
+    return (hit[0], dst) if dst != rel else None
+def plan_relocations(root, copy_only=True, plan=None):
+    """
+    Plan every armor and trim texture relocation in one walk of each namespace's textures index: each path is
+    matched once against RELOCATIONS and gets at most one copy/move op inside its namespace, tagged with its rule's stage.
+    """
+    pack = as_pack(root)
+    plan = plan if plan is not None else UpdatePlan()
+    kind = "copy" if copy_only else "move"
+    match = RELOCATIONS.match
+    for ns in pack.index.namespaces():
+        base = textures_root(ns)
+        names = pack.names(base)
+        report_count(pack, "files_scanned", len(names))
+        for src in names:
+            hit = match(src[len(base):])
+            if hit is None:
+                report_count(pack, "files_skipped")
                 continue
-            safe_mkdir(os.path.dirname(dst))
-            try:
-                if copy_only:
-                    shutil.copy2(src, dst)
-                else:
-                    shutil.move(src, dst)
-                count += 1
-                log.append(f"{now_str()} — Armor moved/copied: {src} -> {dst}")
-            except Exception as e:
-                log.append(f"{now_str()} — Armor op failed for {src}: {e}")
-            ui_progress_step()
-    return count
-def transform_trims(root, log, ui_progress_step, copy_only=True):
-    troot = os.path.join(root, "assets", "minecraft", "textures", "trims", "models", "armor")
-    if not os.path.isdir(troot):
-        return 0
+            stage, dst = hit
+            dst = base + dst
+            if dst != src:
+                plan.add(PlanOp(kind, src, dst, stage=stage))
+    return plan
+def execute_file_ops(root, ops, log, ui_progress_step, what):
+    """Run planned copy/move/delete ops in order; what ("Armor", "Trim") prefixes the log lines."""
+    pack = as_pack(root)
     count = 0
-    for fn in os.listdir(troot):
-        src = os.path.join(troot, fn)
-        if not os.path.isfile(src):
-            continue
-        if "_leggings" in fn:
-            newname = fn.replace("_leggings", "")
-            dst = os.path.join(root, "assets", "minecraft", "textures", "trims", "entity", "humanoid_leggings", newname)
-        else:
-            dst = os.path.join(root, "assets", "minecraft", "textures", "trims", "entity", "humanoid", fn)
-        safe_mkdir(os.path.dirname(dst))
+    for op in ops:
+        check_cancel(pack)
         try:
-            if copy_only:
-                shutil.copy2(src, dst)
+            if op.kind == "delete":
+                pack.remove(op.src)
+                log.append(f"{now_str()} — {what} removed (its destination is written by a later rule): {pack.display(op.src)}")
+                ui_progress_step()
+                continue
+            if op.kind == "copy":
+                pack.copy(op.src, op.dst)
             else:
-                shutil.move(src, dst)
+                pack.move(op.src, op.dst)
             count += 1
-            log.append(f"{now_str()} — Trim moved/copied: {src} -> {dst}")
+            log.append(f"{now_str()} — {what} moved/copied: {pack.display(op.src)} -> {pack.display(op.dst)}")
         except Exception as e:
-            log.append(f"{now_str()} — Trim op failed for {src}: {e}")
+            log.append(f"{now_str()} — {what} op failed for {pack.display(op.src)}: {e}")
         ui_progress_step()
     return count
-def update_model_json_paths(root, log, ui_progress_step):
+def transform_armor_textures(root, log, ui_progress_step, copy_only=True):
+    pack = as_pack(root)
+    return execute_file_ops(pack, plan_relocations(pack, copy_only).stage_ops("armor"), log, ui_progress_step, "Armor")
+def transform_trims(root, log, ui_progress_step, copy_only=True):
+    pack = as_pack(root)
+    return execute_file_ops(pack, plan_relocations(pack, copy_only).stage_ops("trims"), log, ui_progress_step, "Trim")
+JSON_REF_DIRS = ("models", "items", "equipment", "atlases", "blockstates")
+ARMOR_REF_LAYER_1_RE = re.compile(r"(?P<mat>[^/]+?)_layer_1(\.png)?$")
+ARMOR_REF_LAYER_2_RE = re.compile(r"(?P<mat>[^/]+?)_layer_2(\.png)?$")
+JSON_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+JSON_POOL_THRESHOLD = 2000
+JSON_POOL_CHUNK = 256
+NAMESPACE_WORKERS = min(8, os.cpu_count() or 1)
+def rewrite_armor_ref(value):
+    """
+    Point an armor layer reference ("ns:path" or a bare minecraft path, .png optional) at the texture's
+    RELOCATIONS destination, e.g. "mymod:models/armor/steel_layer_1" -> "mymod:entity/equipment/humanoid/steel".
+    Anything else is returned unchanged.
+    """
+    if not (ARMOR_REF_LAYER_1_RE.search(value) or ARMOR_REF_LAYER_2_RE.search(value)):
+        return value
+    ns, sep, path = value.rpartition(":")
+    base = textures_root(ns or "minecraft")
+    ext = "" if path.endswith(".png") else ".png"
+    hit = relocation_for(base + path + ext)
+    if hit is None or hit[0] != "armor":
+        return value
+    dst = hit[1][len(base):]
+    return ns + sep + (dst[:-len(ext)] if ext else dst)
+def _rewrite_json_refs_tree(text):
+    data = json.loads(text)
     count = 0
-    models_root = os.path.join(root, "assets", "minecraft", "models")
-    if not os.path.isdir(models_root):
-        return count
-    for dirpath, dirs, files in os.walk(models_root):
-        for fn in files:
-            if not fn.lower().endswith(".json"):
+    def walk_obj(o):
+        nonlocal count
+        if isinstance(o, dict):
+            for k, v in list(o.items()):
+                if isinstance(v, str):
+                    newv = rewrite_armor_ref(v)
+                    if newv != v:
+                        o[k] = newv
+                        count += 1
+                else:
+                    walk_obj(v)
+        elif isinstance(o, list):
+            for it in o:
+                walk_obj(it)
+    walk_obj(data)
+    if not count:
+        return None, 0
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"), count
+def rewrite_json_refs(data):
+    """
+    Rewrite old armor layer references in one JSON file (bytes). Returns (new_bytes, count), or (None, 0)
+    when nothing changes. Files without "_layer_1"/"_layer_2" are rejected by a substring check before
+    any parsing; otherwise only the matching string values are replaced in the original text so the
+    file keeps its formatting. Raises ValueError for invalid JSON.
+    """
+    if b"_layer_1" not in data and b"_layer_2" not in data:
+        return None, 0
+    text = data.decode("utf-8")
+    json.loads(text)
+    out = []
+    pos = 0
+    count = 0
+    for m in JSON_STRING_RE.finditer(text):
+        value = m.group(1)
+        if "_layer_" not in value:
+            continue
+        j = m.start() - 1
+        while j >= 0 and text[j] in " \t\r\n":
+            j -= 1
+        if j < 0 or text[j] != ":":
+            continue
+        if "\\" in value:
+            return _rewrite_json_refs_tree(text)
+        new = rewrite_armor_ref(value)
+        if new != value:
+            out.append(text[pos:m.start() + 1])
+            out.append(new)
+            pos = m.end() - 1
+            count += 1
+    if not count:
+        return None, 0
+    out.append(text[pos:])
+    return "".join(out).encode("utf-8"), count
+def _rewrite_json_chunk(items):
+    results = []
+    for rel, data in items:
+        try:
+            new, n = rewrite_json_refs(data)
+            results.append((rel, new, n, None))
+        except Exception as e:
+            results.append((rel, None, 0, str(e)))
+    return results
+def json_process_pool(max_workers):
+    """
+    Process pool for JSON rewrites, started with forkserver (spawn where there is none), never fork: it is created
+    from processes that already run threads (GUI, JobQueue workers, daemon), and a forked child can inherit a lock
+    another thread was holding.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+def _scan_json_namespace(pack, ns, previous):
+    """Read and prefilter one namespace's reference JSON; returns (reuse ops, rewrite candidates, content hashes)."""
+    reused_ops = []
+    candidates = []
+    hashes = {}
+    for d in JSON_REF_DIRS:
+        for full in pack.names(f"assets/{ns}/{d}/"):
+            if not full.lower().endswith(".json"):
                 continue
-            full = os.path.join(dirpath, fn)
+            check_cancel(pack)
             try:
-                data = json.load(open(full, "r", encoding="utf-8"))
+                data = pack.read(full)
             except Exception:
-                ui_progress_step()
                 continue
-            modified = False
-            def walk_obj(o):
-                nonlocal modified, count
-                if isinstance(o, dict):
-                    for k, v in list(o.items()):
-                        if isinstance(v, str):
-                            newv = v
-                            newv = re.sub(r"(?P<mat>[^/]+?)_layer_1(\.png)?$", r"entity/equipment/humanoid/\g<mat>", newv)
-                            newv = re.sub(r"(?P<mat>[^/]+?)_layer_2(\.png)?$", r"entity/equipment/humanoid_leggings/\g<mat>", newv)
-                            if newv != v:
-                                o[k] = newv
-                                modified = True
-                                count += 1
-                        else:
-                            walk_obj(v)
-                elif isinstance(o, list):
-                    for it in o:
-                        walk_obj(it)
-            walk_obj(data)
-            if modified:
-                try:
-                    write_json_file(full, data)
-                    log.append(f"{now_str()} — Updated model JSON refs in {full}")
-                except Exception as e:
-                    log.append(f"{now_str()} — Failed to write JSON {full}: {e}")
-            ui_progress_step()
+            report_count(pack, "files_scanned")
+            if b"_layer_1" in data or b"_layer_2" in data:
+                hashes[full] = content_hash(data)
+                reused = previous.json_output(full, hashes[full]) if previous else None
+                if reused is not None:
+                    reused_ops.append(PlanOp("rewrite", full, full, ((previous.zin, previous.infos[full]), reused, hashes[full]), "model_json"))
+                    continue
+                candidates.append((full, data))
+            else:
+                report_count(pack, "files_skipped")
+    return reused_ops, candidates, hashes
+def plan_model_json(root, plan=None, workers=None, previous=None):
+    """
+    Plan armor texture reference rewrites for every JSON under assets/<namespace>/{models,items,equipment,atlases,blockstates},
+    for every namespace in the pack. Namespaces are read and prefiltered concurrently (up to NAMESPACE_WORKERS threads) and
+    merged in namespace order; when at least JSON_POOL_THRESHOLD candidates remain in total and workers != 1 they are
+    rewritten on one process pool (workers may also be a running Executor to reuse). Only files that change get a rewrite op
+    carrying the new bytes; candidates whose content hash matches the manifest of a PreviousOutput point at its copy.
+    """
+    pack = as_pack(root)
+    plan = plan if plan is not None else UpdatePlan()
+    namespaces = pack.index.namespaces()
+    if len(namespaces) > 1 and NAMESPACE_WORKERS > 1:
+        with ThreadPoolExecutor(max_workers=min(NAMESPACE_WORKERS, len(namespaces)), thread_name_prefix="mew-ns") as ns_pool:
+            scanned = list(ns_pool.map(lambda ns: _scan_json_namespace(pack, ns, previous), namespaces))
+    else:
+        scanned = [_scan_json_namespace(pack, ns, previous) for ns in namespaces]
+    candidates = []
+    hashes = {}
+    for reused_ops, found, found_hashes in scanned:
+        for op in reused_ops:
+            plan.add(op)
+        candidates.extend(found)
+        hashes.update(found_hashes)
+    del scanned
+    shared = workers if isinstance(workers, Executor) else None
+    workers = 2 if shared else workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(candidates) >= JSON_POOL_THRESHOLD:
+        chunks = [candidates[i:i + JSON_POOL_CHUNK] for i in range(0, len(candidates), JSON_POOL_CHUNK)]
+        with nullcontext(shared) if shared else json_process_pool(workers) as pool:
+            futures = [pool.submit(_rewrite_json_chunk, chunk) for chunk in chunks]
+            results = []
+            try:
+                for fut in futures:
+                    check_cancel(pack)
+                    results.extend(fut.result())
+            except ConversionCancelled:
+                for fut in futures:
+                    fut.cancel()
+                raise
+    else:
+        results = _rewrite_json_chunk(candidates)
+    del candidates
+    for full, new, n, err in results:
+        if new is not None:
+            plan.add(PlanOp("rewrite", full, full, (new, n, hashes[full]), "model_json"))
+        else:
+            report_count(pack, "files_skipped")
+    return plan
+def update_model_json_paths(root, log, ui_progress_step, workers=None, previous=None, manifest=None, plan=None):
+    """Write the model JSON rewrites of plan (planned here when not given); returns the number of refs changed."""
+    pack = as_pack(root)
+    plan = plan if plan is not None else plan_model_json(pack, workers=workers, previous=previous)
+    count = 0
+    for op in plan.stage_ops("model_json"):
+        check_cancel(pack)
+        body, n, digest = op.data
+        try:
+            if isinstance(body, tuple):
+                pack.adopt(op.dst, *body)
+                report_count(pack, "outputs_reused")
+                log.append(f"{now_str()} — Reused model JSON {pack.display(op.dst)}")
+            else:
+                pack.write(op.dst, body)
+                log.append(f"{now_str()} — Updated model JSON refs in {pack.display(op.dst)}")
+            count += n
+            if manifest is not None:
+                manifest.json[op.dst] = [digest, n]
+        except Exception as e:
+            log.append(f"{now_str()} — Failed to write JSON {pack.display(op.dst)}: {e}")
+        ui_progress_step()
     return count
-def update_pack_mcmeta(packroot, log, ui_progress_step):
-    p = os.path.join(packroot, "pack.mcmeta")
+def update_pack_mcmeta(packroot, log, ui_progress_step, manifest=None, timestamp=None):
+    pack = as_pack(packroot)
     mc = {}
-    if os.path.isfile(p):
+    if pack.isfile("pack.mcmeta"):
         try:
-            mc = json.load(open(p, "r", encoding="utf-8"))
+            mc = json.loads(pack.read("pack.mcmeta").decode("utf-8"))
         except Exception:
             mc = {}
     if "pack" not in mc:
@@ -334,9 +1774,11 @@ def update_pack_mcmeta(packroot, log, ui_progress_step):
     mc["pack"]["pack_format"] = 64
     mc["pack"]["description"] = MCMETA_TEXT_COMPONENT
     mc["pack"]["pack_description_legacy"] = "Updated with MewUpdater"
-    mc["mew_updater"] = {"updated_by": APP_NAME, "timestamp": now_str()}
+    mc["mew_updater"] = {"updated_by": APP_NAME, "timestamp": timestamp or now_str()}
+    if manifest is not None:
+        mc["mew_updater"]["manifest"] = manifest.to_dict()
     try:
-        write_json_file(p, mc)
+        pack.write("pack.mcmeta", json.dumps(mc, ensure_ascii=False, indent=2).encode("utf-8"))
         log.append(f"{now_str()} — Updated pack.mcmeta (pack_format=64).")
         ui_progress_step()
         return True
@@ -344,350 +1786,1138 @@ def update_pack_mcmeta(packroot, log, ui_progress_step):
         log.append(f"{now_str()} — Failed to write pack.mcmeta: {e}")
         ui_progress_step()
         return False
-def write_changelog(root, log_lines):
-    changepath = os.path.join(root, "mewupdater_changelog.txt")
-    content = f"MewUpdater changelog — {now_str()}\n\n" + "\n".join(log_lines) + "\n"
-    write_text_file(changepath, content)
-    return changepath
-def run_full_update(workdir, ui_log_fn, ui_progress_set, replace_originals=False, mappings=None):
-    """
-    Runs all transforms and uses UI callbacks to report progress/logs.
+LOG_STAMP_RE = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d — ")
+VANILLA_EQUIPMENT_ASSETS = frozenset((
+    "leather", "leather_overlay", "chainmail", "iron", "gold", "diamond", "netherite", "turtle_scute",
+    "armadillo_scute", "armadillo_scute_overlay", "elytra", "trader_llama", "white", "orange", "magenta",
+    "light_blue", "yellow", "lime", "pink", "gray", "light_gray", "cyan", "purple", "blue", "brown", "green",
+    "red", "black",
+))
+VALIDATE_JSON_DIRS = ("models", "items", "blockstates", "atlases", "equipment")
+VALIDATE_LOG_LIMIT = 50
+VALIDATE_TEXTURES_RE = re.compile(rb'"textures"\s*:\s*\{([^{}]*)\}')
+VALIDATE_PAIR_RE = re.compile(rb'"[^"\\]*"\s*:\s*"([^"\\]*)"')
+VALIDATE_KEY_RE = {
+    "models": re.compile(rb'"(parent)"\s*:\s*"([^"\\]*)"'),
+    "items": re.compile(rb'"(model)"\s*:\s*"([^"\\]*)"'),
+    "blockstates": re.compile(rb'"(model)"\s*:\s*"([^"\\]*)"'),
+    "atlases": re.compile(rb'"(resource)"\s*:\s*"([^"\\]*)"'),
+}
+def _resource_file(ref, kind):
+    """Map a resource location ("ns:path" or "path") to its pack file under kind ("textures"/"models")."""
+    ns, _, path = ref.rpartition(":")
+    return f"assets/{ns or 'minecraft'}/{kind}/{path}" + (".png" if kind == "textures" else ".json")
+def validate_pack(root, mappings=None, plan=None):
+    """
+    Check a converted pack against its own file index, reading only JSON: every texture/model reference in
+    model, item, blockstate, atlas and equipment JSON, sprite .mcmeta files without their texture, equipment
+    textures nothing can load, and slicer outputs missing for inputs the pack has. References to vanilla
+    resources cannot be checked without the game assets, so a missing target is only reported when the pack
+    must provide it: another namespace, a file the conversion moved away (from plan), a non-vanilla
+    entity/equipment texture, or any entity/equipment texture referenced from a JSON file the conversion
+    rewrote (from plan), since those now point where the conversion put the pack's own armor. Values are
+    scanned with regexes over the raw bytes, never parsed (except the few equipment files). Returns a dict
+    of counts and the offending (file, reference) pairs / paths.
+    """
+    pack = as_pack(root)
+    started = time.perf_counter()
+    index = pack.index
+    ops = [op for op in plan.ops if op is not None] if plan is not None else ()
+    moved = {op.src for op in ops if op.kind in ("move", "delete")}
+    rewritten = {op.dst for op in ops if op.kind == "rewrite"}
+    unresolved = []
+    referenced = set()
+    files = refs = 0
+    verdicts = {}
+    def classify(ref, kind, strict):
+        """0 = not a file reference (template variable, builtin), 1 = fine, 2 = must be reported."""
+        if not ref or ref.startswith("#") or ref.startswith("builtin/") or ref.startswith("minecraft:builtin/"):
+            return 0
+        target = _resource_file(ref, kind)
+        referenced.add(target)
+        if target in index:
+            return 1
+        ns = target.split("/", 2)[1]
+        path = target[len(ns) + len(kind) + 9:]
+        must = target in moved or ns != "minecraft" or (kind == "textures" and path.startswith("entity/equipment/")
+                                                        and (strict or path.rsplit("/", 1)[-1][:-4] not in VANILLA_EQUIPMENT_ASSETS))
+        return 2 if must else 1
+    def check(rel, ref, kind):
+        nonlocal refs
+        strict = rel in rewritten
+        verdict = verdicts.get((ref, kind, strict))
+        if verdict is None:
+            verdict = verdicts[(ref, kind, strict)] = classify(ref, kind, strict)
+        if verdict:
+            refs += 1
+            if verdict == 2:
+                unresolved.append((rel, ref))
+    sidecars = []
+    equipment = []
+    for rel in index.under("assets/"):
+        parts = rel.split("/", 3)
+        if len(parts) < 4:
+            continue
+        d = parts[2]
+        if d == "textures":
+            if rel.endswith(".png.mcmeta"):
+                sidecars.append(rel)
+            elif parts[3].startswith("entity/equipment/") and rel.endswith(".png"):
+                equipment.append(rel)
+            continue
+        if d not in VALIDATE_JSON_DIRS or not rel.endswith(".json"):
+            continue
+        try:
+            data = pack.read(rel)
+        except Exception:
+            continue
+        files += 1
+        if d == "equipment":
+            try:
+                layers = json.loads(data).get("layers", {})
+            except Exception:
+                continue
+            for layer, entries in (layers.items() if isinstance(layers, dict) else ()):
+                for entry in entries if isinstance(entries, list) else ():
+                    texture = entry.get("texture") if isinstance(entry, dict) else None
+                    if isinstance(texture, str):
+                        ns, _, name = texture.rpartition(":")
+                        check(rel, f"{ns or 'minecraft'}:entity/equipment/{layer}/{name}", "textures")
+            continue
+        if d == "models":
+            for block in VALIDATE_TEXTURES_RE.findall(data):
+                for value in VALIDATE_PAIR_RE.findall(block):
+                    check(rel, value.decode("utf-8", "replace"), "textures")
+        for key, value in VALIDATE_KEY_RE[d].findall(data):
+            check(rel, value.decode("utf-8", "replace"), "textures" if key == b"resource" else "models")
+    orphaned = [rel for rel in sidecars if rel[:-len(".mcmeta")] not in index]
+    orphaned += [rel for rel in equipment if rel not in referenced and rel.rsplit("/", 1)[-1][:-4] not in VANILLA_EQUIPMENT_ASSETS]
+    missing = []
+    if mappings:
+        inputs = plan.slicer_inputs if plan is not None else [(k, find_slicer_input(pack, k)) for k in mappings]
+        pruned = plan.pruned if plan is not None else ()
+        for in_path, img_file in inputs:
+            if img_file is None:
+                continue
+            for out_path, _, metadata in mappings.get(in_path, ()):
+                if out_path in pruned:
+                    continue
+                for rel in (out_path, out_path + ".mcmeta") if metadata else (out_path,):
+                    if rel not in index:
+                        missing.append(rel)
+    return {"json_files": files, "references": refs, "unresolved": unresolved, "orphaned": orphaned,
+            "missing_slicer_outputs": missing, "seconds": time.perf_counter() - started}
+def format_validation(result, display=str, limit=VALIDATE_LOG_LIMIT):
+    """Log lines for a validate_pack result: one summary line, then up to limit lines per problem kind."""
+    lines = [f"{now_str()} — Validated {result['references']} references in {result['json_files']} JSON files: "
+             f"{len(result['unresolved'])} unresolved, {len(result['orphaned'])} orphaned sprites, "
+             f"{len(result['missing_slicer_outputs'])} missing slicer outputs"]
+    for label, items in (("Unresolved reference", [f"{display(rel)}: {ref}" for rel, ref in result["unresolved"]]),
+                         ("Orphaned sprite", [display(rel) for rel in result["orphaned"]]),
+                         ("Missing slicer output", [display(rel) for rel in result["missing_slicer_outputs"]])):
+        for item in items[:limit]:
+            lines.append(f"{now_str()} — {label}: {item}")
+        if len(items) > limit:
+            lines.append(f"{now_str()} — ... and {len(items) - limit} more ({label.lower()}s)")
+    return lines
+def write_changelog(root, log_lines, timestamp=None):
+    """
+    Write mewupdater_changelog.txt. A fixed timestamp (reproducible builds) also drops the per-line
+    times and the input/scratch folder path so the changelog depends only on the pack contents.
+    """
+    pack = as_pack(root)
+    if timestamp:
+        root_dir = getattr(pack, "root", None)
+        log_lines = [LOG_STAMP_RE.sub("", line) for line in log_lines]
+        if root_dir:
+            log_lines = [line.replace(root_dir + os.sep, "") for line in log_lines]
+        log_lines = [line.replace(pack.label, os.path.basename(pack.label)) for line in log_lines]
+    content = f"MewUpdater changelog — {timestamp or now_str()}\n\n" + "\n".join(log_lines) + "\n"
+    pack.write("mewupdater_changelog.txt", content.encode("utf-8"))
+    return pack.display("mewupdater_changelog.txt")
+def pack_manifest_preview(index, mappings=None):
+    """
+    Cheap counts from a PackIndex alone (no file contents read) for the "Files to modify" preview. Without
+    contents the _layer_1/_layer_2 prefilter cannot run, so every JSON that could hold an armor reference is
+    counted: files_to_modify_max is an upper bound for a run that keeps the originals (dry_run is exact).
+    """
+    armor = trims = 0
+    jsons = 0
+    for ns in index.namespaces():
+        base = textures_root(ns)
+        for p in index.under(base):
+            hit = RELOCATIONS.match(p[len(base):])
+            if hit is not None:
+                if hit[0] == "trims":
+                    trims += 1
+                else:
+                    armor += 1
+        for d in JSON_REF_DIRS:
+            jsons += sum(1 for p in index.under(f"assets/{ns}/{d}/") if p.lower().endswith(".json"))
+    slicer_inputs = 0
+    slicer_outputs = 0
+    slicer_meta = 0
+    for in_path, out_list in (mappings or {}).items():
+        if in_path in index or index.find_basename(os.path.basename(in_path), "assets/"):
+            slicer_inputs += 1
+            slicer_outputs += len(out_list)
+            slicer_meta += sum(1 for _, _, meta in out_list if meta is not None)
+    return {
+        "members": len(index), "uncompressed_bytes": index.total_size(),
+        "slicer_inputs": slicer_inputs, "slicer_outputs": slicer_outputs,
+        "armor_layers": armor, "trims": trims, "reference_jsons": jsons,
+        # + pack.mcmeta and the changelog
+        "files_to_modify_max": armor + trims + slicer_outputs + slicer_meta + jsons + 2,
+    }
+def detect_pack_info(path, mappings=None):
+    """
+    Read pack.mcmeta and a manifest preview without extracting anything: zips are read from the
+    central directory plus the single pack.mcmeta member (also when nested in one top-level folder).
+    """
+    if os.path.isdir(path):
+        index = PackIndex.from_dir(path)
+        mc = read_pack_mcmeta(path)
+        root = ""
+    else:
+        with zipfile.ZipFile(path, "r") as z:
+            root = zip_pack_prefix(z.namelist())
+            index = PackIndex.from_zip(z, root)
+            try:
+                mc = json.loads(z.read(root + "pack.mcmeta").decode("utf-8"))
+            except Exception:
+                mc = None
+    pf = None
+    if mc and isinstance(mc.get("pack"), dict):
+        pf = mc["pack"].get("pack_format")
+    info = {"pack_format": pf, "root": root}
+    info.update(pack_manifest_preview(index, mappings))
+    return info
+def plan_update(root, mappings=None, replace_originals=False, json_workers=None, previous=None):
+    """
+    Build the full UpdatePlan for a pack without writing anything: armor and trim relocations, slicer
+    crops, model JSON rewrites, plus the pack.mcmeta and changelog writes.
+    """
+    pack = as_pack(root)
+    plan = UpdatePlan()
+    plan_relocations(pack, copy_only=not replace_originals, plan=plan)
+    if mappings:
+        plan_slicer(pack, mappings, plan)
+    plan_model_json(pack, plan, workers=json_workers, previous=previous)
+    plan.add(PlanOp("write-meta", None, "pack.mcmeta", stage="mcmeta"))
+    plan.add(PlanOp("write-meta", None, "mewupdater_changelog.txt", stage="changelog"))
+    return plan
+def open_pack_view(path):
+    """Read-only-source pack view for a path: OverlayPack for folders, ZipStreamPack for zips."""
+    return OverlayPack(path) if os.path.isdir(path) else ZipStreamPack(path)
+def dry_run(path, mappings=None, replace_originals=False, json_workers=None):
+    """
+    Plan the conversion of a pack without writing anything. Returns (plan summary dict, diff lines);
+    the summary's files_to_modify is the exact number of paths the conversion would create, change or remove.
+    """
+    with open_pack_view(path) as pack:
+        plan = plan_update(pack, mappings, replace_originals, json_workers)
+        return plan.summary(), plan.diff(pack)
+def run_full_update(workdir, ui_log_fn, ui_progress_set, replace_originals=False, mappings=None, counts=None, slice_workers=None, json_workers=None, report=None, previous=None, sprite_cache=None, reproducible=False, cancel=None, validate=True, prune=None):
+    """
+    Plans all transforms (plan_update), then runs the plan stage by stage and uses UI callbacks to report progress/logs.
     ui_log_fn(msg) -> append msg to log
     ui_progress_set(value) -> set progress 0.0-1.0
+    workdir is a folder path or a pack view (DirPack / ZipStreamPack / OverlayPack).
+    counts, if given, is a dict filled with the number of changes made by each transform.
+    slice_workers sets the slicer thread pool size (default SLICER_WORKERS); json_workers the process
+    pool used for large JSON rewrites (default: all cores, 1 = in-process).
+    report, if given, is a ConversionReport that receives per-stage timings and I/O counters.
+    previous, if given, is a PreviousOutput whose sprites and model JSON are reused where the inputs
+    are unchanged; a manifest of input hashes is always written into pack.mcmeta for the next run.
+    sprite_cache, if given, is the SpriteCache used by the slicer; prune, if given, the SpritePruner.
+    reproducible pins the pack.mcmeta and changelog timestamps (SOURCE_DATE_EPOCH or 1980-01-01).
+    cancel, if given, is a CancelToken checked between stages, files and crop jobs; a cancelled run raises
+    ConversionCancelled and leaves the pack view half-converted, so callers must discard it.
+    validate runs validate_pack on the result before the changelog is written; its findings are logged,
+    counted (unresolved_refs, orphaned_sprites, missing_slicer_outputs) and kept on report.validation.
     """
+    pack = as_pack(workdir)
+    manifest = ConversionManifest()
+    stamp = reproducible_datetime().strftime("%Y-%m-%d %H:%M:%S") if reproducible else None
+    report = report or ConversionReport(pack.label)
+    pack.report = report
+    pack.cancel = cancel
     log = []
+    if counts is None:
+        counts = {}
     def logit(msg):
         log.append(msg); ui_log_fn(msg)
-    logit(f"{now_str()} — Starting update in {workdir}")
-    created_dirs = ensure_skeleton(workdir)
+    logit(f"{now_str()} — Starting update in {pack.label}")
+    with report.stage("index"):
+        logit(f"{now_str()} — Indexed {len(pack.index)} files ({pack.index.total_size()} bytes)")
+    check_cancel(pack)
+    with report.stage("skeleton"):
+        created_dirs = ensure_skeleton(pack)
     for d in created_dirs:
         logit(f"{now_str()} — Created dir: {d}")
-    total_steps = 5
+    counts["skeleton_dirs"] = len(created_dirs)
+    check_cancel(pack)
+    with report.stage("plan"):
+        plan = plan_update(pack, mappings, replace_originals, json_workers, previous)
+    counts["planned"] = len(plan)
+    logit(f"{now_str()} — Planned {len(plan)} operations on {plan.files_to_modify()} files ({plan.dropped} duplicates dropped)")
     mapping_count = sum(len(v) for v in (mappings.values() if mappings else []))
-    total_steps += mapping_count + 30
+    total_steps = len(plan) + 5
     step = 0
     def ui_step():
         nonlocal step
         step += 1
         ui_progress_set(min(1.0, step / max(1, total_steps)))
     logit(f"{now_str()} — Processing armor textures...")
-    c1 = transform_armor_textures(workdir, log, ui_step, copy_only=not replace_originals)
+    check_cancel(pack)
+    with report.stage("armor"):
+        c1 = execute_file_ops(pack, plan.stage_ops("armor"), log, ui_step, "Armor")
+    counts["armor"] = c1
     logit(f"{now_str()} — Armor/equipment textures processed: {c1}")
     logit(f"{now_str()} — Processing trims...")
-    c2 = transform_trims(workdir, log, ui_step, copy_only=not replace_originals)
+    check_cancel(pack)
+    with report.stage("trims"):
+        c2 = execute_file_ops(pack, plan.stage_ops("trims"), log, ui_step, "Trim")
+    counts["trims"] = c2
     logit(f"{now_str()} — Trim textures processed: {c2}")
     if mappings:
+        check_cancel(pack)
         logit(f"{now_str()} — Applying official slicer mappings ({mapping_count} outputs)...")
-        c3 = apply_slicer_mappings(workdir, mappings, log, ui_step)
+        with report.stage("slicer"):
+            c3 = apply_slicer_mappings(pack, mappings, log, ui_step, workers=slice_workers, previous=previous, manifest=manifest, cache=sprite_cache, plan=plan, prune=prune)
         logit(f"{now_str()} — GUI sprites created: {c3}")
+        if prune is not None:
+            c = report.counters
+            counts["sprites_dropped"] = len(plan.pruned)
+            logit(f"{now_str()} — Dropped {c['sprites_empty']} empty and {c['sprites_vanilla']} vanilla sprites "
+                  f"(~{c['sprite_bytes_saved']} bytes saved); {c['sprites_shared']} duplicate crops encoded once")
     else:
+        c3 = 0
         logit(f"{now_str()} — No slicer.txt found — skipping official slicer mapping.")
         for _ in range(5):
             ui_step()
+    counts["sprites"] = c3
     logit(f"{now_str()} — Updating model JSON references...")
-    c4 = update_model_json_paths(workdir, log, ui_step)
+    check_cancel(pack)
+    with report.stage("model_json"):
+        c4 = update_model_json_paths(pack, log, ui_step, manifest=manifest, plan=plan)
+    counts["model_refs"] = c4
     logit(f"{now_str()} — Model JSON refs updated: {c4}")
-    update_pack_mcmeta(workdir, log, ui_step)
-    changepath = write_changelog(workdir, log)
+    check_cancel(pack)
+    with report.stage("mcmeta"):
+        counts["mcmeta"] = 1 if update_pack_mcmeta(pack, log, ui_step, manifest=manifest, timestamp=stamp) else 0
+    if previous is not None:
+        counts["reused"] = report.counters.get("outputs_reused", 0)
+        logit(f"{now_str()} — Reused from previous output: {counts['reused']} files")
+    if validate:
+        check_cancel(pack)
+        with report.stage("validate"):
+            result = validate_pack(pack, mappings, plan)
+        for line in format_validation(result, pack.display):
+            logit(line)
+        counts["unresolved_refs"] = len(result["unresolved"])
+        counts["orphaned_sprites"] = len(result["orphaned"])
+        counts["missing_slicer_outputs"] = len(result["missing_slicer_outputs"])
+        report.validation = result
+    check_cancel(pack)
+    with report.stage("changelog"):
+        changepath = write_changelog(pack, log, timestamp=stamp)
     logit(f"{now_str()} — Wrote changelog: {changepath}")
     ui_progress_set(1.0)
     return log
-class MewApp(ctk.CTkFrame):
-    def __init__(self, master=None):
-        """
-        MewApp is now a CTkFrame that can be embedded into a DnD-enabled root (TkinterDnD.Tk).
-        If master is None we create a CTk window and pack this frame into it (backwards-compatible).
-        """
-        super().__init__(master)
-        ctk.set_appearance_mode("system")
-        ctk.set_default_color_theme("dark-blue")
-        if master is not None:
-            try:
-                master.title(APP_NAME)
-                master.geometry("980x680")
-                master.minsize(860, 540)
-            except Exception:
-                pass
-            self.pack(fill="both", expand=True)
+WORKDIR_PREFIX = "mew_update_"
+STALE_WORKDIR_SECONDS = 24 * 3600
+def remove_stale_workdirs(max_age=STALE_WORKDIR_SECONDS):
+    """
+    Delete temp work folders left behind by conversions whose process died (a clean or cancelled run
+    removes its own). Only folders untouched for max_age seconds go, so concurrent batch workers are safe.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for p in glob.glob(os.path.join(tempfile.gettempdir(), WORKDIR_PREFIX + "*")):
+        try:
+            if os.path.isdir(p) and os.path.getmtime(p) < cutoff:
+                shutil.rmtree(p, ignore_errors=True)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+def unique_output_path(path, out_dir=None, reserved=None, incremental=False):
+    """
+    Return <name>-mewupdated.zip next to the input (or inside out_dir), adding _1, _2... while the name is taken.
+    reserved is an optional set of paths already handed out (used by batch runs before any file exists).
+    With incremental set an existing file is not skipped: it is the previous output to update.
+    """
+    base = os.path.basename(os.path.abspath(path))
+    name = os.path.splitext(base)[0] if not os.path.isdir(path) else base
+    parent = out_dir if out_dir else os.path.dirname(os.path.abspath(path))
+    out_zip = os.path.join(parent, name + SUFFIX + ".zip")
+    i = 1
+    final_out = out_zip
+    while (os.path.exists(final_out) and not incremental) or (reserved is not None and final_out in reserved):
+        final_out = out_zip[:-len(".zip")] + f"_{i}.zip"; i += 1
+    if reserved is not None:
+        reserved.add(final_out)
+    return final_out
+def convert_pack(path, out_zip=None, mappings=None, replace_originals=False, ui_log_fn=None, ui_progress_set=None, stream=True, slice_workers=None, json_workers=None, write_report=True, incremental=False, sprite_cache=True, zip_level=ZIP_DEFLATE_LEVEL, zip_workers=None, reproducible=False, cancel=None, validate=True, prune_sprites=False, vanilla_assets=None):
+    """
+    Convert one pack (.zip or folder) without any UI and write the updated zip.
+    Zip inputs are streamed member-by-member into the output and folders are read in place through an
+    OverlayPack unless stream=False, in which case they are extracted (or cloned/hardlinked) to a temp folder.
+    With incremental set, an existing output at the target path is treated as the previous run:
+    sprites and model JSON whose inputs are unchanged are copied from it instead of recomputed.
+    The zip is written to <output>.part and renamed over the target only once complete.
+    sprite_cache is a SpriteCache, True for the default one in the config folder, or False/None to disable it.
+    The output is written by ParallelZipWriter on zip_workers threads: PNG/OGG stored, other files deflated at
+    zip_level; reproducible sorts entries and pins every timestamp so identical inputs give identical zips.
+    cancel is an optional CancelToken (pause/cancel from another thread): a cancelled conversion stops at the
+    next file or crop job, deletes its .part file and temp folder and leaves any existing output untouched.
+    validate checks the converted pack's references (validate_pack) before it is zipped; problems are logged
+    and counted but do not fail the conversion.
+    prune_sprites runs a SpritePruner over the slicer: empty crops, and with vanilla_assets (a client jar,
+    or a zip or folder of its assets) crops identical to the default sprite, are not written.
+    A ConversionReport (per-stage wall/CPU time, I/O counters, peak RSS) is returned in the summary
+    and, when write_report is set, written as <output>.report.json next to the output pack.
+    Returns a summary dict: input, output, ok, error, cancelled, counts, seconds, log, report, report_path.
+    """
+    ui_log_fn = ui_log_fn or (lambda s: None)
+    ui_progress_set = ui_progress_set or (lambda v: None)
+    started = time.perf_counter()
+    summary = {"input": path, "output": None, "ok": False, "error": None, "cancelled": False, "counts": {}, "seconds": 0.0,
+               "log": [], "report": None, "report_path": None}
+    report = ConversionReport(path)
+    final_out = out_zip or unique_output_path(path, incremental=incremental)
+    part_out = final_out + ".part"
+    tmpdir = None
+    previous = None
+    if incremental and os.path.isfile(final_out):
+        try:
+            previous = PreviousOutput(final_out)
+            ui_log_fn(f"{now_str()} — Incremental: reusing unchanged outputs from {final_out}")
+        except Exception as e:
+            ui_log_fn(f"{now_str()} — Incremental: cannot read previous output ({e}); converting everything")
+    options = dict(replace_originals=replace_originals, mappings=mappings or None, counts=summary["counts"],
+                   slice_workers=slice_workers, json_workers=json_workers, report=report, previous=previous,
+                   sprite_cache=SpriteCache() if sprite_cache is True else sprite_cache or None, reproducible=reproducible,
+                   cancel=cancel, validate=validate)
+    zip_options = dict(workers=zip_workers, level=zip_level, reproducible=reproducible, cancel=cancel)
+    try:
+        if prune_sprites:
+            options["prune"] = SpritePruner(vanilla_assets, mappings)
+        if stream:
+            with report.stage("load"):
+                pack = open_pack_view(path)
+            with pack:
+                summary["log"] = run_full_update(pack, ui_log_fn, ui_progress_set, **options)
+                ui_log_fn(f"{now_str()} — Streaming updated pack to {final_out} ...")
+                with report.stage("zip"):
+                    pack.save(part_out, **zip_options)
         else:
-            self._internal_root = ctk.CTk()
+            remove_stale_workdirs()
+            tmpdir = tempfile.mkdtemp(prefix=WORKDIR_PREFIX)
+            with report.stage("load"):
+                workdir = os.path.join(tmpdir, "work")
+                if os.path.isdir(path):
+                    shutil.copytree(path, workdir, copy_function=lambda src, dst: clone_file(src, dst, hardlink=True))
+                else:
+                    extract_zip_to_dir(path, workdir)
+                    report.add("bytes_read", os.path.getsize(path))
+            ui_log_fn(f"{now_str()} — Work dir: {workdir}")
+            work = DirPack(workdir, hardlink=True)
+            work.label = path
+            summary["log"] = run_full_update(work, ui_log_fn, ui_progress_set, **options)
+            ui_log_fn(f"{now_str()} — Zipping updated pack to {final_out} ...")
+            with report.stage("zip"):
+                create_zip_from_dir(workdir, part_out, **zip_options)
+            report.add("bytes_written", os.path.getsize(part_out))
+        if previous is not None:
+            previous.close()
+            previous = None
+        if cancel is not None:
+            cancel.check()
+        os.replace(part_out, final_out)
+        ui_log_fn(f"{now_str()} — Wrote updated pack: {final_out}")
+        summary["output"] = final_out
+        summary["ok"] = True
+    except ConversionCancelled:
+        summary["error"] = "cancelled"
+        summary["cancelled"] = True
+        ui_log_fn(f"{now_str()} — Update cancelled; no output written")
+    except Exception as e:
+        summary["error"] = str(e)
+        ui_log_fn(f"{now_str()} — ERROR during update: {e}")
+    finally:
+        if previous is not None:
+            previous.close()
+        if os.path.exists(part_out):
+            os.remove(part_out)
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        summary["seconds"] = time.perf_counter() - started
+    report.finish(summary["output"], summary["ok"], summary["error"], summary["counts"])
+    summary["report"] = report.to_dict()
+    if write_report and summary["ok"]:
+        try:
+            summary["report_path"] = report.write(report_path_for(final_out))
+            ui_log_fn(f"{now_str()} — Wrote report: {summary['report_path']}")
+        except Exception as e:
+            ui_log_fn(f"{now_str()} — Failed to write report: {e}")
+    return summary
+class LogChannel:
+    """
+    Thread-safe hand-off of log lines and progress from a conversion worker to the UI.
+    The worker calls log()/progress()/finish(); the UI calls drain() on a timer and gets every pending
+    line in one batch, only the latest progress value, and the final summary once. Every line is also
+    appended to log_path so the full log survives the capped on-screen view.
+    """
+    def __init__(self, log_path=None):
+        self._lock = threading.Lock()
+        self._lines = []
+        self._progress = None
+        self._summary = None
+        self.log_path = log_path
+        self._file = None
+        if log_path:
+            safe_mkdir(os.path.dirname(log_path))
+            self._file = open(log_path, "a", encoding="utf-8")
+    def log(self, msg):
+        with self._lock:
+            self._lines.append(msg)
+            if self._file:
+                self._file.write(msg + "\n")
+    def progress(self, value):
+        with self._lock:
+            self._progress = value
+    def finish(self, summary):
+        with self._lock:
+            self._summary = summary
+            if self._file:
+                self._file.close()
+                self._file = None
+    def drain(self):
+        """Return (lines, latest_progress_or_None, summary_or_None) and reset the pending state."""
+        with self._lock:
+            lines, self._lines = self._lines, []
+            progress, self._progress = self._progress, None
+            summary, self._summary = self._summary, None
+        return lines, progress, summary
+LOG_KEEP_FILES = 200
+LOG_MAX_AGE_SECONDS = 14 * 24 * 3600
+def prune_logs(folder=None, keep=LOG_KEEP_FILES, max_age=LOG_MAX_AGE_SECONDS):
+    """Delete job logs older than max_age seconds and all but the `keep` newest; returns how many went."""
+    folder = folder or os.path.join(config_dir(), "logs")
+    try:
+        logs = sorted(((e.stat().st_mtime, e.path) for e in os.scandir(folder) if e.is_file() and e.name.endswith(".log")), reverse=True)
+    except OSError:
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for i, (mtime, path) in enumerate(logs):
+        if i >= keep or mtime < cutoff:
             try:
-                self._internal_root.title(APP_NAME)
-                self._internal_root.geometry("980x680")
-                self._internal_root.minsize(860, 540)
-            except Exception:
+                os.remove(path)
+                removed += 1
+            except OSError:
                 pass
-            self.pack(fill="both", expand=True)
-        self.mappings = load_slicer_mappings(SLICER_TXT)
-        self._build_ui()
-        self.current_theme = "dark"
-        self.animating = False
-    def _build_ui(self):
-        header = ctk.CTkFrame(self, fg_color="transparent")
-        header.pack(fill="x", padx=12, pady=8)
-        self.logo_label = ctk.CTkLabel(header, text="")
-        self.logo_label.pack(expand=True)
-        self._render_logo_large("MewUpdater")
-        main = ctk.CTkFrame(self)
-        main.pack(fill="both", expand=True, padx=12, pady=8)
-        sidebar = ctk.CTkFrame(main, width=220, corner_radius=12)
-        sidebar.pack(side="left", fill="y", padx=(0,12), pady=6)
-        sidebar.pack_propagate(False)
-        ctk.CTkLabel(sidebar, text=APP_NAME, font=ctk.CTkFont(size=18, weight="bold")).pack(pady=(10,8))
-        self.buttons = []
-        def mkbtn(text, cmd):
-            b = ctk.CTkButton(sidebar, text=text, command=cmd, corner_radius=8, fg_color=PINK)
-            b.pack(fill="x", padx=12, pady=6)
-            b.bind("<Enter>", lambda e, btn=b: btn.configure(fg_color=PINK_HOVER))
-            b.bind("<Leave>", lambda e, btn=b: btn.configure(fg_color=PINK))
-            self.buttons.append(b)
-            return b
-        mkbtn("Open Pack", self.open_pack)
-        mkbtn("Browse Folder", self.browse_folder)
-        mkbtn("Update Pack", self.update_pack)
-        mkbtn("Toggle Theme", self.toggle_theme_animated)
-        mkbtn("Quit", self.quit)
-        ctk.CTkLabel(sidebar, text="Options", anchor="w").pack(fill="x", padx=12, pady=(6,0))
-        self.replace_var = ctk.BooleanVar(value=False)
-        ctk.CTkCheckBox(sidebar, text="Replace originals", variable=self.replace_var).pack(anchor="w", padx=12, pady=8)
-        center = ctk.CTkFrame(main)
-        center.pack(side="left", fill="both", expand=True, padx=(0,12), pady=6)
-        info = ctk.CTkFrame(center)
-        info.pack(fill="x", padx=8, pady=(6,8))
-        ctk.CTkLabel(info, text="Selected Pack:").grid(row=0, column=0, sticky="w", padx=6, pady=(6,4))
-        self.path_var = ctk.StringVar()
-        self.entry = ctk.CTkEntry(info, textvariable=self.path_var, width=520)
-        self.entry.grid(row=1, column=0, sticky="we", padx=6)
-        browse_btn = ctk.CTkButton(info, text="Browse", command=self.browse_file, width=120, fg_color=PINK)
-        browse_btn.grid(row=1, column=1, sticky="e", padx=6)
-        browse_btn.bind("<Enter>", lambda e: browse_btn.configure(fg_color=PINK_HOVER))
-        browse_btn.bind("<Leave>", lambda e: browse_btn.configure(fg_color=PINK))
-        ctk.CTkLabel(info, text="Detected Version:").grid(row=2, column=0, sticky="w", padx=6, pady=(12,4))
-        self.detect_var = ctk.StringVar(value="None")
-        ctk.CTkLabel(info, textvariable=self.detect_var, font=ctk.CTkFont(size=16, weight="bold")).grid(row=3, column=0, sticky="w", padx=6)
-        preview = ctk.CTkFrame(center)
-        preview.pack(fill="both", expand=True, padx=8, pady=(0,8))
-        ctk.CTkLabel(preview, text="Preview / Log").pack(anchor="w", padx=8, pady=(8,0))
-        self.logbox = ctk.CTkTextbox(preview, wrap="word")
-        self.logbox.pack(fill="both", expand=True, padx=8, pady=8)
-        self.logbox.configure(state="disabled")
-        right = ctk.CTkFrame(main, width=260)
-        right.pack(side="right", fill="y", pady=6)
-        right.pack_propagate(False)
-        ctk.CTkLabel(right, text="Actions", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(8,6))
-        ctk.CTkLabel(right, text="Tip: select a zip or folder then Update").pack(pady=(0,8))
-        self.progress = ctk.CTkProgressBar(right)
-        self.progress.pack(fill="x", padx=12, pady=(12,6))
-        self.progress.set(0.0)
-        self.preview_count_label = ctk.CTkLabel(right, text="Files to modify: 0")
-        self.preview_count_label.pack(pady=(6,4))
-        help_btn = ctk.CTkButton(right, text="Show Help", command=self.show_help, fg_color=PINK)
-        help_btn.pack(padx=12, pady=8)
-        help_btn.bind("<Enter>", lambda e: help_btn.configure(fg_color=PINK_HOVER))
-        help_btn.bind("<Leave>", lambda e: help_btn.configure(fg_color=PINK))
-    def _render_logo_large(self, text):
-        w, h = 900, 150
-        img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        try:
-            fnt = ImageFont.truetype(ctk.CTkFont(size=48).actual("family") + ".ttf", 48)
-        except:
-            fnt = ImageFont.load_default()
-        bbox = draw.textbbox((0,0), text, font=fnt)
-        tw = bbox[2] - bbox[0]; th = bbox[3] - bbox[1]
-        x = (w - tw) // 2; y = (h - th) // 2
-        mask = Image.new("L", (tw, th), 0)
-        md = ImageDraw.Draw(mask)
-        md.text((0,0), text, font=fnt, fill=255)
-        grad = Image.new("RGBA", (tw, th))
-        gd = ImageDraw.Draw(grad)
-        for i in range(tw):
-            t = i / max(1, tw - 1)
-            r = int(GRADIENT_LEFT[0] * (1 - t) + GRADIENT_RIGHT[0] * t)
-            g = int(GRADIENT_LEFT[1] * (1 - t) + GRADIENT_RIGHT[1] * t)
-            b = int(GRADIENT_LEFT[2] * (1 - t) + GRADIENT_RIGHT[2] * t)
-            gd.line([(i,0),(i,th)], fill=(r,g,b,255))
-        grad.putalpha(mask)
-        img.paste(grad, (x, y), grad)
-        self.logo_img = ImageTk.PhotoImage(img)
-        self.logo_label.configure(image=self.logo_img)
-    def ui_log(self, msg):
-        self.logbox.configure(state="normal")
-        self.logbox.insert("end", msg + "\n")
-        self.logbox.see("end")
-        self.logbox.configure(state="disabled")
-    def set_progress(self, val):
+    return removed
+def new_log_path(path):
+    """A fresh timestamped log file name in the config folder's logs/; old logs are pruned (prune_logs) first."""
+    prune_logs(keep=LOG_KEEP_FILES - 1)
+    name = os.path.splitext(os.path.basename(os.path.abspath(path)))[0]
+    return os.path.join(config_dir(), "logs", f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{name}.log")
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+class ConversionJob:
+    """
+    One pack waiting in or run by a JobQueue: its convert_pack options, a CancelToken, a LogChannel the
+    worker reports through, and status (one of JOB_STATES) plus the summary once it finishes.
+    """
+    def __init__(self, job_id, path, out_zip=None, log_path=None, options=None):
+        self.id = job_id
+        self.path = path
+        self.name = os.path.basename(os.path.abspath(path))
+        self.out_zip = out_zip
+        self.options = options or {}
+        self.cancel = CancelToken()
+        self.channel = LogChannel(log_path)
+        self.status = "queued"
+        self.summary = None
+        self.thread = None
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+class JobQueue:
+    """
+    Converts queued packs on at most `limit` worker threads, in submission order, without ever blocking the
+    caller: submit() only enqueues and each job reports through its own LogChannel. Raising the limit starts
+    waiting jobs at once; lowering it lets running jobs finish. Jobs get an even share of the cores for their
+    slicer, JSON and zip pools (like batch_convert), and all of them share the process-wide PIXEL_BUDGET.
+    """
+    def __init__(self, limit=2, mappings=None):
+        self.limit = max(1, limit)
+        self.mappings = mappings
+        self.jobs = []
+        self.paused = False
+        self._waiting = deque()
+        self._running = 0
+        self._reserved = set()
+        self._ids = 0
+        self._lock = threading.Lock()
+    def submit(self, path, out_zip=None, log_path=None, **options):
+        """Queue one pack (options are convert_pack keyword arguments) and return its ConversionJob."""
+        with self._lock:
+            self._ids += 1
+            out_zip = out_zip or unique_output_path(path, reserved=self._reserved, incremental=options.get("incremental", False))
+            job = ConversionJob(self._ids, path, out_zip, log_path, options)
+            self.jobs.append(job)
+            self._waiting.append(job)
+        self._start_waiting()
+        return job
+    def set_limit(self, limit):
+        self.limit = max(1, limit)
+        self._start_waiting()
+    def active(self):
+        """Jobs queued or running."""
+        return [j for j in self.jobs if not j.finished]
+    def pause(self):
+        """Pause running jobs at their next file and hold queued ones."""
+        self.paused = True
+        for job in self.active():
+            job.cancel.pause()
+    def resume(self):
+        self.paused = False
+        for job in self.active():
+            job.cancel.resume()
+        self._start_waiting()
+    def cancel(self, job):
+        """Cancel one job: a queued job is dropped at once, a running one stops at its next file."""
+        with self._lock:
+            queued = job in self._waiting
+            if queued:
+                self._waiting.remove(job)
+        job.cancel.cancel()
+        if queued:
+            self._finish(job, {"input": job.path, "output": None, "ok": False, "error": "cancelled", "cancelled": True,
+                               "counts": {}, "seconds": 0.0})
+    def cancel_all(self):
+        for job in self.active():
+            self.cancel(job)
+    def join(self, timeout=None):
+        """Wait up to timeout seconds in total for running jobs to finish (after cancel_all: to clean up); True if they all did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in list(self.jobs):
+            thread = job.thread
+            if thread is not None:
+                thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+                if thread.is_alive():
+                    return False
+        return True
+    def clear_finished(self):
+        """Forget finished jobs; returns them."""
+        with self._lock:
+            done = [j for j in self.jobs if j.finished]
+            self.jobs = [j for j in self.jobs if not j.finished]
+        return done
+    def prune(self, keep):
+        """Forget all but the `keep` most recent finished jobs; returns the forgotten ones."""
+        with self._lock:
+            done = [j for j in self.jobs if j.finished]
+            dropped = done[:max(0, len(done) - keep)]
+            if dropped:
+                gone = set(dropped)
+                self.jobs = [j for j in self.jobs if j not in gone]
+        return dropped
+    def _start_waiting(self):
+        with self._lock:
+            started = []
+            while self._waiting and self._running < self.limit and not self.paused:
+                job = self._waiting.popleft()
+                job.status = "running"
+                self._running += 1
+                started.append(job)
+            share = max(1, (os.cpu_count() or 1) // self.limit)
+        for job in started:
+            options = dict(job.options)
+            for key in ("slice_workers", "json_workers", "zip_workers"):
+                if options.get(key) is None:
+                    options[key] = share
+            job.thread = threading.Thread(target=self._run, args=(job, options), name=f"mew-job-{job.id}", daemon=True)
+            job.thread.start()
+    def _run(self, job, options):
+        summary = {"input": job.path, "output": None, "ok": False, "error": "worker stopped unexpectedly", "cancelled": False,
+                   "counts": {}, "seconds": 0.0}
         try:
-            self.progress.set(val)
-            self.update_idletasks()
-        except Exception:
-            pass
-    def browse_file(self):
-        p = filedialog.askopenfilename(title="Select pack .zip", filetypes=[("Zip files","*.zip"),("All files","*.*")])
-        if p:
-            self.path_var.set(p)
-            self.detect_pack(p)
-    def browse_folder(self):
-        p = filedialog.askdirectory(title="Select pack folder")
-        if p:
-            self.path_var.set(p)
-            self.detect_pack(p)
-    def open_pack(self):
-        self.browse_file()
-    def detect_pack(self, path):
-        self.detect_var.set("Detecting...")
-        self.update()
-        tmp = None
+            summary = convert_pack(job.path, job.out_zip, mappings=self.mappings, ui_log_fn=job.channel.log,
+                                   ui_progress_set=job.channel.progress, cancel=job.cancel, **options)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._finish(job, summary)
+            self._start_waiting()
+    def _finish(self, job, summary):
+        job.summary = summary
+        job.status = "done" if summary.get("ok") else "cancelled" if summary.get("cancelled") else "failed"
+        with self._lock:
+            self._reserved.discard(job.out_zip)
+        job.channel.finish(summary)
+WATCH_INTERVAL = 0.25
+WATCH_DEBOUNCE = 0.3
+WATCH_IGNORE_RE = re.compile(r"(^|/)\.|~$|\.(tmp|swp|part)$")
+class PackWatcher:
+    """
+    Keeps a converted copy of a pack folder live while it is being edited. start() converts the whole pack
+    once into out_dir; poll() rescans the source (size and mtime only) and, once changes have been quiet
+    for `debounce` seconds, refreshes just the outputs of the files that changed:
+    a slicer input re-runs its own sprites, a texture matched by RELOCATIONS is copied to its new path,
+    a model/item/equipment/atlas/blockstate JSON gets its reference rewrite, pack.mcmeta is updated again,
+    anything else is copied. Deleted files take their outputs with them. With out_zip, the zip is rewritten
+    after every refresh with untouched members copied raw, so only changed files are compressed again.
+    """
+    def __init__(self, src, out_dir, mappings=None, replace_originals=False, out_zip=None, debounce=WATCH_DEBOUNCE,
+                 log=None, slice_workers=None, sprite_cache=True, zip_options=None):
+        src_abs, out_abs = os.path.abspath(src), os.path.abspath(out_dir)
+        if os.path.commonpath([src_abs, out_abs]) in (src_abs, out_abs):
+            raise ValueError("the live output folder must not be inside the watched pack (or contain it)")
+        self.src = src
+        self.out_dir = out_dir
+        self.mappings = mappings or {}
+        self.replace_originals = replace_originals
+        self.out_zip = out_zip
+        self.debounce = debounce
+        self.log = log or (lambda msg: None)
+        self.slice_workers = slice_workers
+        self.sprite_cache = SpriteCache() if sprite_cache is True else sprite_cache or None
+        self.zip_options = zip_options or {}
+        self.live = None
+        self._snapshot = {}
+        self._pending = {}
+        self._last_change = 0.0
+        self._inputs_by_name = {}
+        for in_path in self.mappings:
+            self._inputs_by_name.setdefault(in_path.rsplit("/", 1)[-1], []).append(in_path)
+    def _scan(self):
+        index = PackIndex.from_dir(self.src)
+        return {p: (e.size, e.mtime) for p, e in index.entries.items() if not WATCH_IGNORE_RE.search(p)}
+    def start(self):
+        """Convert the whole pack into out_dir (replacing an earlier live output) and take the first snapshot."""
+        if os.path.isdir(self.out_dir) and os.listdir(self.out_dir):
+            if not os.path.isfile(os.path.join(self.out_dir, "mewupdater_changelog.txt")):
+                raise ValueError(f"{self.out_dir} exists and is not a MewUpdater output; refusing to replace it")
+            shutil.rmtree(self.out_dir)
+        self._snapshot = self._scan()
+        shutil.copytree(self.src, self.out_dir, copy_function=clone_file)
+        self.live = DirPack(self.out_dir)
+        run_full_update(self.live, self.log, lambda v: None, replace_originals=self.replace_originals,
+                        mappings=self.mappings or None, slice_workers=self.slice_workers, sprite_cache=self.sprite_cache)
+        if self.out_zip:
+            self._write_zip(None, ())
+        self.log(f"{now_str()} — Watching {self.src} -> {self.out_dir}" + (f" and {self.out_zip}" if self.out_zip else ""))
+    def poll(self):
+        """Rescan the source; returns the refreshed source paths once a burst of changes has settled, else []."""
+        current = self._scan()
+        old = self._snapshot
+        changed = [p for p, st in current.items() if old.get(p) != st]
+        removed = [p for p in old if p not in current]
+        self._snapshot = current
+        now = time.monotonic()
+        if changed or removed:
+            self._pending.update(dict.fromkeys(changed, False))
+            self._pending.update(dict.fromkeys(removed, True))
+            self._last_change = now
+            return []
+        if not self._pending or now - self._last_change < self.debounce:
+            return []
+        batch, self._pending = self._pending, {}
+        return self.refresh(batch)
+    def run(self, interval=WATCH_INTERVAL, cancel=None):
+        """start(), then poll every interval seconds until cancel (a CancelToken) is cancelled."""
+        cancel = cancel or CancelToken()
+        self.start()
+        while not cancel.sleep(interval):
+            self.poll()
+    def refresh(self, batch):
+        """Refresh the outputs of {source path: deleted} and return the paths handled."""
+        started = time.perf_counter()
+        live = self.live
+        live.touched = set()
+        removed = []
+        slicer = {}
+        stages = {}
+        for rel, gone in sorted(batch.items()):
+            try:
+                for stage in self._refresh_file(rel, gone, slicer, removed):
+                    stages[stage] = stages.get(stage, 0) + 1
+            except Exception as e:
+                self.log(f"{now_str()} — Watch: failed to refresh {rel}: {e}")
+        if slicer:
+            lines = []
+            apply_slicer_mappings(live, slicer, lines, lambda: None, workers=self.slice_workers, cache=self.sprite_cache)
+            for line in lines:
+                if "fail" in line.lower() or "not found" in line:
+                    self.log(line)
+        touched, live.touched = live.touched, None
+        if self.out_zip:
+            self._write_zip(touched, removed)
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(stages.items()))
+        self.log(f"{now_str()} — Watch: {len(batch)} changed files refreshed ({summary}): {len(touched)} outputs written, "
+                 f"{len(removed)} removed in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return sorted(batch)
+    def _refresh_file(self, rel, gone, slicer, removed):
+        live = self.live
+        hit = relocation_for(rel)
+        dst = hit[1] if hit is not None else None
+        inputs = [p for p in self._inputs_by_name.get(rel.rsplit("/", 1)[-1], ()) if p == rel or find_slicer_input(live, p) == rel]
+        parts = rel.split("/")
+        if gone:
+            outputs = [rel, dst]
+            for in_path in inputs:
+                for out_path, _, metadata in self.mappings[in_path]:
+                    outputs += [out_path, out_path + ".mcmeta"] if metadata else [out_path]
+            for out in outputs:
+                if out and live.isfile(out):
+                    live.remove(out)
+                    removed.append(out)
+            return ["removed"]
+        with open(os.path.join(self.src, rel.replace("/", os.sep)), "rb") as f:
+            data = f.read()
+        if rel == "pack.mcmeta":
+            live.write(rel, data)
+            update_pack_mcmeta(live, [], lambda: None)
+            return ["mcmeta"]
+        if len(parts) > 3 and parts[0] == "assets" and parts[2] in JSON_REF_DIRS and rel.lower().endswith(".json"):
+            try:
+                new, _ = rewrite_json_refs(data)
+            except ValueError:
+                new = None
+            live.write(rel, new if new is not None else data)
+            return ["model_json"]
+        stages = []
+        if dst is None or not self.replace_originals:
+            live.write(rel, data)
+            stages.append("copy")
+        if dst is not None:
+            live.write(dst, data)
+            stages.append(hit[0])
+        for in_path in inputs:
+            slicer[in_path] = self.mappings[in_path]
+            stages.append("slicer")
+        return stages
+    def _write_zip(self, touched, removed):
+        """Rewrite out_zip: in full the first time, afterwards raw-copying every member but touched/removed."""
+        part = self.out_zip + ".part"
         try:
-            if path.lower().endswith(".zip"):
-                tmp = tempfile.mkdtemp(prefix="mewdetect_")
-                extract_zip_to_dir(path, tmp)
-                root = tmp
+            if touched is None or not os.path.isfile(self.out_zip):
+                create_zip_from_dir(self.out_dir, part, **self.zip_options)
             else:
-                root = path
-            mc = read_pack_mcmeta(root)
-            pf = None
-            if mc and "pack" in mc:
-                pf = mc["pack"].get("pack_format")
-            self.detect_var.set(f"pack_format {pf}" if pf is not None else "unknown")
-            self.ui_log(f"{now_str()} — Detected: pack_format {pf}")
-        except Exception as e:
-            self.detect_var.set("error")
-            self.ui_log(f"{now_str()} — Detection failed: {e}")
+                with ZipStreamPack(self.out_zip) as z:
+                    for rel in touched:
+                        if rel in self.live.index:
+                            z.write(rel, self.live.read(rel))
+                    for rel in removed:
+                        z.remove(rel)
+                    z.save(part, **self.zip_options)
+            os.replace(part, self.out_zip)
         finally:
-            if tmp:
-                shutil.rmtree(tmp, ignore_errors=True)
-    def toggle_theme_animated(self):
-        if self.animating:
-            return
-        self.animating = True
-        steps = 10
-        def animate(i):
-            if i == steps // 2:
-                new = "light" if self.current_theme == "dark" else "dark"
-                ctk.set_appearance_mode(new)
-                self.current_theme = new
-            if i < steps:
-                self.after(30, lambda: animate(i+1))
-            else:
-                self.animating = False
-        animate(0)
-    def show_help(self):
-        txt = (
-            "MewUpdater — Help\n\n"
-            "1) Select a resource pack .zip or folder.\n"
-            "2) Click Update Pack to convert textures to 1.21.7 layout using the official slicer mapping (slicer.txt).\n"
-            "3) By default the tool copies files to new locations and leaves originals; check 'Replace originals' to move them.\n\n"
-            "The updater will:\n- Move armor/equipment to textures/entity/equipment/*\n- Slice GUI sprites using the official slicer mapping from slicer.txt\n- Update model JSON texture references (best-effort)\n- Update pack.mcmeta to pack_format=64 and set the gradient description\n- Write mewupdater_changelog.txt inside the updated pack\n"
-        )
-        messagebox.showinfo(APP_NAME + " — Help", txt)
-    def update_pack(self):
-        path = self.path_var.get().strip()
-        if not path:
-            messagebox.showwarning(APP_NAME, "No pack selected.")
-            return
-        self.logbox.configure(state="normal"); self.logbox.delete("1.0", "end"); self.logbox.configure(state="disabled")
-        self.set_progress(0.0)
-        def _worker():
-            tmpdir = tempfile.mkdtemp(prefix="mew_update_")
+            if os.path.exists(part):
+                os.remove(part)
+def collect_pack_inputs(specs):
+    """
+    Expand CLI inputs into pack paths. Each spec may be a .zip, a pack folder, a glob,
+    or a directory holding .zip packs and pack folders (one level deep).
+    """
+    found = []
+    seen = set()
+    def add(p):
+        key = os.path.abspath(p)
+        if key not in seen:
+            seen.add(key)
+            found.append(p)
+    def is_pack_dir(p):
+        return os.path.isfile(os.path.join(p, "pack.mcmeta")) or os.path.isdir(os.path.join(p, "assets"))
+    for spec in specs:
+        paths = sorted(glob.glob(spec)) if glob.has_magic(spec) else [spec]
+        for p in paths:
+            if os.path.isfile(p) and p.lower().endswith(".zip"):
+                add(p)
+            elif os.path.isdir(p):
+                if is_pack_dir(p):
+                    add(p)
+                    continue
+                for entry in sorted(os.listdir(p)):
+                    full = os.path.join(p, entry)
+                    if os.path.isfile(full) and entry.lower().endswith(".zip") and SUFFIX not in entry:
+                        add(full)
+                    elif os.path.isdir(full) and is_pack_dir(full):
+                        add(full)
+    return found
+_BATCH_MAPPINGS = None
+def _batch_init(mappings, budget=None):
+    global _BATCH_MAPPINGS, PIXEL_BUDGET
+    _BATCH_MAPPINGS = mappings
+    if budget is not None:
+        PIXEL_BUDGET = budget
+def _batch_convert_one(path, out_zip, options):
+    summary = convert_pack(path, out_zip, mappings=_BATCH_MAPPINGS, **options)
+    summary.pop("log", None)
+    return summary
+def batch_convert(paths, out_dir=None, workers=None, mappings=None, on_result=None, pixel_budget=PIXEL_BUDGET_PIXELS, **options):
+    """
+    Convert many packs in parallel on a process pool. The slicer mappings are parsed once by the caller
+    and handed to each worker process a single time through the pool initializer.
+    options are passed to convert_pack (replace_originals, stream, slice_workers, json_workers...); the
+    per-pack pools default to an even share of the cores so processes x pools do not oversubscribe the machine.
+    on_result(summary) is called in the parent as each pack finishes. Returns summaries in input order.
+    pixel_budget caps the decoded slicer pixels alive at once across all worker processes together.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    if options.get("slice_workers") is None:
+        options["slice_workers"] = max(1, (os.cpu_count() or 1) // workers)
+    if options.get("json_workers") is None:
+        options["json_workers"] = max(1, (os.cpu_count() or 1) // workers)
+    if options.get("zip_workers") is None:
+        options["zip_workers"] = max(1, (os.cpu_count() or 1) // workers)
+    if out_dir:
+        safe_mkdir(out_dir)
+    reserved = set()
+    jobs = [(p, unique_output_path(p, out_dir, reserved, incremental=options.get("incremental", False))) for p in paths]
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(jobs))), initializer=_batch_init, initargs=(mappings, PixelBudget(pixel_budget, shared=True))) as pool:
+        futures = {pool.submit(_batch_convert_one, p, out, options): p for p, out in jobs}
+        for fut in as_completed(futures):
+            p = futures[fut]
             try:
-                if os.path.isdir(path):
-                    workdir = os.path.join(tmpdir, "work")
-                    shutil.copytree(path, workdir)
-                    original_parent = os.path.dirname(path)
-                else:
-                    extract_zip_to_dir(path, tmpdir)
-                    workdir = tmpdir
-                    original_parent = os.path.dirname(path)
-                self.ui_log(f"{now_str()} — Work dir: {workdir}")
-                ui_log_fn = lambda s: self.after(0, lambda: self.ui_log(s))
-                ui_progress_set = lambda v: self.after(0, lambda: self.set_progress(v))
-                mappings = self.mappings if self.mappings else None
-                run_full_update(workdir, ui_log_fn, ui_progress_set, replace_originals=self.replace_var.get(), mappings=mappings)
-                base = os.path.basename(path) if not os.path.isdir(path) else os.path.basename(os.path.abspath(path))
-                name = os.path.splitext(base)[0]
-                out_zip = os.path.join(original_parent, name + SUFFIX + ".zip")
-                i = 1
-                final_out = out_zip
-                while os.path.exists(final_out):
-                    final_out = out_zip.replace(".zip", f"_{i}.zip"); i += 1
-                self.ui_log(f"{now_str()} — Zipping updated pack to {final_out} ...")
-                create_zip_from_dir(workdir, final_out)
-                self.ui_log(f"{now_str()} — Wrote updated pack: {final_out}")
-                messagebox.showinfo(APP_NAME, f"Pack updated: {final_out}")
+                summary = fut.result()
             except Exception as e:
-                self.ui_log(f"{now_str()} — ERROR during update: {e}")
-                messagebox.showerror(APP_NAME, f"Update failed: {e}")
-            finally:
-                shutil.rmtree(tmpdir, ignore_errors=True)
-                self.set_progress(0.0)
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
+                summary = {"input": p, "output": None, "ok": False, "error": f"worker crashed: {e}", "counts": {}, "seconds": 0.0}
+            results[p] = summary
+            if on_result:
+                on_result(summary)
+    return [results[p] for p, _ in jobs]
+def format_batch_summary(summary):
+    status = "OK  " if summary["ok"] else "FAIL"
+    counts = " ".join(f"{k}={v}" for k, v in summary["counts"].items())
+    line = f"{status} {summary['seconds']:7.2f}s {summary['input']}"
+    if summary["ok"]:
+        return f"{line} -> {summary['output']} [{counts}]"
+    return f"{line}: {summary['error']}"
+def cli_slicer_cache(args):
+    if not os.path.isfile(args.slicer):
+        print(f"slicer.txt not found: {args.slicer}", file=sys.stderr)
+        return 2
+    cache_path = os.path.join(config_dir(), "slicer_cache.json")
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    mappings, cold = load_slicer_mappings_cached(args.slicer)
+    _, warm = load_slicer_mappings_cached(args.slicer)
+    print(f"inputs={len(mappings)} outputs={sum(len(v) for v in mappings.values())} sha256={cold['sha256'][:12]}")
+    print(f"cold ({cold['source']}): {cold['seconds'] * 1000:.2f} ms")
+    print(f"warm ({warm['source']}): {warm['seconds'] * 1000:.2f} ms")
+    print(f"cache: {cache_path}")
+    return 0
+def cli_plan(args):
+    paths = collect_pack_inputs(args.inputs)
+    if not paths:
+        print("No packs found.", file=sys.stderr)
+        return 2
+    mappings, _ = load_slicer_mappings_cached(args.slicer)
+    results = []
+    failed = 0
+    for path in paths:
+        try:
+            summary, diff = dry_run(path, mappings, args.replace_originals)
+        except Exception as e:
+            failed += 1
+            print(f"{now_str()} — {path}: {e}", file=sys.stderr)
+            continue
+        if args.json:
+            results.append({"input": path, "summary": summary, "diff": diff})
+            continue
+        kinds = " ".join(f"{k}={n}" for k, n in summary["kinds"].items())
+        print(f"{path}: {summary['files_to_modify']} files to modify, {summary['operations']} operations [{kinds}], "
+              f"{summary['duplicates_dropped']} duplicates dropped")
+        if not args.summary:
+            for line in diff:
+                print("  " + line)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if failed else 0
+def cli_validate(args):
+    """Exit status 0 when every pack validates clean, 1 when any has problems or cannot be read, 2 if none found."""
+    paths = collect_pack_inputs(args.inputs)
+    if not paths:
+        print("No packs found.", file=sys.stderr)
+        return 2
+    mappings, _ = load_slicer_mappings_cached(args.slicer)
+    results = []
+    bad = 0
+    for path in paths:
+        try:
+            with open_pack_view(path) as pack:
+                result = validate_pack(pack, mappings)
+        except Exception as e:
+            bad += 1
+            print(f"{now_str()} — {path}: {e}", file=sys.stderr)
+            continue
+        if result["unresolved"] or result["orphaned"] or result["missing_slicer_outputs"]:
+            bad += 1
+        if args.json:
+            results.append({"input": path, **result})
+            continue
+        print(path)
+        for line in format_validation(result, limit=args.limit):
+            print("  " + line)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if bad else 0
+def cli_watch(args):
+    if not os.path.isdir(args.input):
+        print(f"{args.input} is not a pack folder.", file=sys.stderr)
+        return 2
+    mappings, _ = load_slicer_mappings_cached(args.slicer)
+    out_dir = args.out_dir or os.path.abspath(args.input).rstrip(os.sep) + SUFFIX
+    try:
+        watcher = PackWatcher(args.input, out_dir, mappings, args.replace_originals, args.zip, args.debounce,
+                              log=lambda msg: print(msg, flush=True))
+        print(f"{now_str()} — Converting {args.input} into {out_dir} (Ctrl+C to stop)...", file=sys.stderr)
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        return 0
+    except ValueError as e:
+        print(f"{now_str()} — {e}", file=sys.stderr)
+        return 2
+    return 0
+def cli_serve(args):
+    mappings, slicer_info = load_slicer_mappings_cached(args.slicer)
+    if mappings:
+        print(describe_slicer_load(mappings, slicer_info), file=sys.stderr)
+    else:
+        print(f"{now_str()} — slicer.txt not found; GUI mapping disabled.", file=sys.stderr)
+    token = args.token or os.environ.get("MEWUPDATER_TOKEN") or None
+    sprite_cache = False if args.no_sprite_cache else SpriteCache(max_bytes=args.sprite_cache_mb * 1048576)
+    from MewDaemon import ConversionDaemon
+    try:
+        daemon = ConversionDaemon(args.host, args.port, args.jobs, mappings, sprite_cache, args.json_workers, token,
+                                  log=lambda msg: print(msg, file=sys.stderr, flush=True))
+    except OSError as e:
+        print(f"{now_str()} — Cannot listen on {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 2
+    host, port = daemon.address
+    print(f"{now_str()} — Serving on http://{host}:{port} with {daemon.queue.limit} parallel job(s) (Ctrl+C to stop)", file=sys.stderr, flush=True)
+    if token is None:
+        print(f"{now_str()} — Token (send as Authorization: Bearer <token>): {daemon.token}", file=sys.stderr, flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+def cli_main(argv):
+    parser = argparse.ArgumentParser(prog=APP_NAME, description="Convert resource packs to the latest format without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("batch", help="convert many .zip/folder packs in parallel")
+    b.add_argument("inputs", nargs="+", help="pack .zip files, pack folders, globs, or directories of packs")
+    b.add_argument("-o", "--out-dir", help="write updated packs here instead of next to each input")
+    b.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="parallel worker processes (default: all cores)")
+    b.add_argument("--replace-originals", action="store_true", help="move textures to their new locations instead of copying")
+    b.add_argument("--no-stream", action="store_true", help="extract zip packs to a temp folder instead of streaming zip-to-zip")
+    b.add_argument("--slice-workers", type=int, default=None, help="slicer threads per pack (default: cores / workers)")
+    b.add_argument("--json-workers", type=int, default=None, help="processes per pack for large JSON rewrites (default: cores / workers)")
+    b.add_argument("--zip-level", type=int, default=ZIP_DEFLATE_LEVEL, choices=range(0, 10), metavar="0-9", help="deflate level for non-PNG/OGG members, 0 = store everything (default: %(default)s)")
+    b.add_argument("--zip-workers", type=int, default=None, help="compression threads per pack (default: cores / workers)")
+    b.add_argument("--reproducible", action="store_true", help="sorted entries and fixed timestamps (SOURCE_DATE_EPOCH or 1980-01-01) for byte-identical output")
+    b.add_argument("--incremental", action="store_true", help="update an existing <pack>-mewupdated.zip in place, reusing outputs whose inputs are unchanged")
+    b.add_argument("--pixel-budget-mp", type=int, default=PIXEL_BUDGET_PIXELS // PIXEL_BUDGET_UNIT, help="megapixels of decoded GUI textures alive at once across all workers (default: %(default)s)")
+    b.add_argument("--no-sprite-cache", action="store_true", help="do not read or fill the shared sliced-sprite cache")
+    b.add_argument("--sprite-cache-mb", type=int, default=SPRITE_CACHE_MAX_BYTES // 1048576, help="size cap of the sprite cache in MB (default: %(default)s)")
+    b.add_argument("--no-report", action="store_true", help="do not write <pack>.report.json next to each output")
+    b.add_argument("--no-validate", action="store_true", help="skip checking the converted pack for unresolved references and missing sprites")
+    b.add_argument("--prune-sprites", action="store_true", help="do not write fully transparent GUI sprites; encode identical crops once")
+    b.add_argument("--vanilla", help="client .jar (or zip/folder of its assets): with --prune-sprites also drop sprites identical to these defaults")
+    b.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    b.add_argument("--json", action="store_true", help="print the per-pack summaries as JSON")
+    pl = sub.add_parser("plan", help="dry run: list the operations a conversion would perform without writing anything")
+    pl.add_argument("inputs", nargs="+", help="pack .zip files, pack folders, globs, or directories of packs")
+    pl.add_argument("--replace-originals", action="store_true", help="plan moves instead of copies")
+    pl.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    pl.add_argument("--summary", action="store_true", help="print only the per-pack counts, not the file diff")
+    pl.add_argument("--json", action="store_true", help="print summaries and diffs as JSON")
+    va = sub.add_parser("validate", help="check packs for unresolved references, orphaned sprites and missing slicer outputs")
+    va.add_argument("inputs", nargs="+", help="pack .zip files, pack folders, globs, or directories of packs")
+    va.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    va.add_argument("--limit", type=int, default=VALIDATE_LOG_LIMIT, help="problems listed per kind (default: %(default)s)")
+    va.add_argument("--json", action="store_true", help="print the full results as JSON")
+    w = sub.add_parser("watch", help="keep a converted copy of a pack folder up to date while it is edited")
+    w.add_argument("input", help="pack folder to watch")
+    w.add_argument("-o", "--out-dir", help="live converted folder (default: <pack>-mewupdated next to the input)")
+    w.add_argument("--zip", help="also keep this output zip up to date")
+    w.add_argument("--replace-originals", action="store_true", help="move textures to their new locations instead of copying")
+    w.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="seconds between scans (default: %(default)s)")
+    w.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, help="seconds without changes before refreshing (default: %(default)s)")
+    w.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    se = sub.add_parser("serve", help="run a local conversion daemon with a JSON job API over HTTP")
+    se.add_argument("--host", default=DAEMON_HOST, help="address to listen on (default: %(default)s)")
+    se.add_argument("--port", type=int, default=DAEMON_PORT, help="port to listen on, 0 for any free port (default: %(default)s)")
+    se.add_argument("-j", "--jobs", type=int, default=DAEMON_JOB_LIMIT, help="packs converted at once (default: %(default)s)")
+    se.add_argument("--json-workers", type=int, default=None, help="processes in the shared pool for large JSON rewrites (default: all cores)")
+    se.add_argument("--token", help="require 'Authorization: Bearer <token>' on every request (default: $MEWUPDATER_TOKEN, else a random token printed at start)")
+    se.add_argument("--no-sprite-cache", action="store_true", help="do not read or fill the shared sliced-sprite cache")
+    se.add_argument("--sprite-cache-mb", type=int, default=SPRITE_CACHE_MAX_BYTES // 1048576, help="size cap of the sprite cache in MB (default: %(default)s)")
+    se.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    sc = sub.add_parser("slicer-cache", help="rebuild the compiled slicer mapping cache and report cold/warm load times")
+    sc.add_argument("--slicer", default=SLICER_TXT, help="path to slicer.txt")
+    args = parser.parse_args(argv)
+    if args.command == "slicer-cache":
+        return cli_slicer_cache(args)
+    if args.command == "plan":
+        return cli_plan(args)
+    if args.command == "validate":
+        return cli_validate(args)
+    if args.command == "watch":
+        return cli_watch(args)
+    if args.command == "serve":
+        return cli_serve(args)
+    paths = collect_pack_inputs(args.inputs)
+    if not paths:
+        print("No packs found.", file=sys.stderr)
+        return 2
+    mappings, slicer_info = load_slicer_mappings_cached(args.slicer)
+    if mappings:
+        print(describe_slicer_load(mappings, slicer_info), file=sys.stderr)
+    else:
+        print(f"{now_str()} — slicer.txt not found; GUI mapping disabled.", file=sys.stderr)
+    print(f"{now_str()} — Converting {len(paths)} pack(s) with {max(1, args.workers)} worker(s)...", file=sys.stderr)
+    sprite_cache = False if args.no_sprite_cache else SpriteCache(max_bytes=args.sprite_cache_mb * 1048576)
+    started = time.perf_counter()
+    on_result = None if args.json else (lambda s: print(format_batch_summary(s), flush=True))
+    results = batch_convert(paths, args.out_dir, args.workers, mappings, on_result, pixel_budget=args.pixel_budget_mp * PIXEL_BUDGET_UNIT, replace_originals=args.replace_originals,
+                           stream=not args.no_stream, slice_workers=args.slice_workers, json_workers=args.json_workers,
+                           write_report=not args.no_report, incremental=args.incremental, sprite_cache=sprite_cache,
+                           zip_level=args.zip_level, zip_workers=args.zip_workers, reproducible=args.reproducible,
+                           validate=not args.no_validate, prune_sprites=args.prune_sprites, vanilla_assets=args.vanilla)
+    failed = [r for r in results if not r["ok"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    print(f"{now_str()} — Done: {len(results) - len(failed)} converted, {len(failed)} failed in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+def __getattr__(name):
+    """MewApp lives in MewUpdaterGUI, imported on first use, so the conversion core never loads tkinter."""
+    if name == "MewApp":
+        from MewUpdaterGUI import MewApp
+        return MewApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.modules.setdefault("MewUpdater", sys.modules[__name__])
+    if len(sys.argv) > 1:
+        sys.exit(cli_main(sys.argv[1:]))
     try:
-        try:
-            from tkinterdnd2 import TkinterDnD, DND_FILES
-            dnd_available = True
-            root = TkinterDnD.Tk()
-        except Exception:
-            import tkinter as tk
-            dnd_available = False
-            root = tk.Tk()
-        ctk.set_appearance_mode("system")
-        ctk.set_default_color_theme("dark-blue")
-        app = MewApp(master=root)
-        if dnd_available:
-            def handle_drop(event):
-                raw = event.data
-                if not raw:
-                    app.ui_log(f"{now_str()} — Drag & drop received empty data.")
-                    return
-                raw = raw.strip()
-                files = []
-                temp = ""
-                depth = 0
-                for ch in raw:
-                    if ch == "{":
-                        depth += 1
-                        if depth == 1:
-                            temp = ""
-                            continue
-                    elif ch == "}":
-                        depth -= 1
-                        if depth == 0:
-                            files.append(temp)
-                            continue
-                    if depth > 0:
-                        temp += ch
-                if not files:
-                    files = raw.split()
-                first_file = files[0] if files else None
-                if not first_file:
-                    app.ui_log(f"{now_str()} — Failed to parse DnD data: {event.data}")
-                    return
-                app.ui_log(f"{now_str()} — Dropped file detected: {first_file}")
-                app.path_var.set(first_file)
-                app.detect_pack(first_file)
-            root.drop_target_register(DND_FILES)
-            root.dnd_bind("<<Drop>>", handle_drop)
-            app.ui_log(f"{now_str()} — Drag & Drop enabled (tkinterdnd2).")
-        else:
-            app.ui_log(f"{now_str()} — tkinterdnd2 not installed. Run: pip install tkinterdnd2")
-        mappings = app.mappings
-        if mappings:
-            total_outputs = sum(len(v) for v in mappings.values())
-            app.preview_count_label.configure(text=f"GUI sprites mapped: {total_outputs}")
-            app.ui_log(f"{now_str()} — Loaded official slicer mapping (slicer.txt): {total_outputs} outputs.")
-        else:
-            app.preview_count_label.configure(text="GUI sprites mapped: 0 (no slicer.txt)")
-            app.ui_log(f"{now_str()} — slicer.txt not found; GUI mapping disabled.")
-        root.mainloop()
+        from MewUpdaterGUI import main
     except ModuleNotFoundError as e:
         missing = str(e).split("'")[1] if "'" in str(e) else str(e)
         print(f"Missing dependency: {missing}")
         print("Install required packages: pip install customtkinter pillow")
         try:
+            from tkinter import messagebox
             messagebox.showerror(APP_NAME, f"Missing dependency: {missing}\nInstall with: pip install customtkinter pillow")
         except Exception:
             pass
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    main()
@@ -0,0 +1,527 @@
+import os
+import threading
+from functools import lru_cache
+import customtkinter as ctk
+from tkinter import filedialog, messagebox
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+from MewUpdater import (APP_NAME, SLICER_TXT, SUFFIX, CancelToken, JobQueue, PackWatcher, collect_pack_inputs,
+                        describe_slicer_load, detect_pack_info, dry_run, format_report, load_slicer_mappings_cached,
+                        new_log_path, now_str)
+LOG_DRAIN_MS = 50
+LOG_VISIBLE_LINES = 2000
+GUI_JOB_LIMIT = 2 if (os.cpu_count() or 1) >= 4 else 1
+GUI_MAX_JOBS = max(2, min(8, os.cpu_count() or 1))
+PINK = "#ff7ab6"
+PINK_HOVER = "#ff9fcf"
+GRADIENT_LEFT = (255, 255, 255)
+GRADIENT_RIGHT = (255, 122, 182)
+LOGO_SIZE = (900, 150)
+def gradient_image(size, left=GRADIENT_LEFT, right=GRADIENT_RIGHT):
+    """A left-to-right RGBA gradient: one 256-step ramp stretched to size, coloured with a lookup table per channel."""
+    w, h = size
+    ramp = Image.frombytes("L", (256, 1), bytes(range(256))).resize((w, 1), Image.BILINEAR).resize((w, h), Image.NEAREST)
+    bands = [ramp.point([a + (b - a) * v // 255 for v in range(256)]) for a, b in zip(left, right)]
+    return Image.merge("RGBA", bands + [Image.new("L", size, 255)])
+@lru_cache(maxsize=8)
+def render_logo(text, family, size=LOGO_SIZE):
+    """The header logo: text in the gradient, centred on a transparent canvas. Cached per text and font."""
+    w, h = size
+    img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    try:
+        fnt = ImageFont.truetype(family + ".ttf", 48)
+    except Exception:
+        fnt = ImageFont.load_default()
+    bbox = ImageDraw.Draw(img).textbbox((0,0), text, font=fnt)
+    tw = bbox[2] - bbox[0]; th = bbox[3] - bbox[1]
+    mask = Image.new("L", (tw, th), 0)
+    ImageDraw.Draw(mask).text((0,0), text, font=fnt, fill=255)
+    grad = gradient_image((tw, th))
+    grad.putalpha(mask)
+    img.paste(grad, ((w - tw) // 2, (h - th) // 2), grad)
+    return img
+class MewApp(ctk.CTkFrame):
+    def __init__(self, master=None):
+        """
+        MewApp is now a CTkFrame that can be embedded into a DnD-enabled root (TkinterDnD.Tk).
+        If master is None we create a CTk window and pack this frame into it (backwards-compatible).
+        """
+        super().__init__(master)
+        ctk.set_appearance_mode("system")
+        ctk.set_default_color_theme("dark-blue")
+        if master is not None:
+            try:
+                master.title(APP_NAME)
+                master.geometry("980x680")
+                master.minsize(860, 540)
+            except Exception:
+                pass
+            self.pack(fill="both", expand=True)
+        else:
+            self._internal_root = ctk.CTk()
+            try:
+                self._internal_root.title(APP_NAME)
+                self._internal_root.geometry("980x680")
+                self._internal_root.minsize(860, 540)
+            except Exception:
+                pass
+            self.pack(fill="both", expand=True)
+        self.mappings, self.mappings_info = {}, None
+        self.queue = JobQueue(GUI_JOB_LIMIT)
+        self._mappings_pending = True
+        self._mappings_thread = threading.Thread(target=self._load_mappings, name="mew-mappings", daemon=True)
+        self._mappings_thread.start()
+        self._detect_token = None
+        self._job_rows = {}
+        self._batch = []
+        self._controls_state = None
+        self._watch = None
+        self._quitting = False
+        self._log_line_count = 0
+        self._build_ui()
+        self.current_theme = "dark"
+        self.animating = False
+        self.after(LOG_DRAIN_MS, self._pump_channel)
+    def _build_ui(self):
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=12, pady=8)
+        self.logo_label = ctk.CTkLabel(header, text="")
+        self.logo_label.pack(expand=True)
+        self._render_logo_large("MewUpdater")
+        main = ctk.CTkFrame(self)
+        main.pack(fill="both", expand=True, padx=12, pady=8)
+        sidebar = ctk.CTkFrame(main, width=220, corner_radius=12)
+        sidebar.pack(side="left", fill="y", padx=(0,12), pady=6)
+        sidebar.pack_propagate(False)
+        ctk.CTkLabel(sidebar, text=APP_NAME, font=ctk.CTkFont(size=18, weight="bold")).pack(pady=(10,8))
+        self.buttons = []
+        def mkbtn(text, cmd):
+            b = ctk.CTkButton(sidebar, text=text, command=cmd, corner_radius=8, fg_color=PINK)
+            b.pack(fill="x", padx=12, pady=6)
+            b.bind("<Enter>", lambda e, btn=b: btn.configure(fg_color=PINK_HOVER))
+            b.bind("<Leave>", lambda e, btn=b: btn.configure(fg_color=PINK))
+            self.buttons.append(b)
+            return b
+        mkbtn("Open Pack", self.open_pack)
+        mkbtn("Browse Folder", self.browse_folder)
+        mkbtn("Dry Run", self.dry_run_pack)
+        mkbtn("Update Pack", self.update_pack)
+        mkbtn("Queue Packs...", self.queue_packs)
+        self.watch_btn = mkbtn("Watch Folder", self.toggle_watch)
+        mkbtn("Toggle Theme", self.toggle_theme_animated)
+        mkbtn("Quit", self.quit_app)
+        ctk.CTkLabel(sidebar, text="Options", anchor="w").pack(fill="x", padx=12, pady=(6,0))
+        self.replace_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(sidebar, text="Replace originals", variable=self.replace_var).pack(anchor="w", padx=12, pady=8)
+        self.incremental_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(sidebar, text="Incremental re-run", variable=self.incremental_var).pack(anchor="w", padx=12, pady=(0,8))
+        self.prune_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(sidebar, text="Drop empty sprites", variable=self.prune_var).pack(anchor="w", padx=12, pady=(0,8))
+        self.report_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(sidebar, text="Show timing report", variable=self.report_var).pack(anchor="w", padx=12, pady=(0,8))
+        ctk.CTkLabel(sidebar, text="Parallel jobs", anchor="w").pack(fill="x", padx=12, pady=(0,0))
+        self.jobs_var = ctk.StringVar(value=str(GUI_JOB_LIMIT))
+        ctk.CTkOptionMenu(sidebar, values=[str(i) for i in range(1, GUI_MAX_JOBS + 1)], variable=self.jobs_var,
+                          command=lambda v: self.queue.set_limit(int(v)), fg_color=PINK).pack(fill="x", padx=12, pady=(2,8))
+        center = ctk.CTkFrame(main)
+        center.pack(side="left", fill="both", expand=True, padx=(0,12), pady=6)
+        info = ctk.CTkFrame(center)
+        info.pack(fill="x", padx=8, pady=(6,8))
+        ctk.CTkLabel(info, text="Selected Pack:").grid(row=0, column=0, sticky="w", padx=6, pady=(6,4))
+        self.path_var = ctk.StringVar()
+        self.entry = ctk.CTkEntry(info, textvariable=self.path_var, width=520)
+        self.entry.grid(row=1, column=0, sticky="we", padx=6)
+        browse_btn = ctk.CTkButton(info, text="Browse", command=self.browse_file, width=120, fg_color=PINK)
+        browse_btn.grid(row=1, column=1, sticky="e", padx=6)
+        browse_btn.bind("<Enter>", lambda e: browse_btn.configure(fg_color=PINK_HOVER))
+        browse_btn.bind("<Leave>", lambda e: browse_btn.configure(fg_color=PINK))
+        ctk.CTkLabel(info, text="Detected Version:").grid(row=2, column=0, sticky="w", padx=6, pady=(12,4))
+        self.detect_var = ctk.StringVar(value="None")
+        ctk.CTkLabel(info, textvariable=self.detect_var, font=ctk.CTkFont(size=16, weight="bold")).grid(row=3, column=0, sticky="w", padx=6)
+        preview = ctk.CTkFrame(center)
+        preview.pack(fill="both", expand=True, padx=8, pady=(0,8))
+        ctk.CTkLabel(preview, text="Preview / Log").pack(anchor="w", padx=8, pady=(8,0))
+        self.logbox = ctk.CTkTextbox(preview, wrap="word")
+        self.logbox.pack(fill="both", expand=True, padx=8, pady=8)
+        self.logbox.configure(state="disabled")
+        right = ctk.CTkFrame(main, width=260)
+        right.pack(side="right", fill="y", pady=6)
+        right.pack_propagate(False)
+        ctk.CTkLabel(right, text="Actions", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(8,6))
+        ctk.CTkLabel(right, text="Tip: select a zip or folder then Update").pack(pady=(0,8))
+        self.progress = ctk.CTkProgressBar(right)
+        self.progress.pack(fill="x", padx=12, pady=(12,6))
+        self.progress.set(0.0)
+        controls = ctk.CTkFrame(right, fg_color="transparent")
+        controls.pack(fill="x", padx=12, pady=(0,6))
+        self.pause_btn = ctk.CTkButton(controls, text="Pause", command=self.toggle_pause, width=100, fg_color=PINK, state="disabled")
+        self.pause_btn.pack(side="left", expand=True, padx=(0,4))
+        self.cancel_btn = ctk.CTkButton(controls, text="Cancel", command=self.cancel_update, width=100, fg_color=PINK, state="disabled")
+        self.cancel_btn.pack(side="left", expand=True, padx=(4,0))
+        for b in (self.pause_btn, self.cancel_btn):
+            b.bind("<Enter>", lambda e, btn=b: btn.configure(fg_color=PINK_HOVER))
+            b.bind("<Leave>", lambda e, btn=b: btn.configure(fg_color=PINK))
+        self.jobs_frame = ctk.CTkScrollableFrame(right, label_text="Jobs", height=180)
+        self.jobs_frame.pack(fill="both", expand=True, padx=8, pady=(4,4))
+        clear_btn = ctk.CTkButton(right, text="Clear Finished", command=self.clear_finished_jobs, fg_color=PINK)
+        clear_btn.pack(padx=12, pady=(0,6))
+        clear_btn.bind("<Enter>", lambda e: clear_btn.configure(fg_color=PINK_HOVER))
+        clear_btn.bind("<Leave>", lambda e: clear_btn.configure(fg_color=PINK))
+        self.preview_count_label = ctk.CTkLabel(right, text="Files to modify: 0")
+        self.preview_count_label.pack(pady=(6,4))
+        help_btn = ctk.CTkButton(right, text="Show Help", command=self.show_help, fg_color=PINK)
+        help_btn.pack(padx=12, pady=8)
+        help_btn.bind("<Enter>", lambda e: help_btn.configure(fg_color=PINK_HOVER))
+        help_btn.bind("<Leave>", lambda e: help_btn.configure(fg_color=PINK))
+    def _render_logo_large(self, text):
+        self.logo_img = ImageTk.PhotoImage(render_logo(text, ctk.CTkFont(size=48).actual("family")))
+        self.logo_label.configure(image=self.logo_img)
+    def _load_mappings(self):
+        """Runs on a background thread so the window is up before slicer.txt is loaded."""
+        self.mappings, self.mappings_info = load_slicer_mappings_cached(SLICER_TXT)
+        self.queue.mappings = self.mappings or None
+    def _loaded_mappings(self):
+        """The slicer mapping (None without slicer.txt), waiting for the startup load; call it off the Tk thread only."""
+        self._mappings_thread.join()
+        return self.mappings or None
+    def _mappings_loaded(self):
+        self._mappings_pending = False
+        if self.mappings:
+            total_outputs = sum(len(v) for v in self.mappings.values())
+            self.preview_count_label.configure(text=f"GUI sprites mapped: {total_outputs}")
+            self.ui_log(describe_slicer_load(self.mappings, self.mappings_info))
+        else:
+            self.preview_count_label.configure(text="GUI sprites mapped: 0 (no slicer.txt)")
+            self.ui_log(f"{now_str()} — slicer.txt not found; GUI mapping disabled.")
+    def ui_log(self, msg):
+        self._append_log_lines([msg])
+    def _append_log_lines(self, lines):
+        """Insert a batch of lines with one textbox update, keeping only the last LOG_VISIBLE_LINES."""
+        if not lines:
+            return
+        self.logbox.configure(state="normal")
+        self.logbox.insert("end", "\n".join(lines) + "\n")
+        self._log_line_count += len(lines)
+        excess = self._log_line_count - LOG_VISIBLE_LINES
+        if excess > 0:
+            self.logbox.delete("1.0", f"{excess + 1}.0")
+            self._log_line_count = LOG_VISIBLE_LINES
+        self.logbox.see("end")
+        self.logbox.configure(state="disabled")
+    def _clear_log(self):
+        self.logbox.configure(state="normal"); self.logbox.delete("1.0", "end"); self.logbox.configure(state="disabled")
+        self._log_line_count = 0
+    def _pump_channel(self):
+        """Drain every job's LogChannel on the Tk loop: log lines, row status/progress, and finished jobs."""
+        if self._mappings_pending and not self._mappings_thread.is_alive():
+            self._mappings_loaded()
+        for job in list(self.queue.jobs):
+            row = self._job_rows.get(job.id)
+            if row is None:
+                continue
+            lines, progress, summary = job.channel.drain()
+            if lines:
+                self._append_log_lines([f"[{job.name}] {line}" for line in lines])
+            if progress is not None:
+                row["progress"] = progress
+                row["bar"].set(progress)
+            if row["status"].cget("text") != job.status:
+                row["status"].configure(text=job.status)
+            if summary is not None:
+                self._job_finished(job, row)
+        if self._batch:
+            self.set_progress(sum(1.0 if j.finished else self._job_rows[j.id]["progress"] for j in self._batch) / len(self._batch))
+        self._update_controls()
+        self.after(LOG_DRAIN_MS, self._pump_channel)
+    def _update_controls(self):
+        state = (bool(self.queue.active()), self.queue.paused)
+        if state == self._controls_state:
+            return
+        self._controls_state = state
+        active, paused = state
+        self.pause_btn.configure(text="Resume" if paused else "Pause", state="normal" if active else "disabled")
+        self.cancel_btn.configure(state="normal" if active else "disabled")
+    def _add_job_row(self, job):
+        row = ctk.CTkFrame(self.jobs_frame)
+        row.pack(fill="x", padx=2, pady=2)
+        row.grid_columnconfigure(0, weight=1)
+        name = job.name if len(job.name) <= 24 else job.name[:21] + "..."
+        ctk.CTkLabel(row, text=name, anchor="w").grid(row=0, column=0, sticky="we", padx=4)
+        status = ctk.CTkLabel(row, text=job.status, anchor="e", width=64)
+        status.grid(row=0, column=1, padx=2)
+        btn = ctk.CTkButton(row, text="x", width=24, fg_color=PINK, command=lambda: self.queue.cancel(job))
+        btn.grid(row=0, column=2, padx=(0,4), pady=2)
+        bar = ctk.CTkProgressBar(row)
+        bar.set(0.0)
+        bar.grid(row=1, column=0, columnspan=3, sticky="we", padx=4, pady=(0,4))
+        self._job_rows[job.id] = {"frame": row, "status": status, "bar": bar, "button": btn, "progress": 0.0}
+    def _job_finished(self, job, row):
+        summary = job.summary
+        row["status"].configure(text=job.status)
+        row["button"].configure(state="disabled")
+        if job.channel.log_path:
+            self.ui_log(f"[{job.name}] {now_str()} — Full log: {job.channel.log_path}")
+        if summary.get("report") and self.report_var.get():
+            self._append_log_lines(format_report(summary["report"]))
+        if self.queue.active():
+            return
+        batch, self._batch = self._batch, []
+        self.set_progress(0.0)
+        if self._quitting:
+            self.quit()
+            return
+        if len(batch) == 1:
+            if summary["ok"]:
+                messagebox.showinfo(APP_NAME, f"Pack updated: {summary['output']}")
+            elif summary.get("cancelled"):
+                messagebox.showinfo(APP_NAME, "Update cancelled. No output was written.")
+            else:
+                messagebox.showerror(APP_NAME, f"Update failed: {summary['error']}")
+        elif batch:
+            states = [j.status for j in batch]
+            msg = f"{states.count('done')} packs updated, {states.count('failed')} failed, {states.count('cancelled')} cancelled."
+            if "failed" in states:
+                messagebox.showwarning(APP_NAME, msg)
+            else:
+                messagebox.showinfo(APP_NAME, msg)
+    def set_progress(self, val):
+        try:
+            self.progress.set(val)
+        except Exception:
+            pass
+    def browse_file(self):
+        p = filedialog.askopenfilename(title="Select pack .zip", filetypes=[("Zip files","*.zip"),("All files","*.*")])
+        if p:
+            self.path_var.set(p)
+            self.detect_pack(p)
+    def browse_folder(self):
+        p = filedialog.askdirectory(title="Select pack folder")
+        if p:
+            self.path_var.set(p)
+            self.detect_pack(p)
+    def open_pack(self):
+        self.browse_file()
+    def detect_pack(self, path):
+        self.detect_var.set("Detecting...")
+        self._detect_token = token = object()
+        def _worker():
+            try:
+                info, err = detect_pack_info(path, self._loaded_mappings() or {}), None
+            except Exception as e:
+                info, err = None, e
+            self.after(0, lambda: self._detect_done(token, info, err))
+        threading.Thread(target=_worker, daemon=True).start()
+    def _detect_done(self, token, info, err):
+        if token is not self._detect_token:
+            return
+        if err is not None:
+            self.detect_var.set("error")
+            self.ui_log(f"{now_str()} — Detection failed: {err}")
+            return
+        pf = info["pack_format"]
+        self.detect_var.set(f"pack_format {pf}" if pf is not None else "unknown")
+        self.preview_count_label.configure(text=f"Files to modify: up to {info['files_to_modify_max']}")
+        nested = f" (nested in {info['root'].rstrip('/')})" if info["root"] else ""
+        self.ui_log(f"{now_str()} — Detected: pack_format {pf}{nested}")
+        self.ui_log(f"{now_str()} — {info['members']} files, {info['uncompressed_bytes'] / 1048576:.1f} MB uncompressed; "
+                    f"{info['slicer_inputs']} slicer inputs, {info['armor_layers']} armor layers, "
+                    f"{info['trims']} trims, {info['reference_jsons']} JSON files that may reference armor")
+    def dry_run_pack(self):
+        """Plan the update on a worker thread and show the exact file count and diff without writing anything."""
+        path = self.path_var.get().strip()
+        if not path:
+            messagebox.showwarning(APP_NAME, "No pack selected.")
+            return
+        self._clear_log()
+        self.ui_log(f"{now_str()} — Dry run: planning update of {path} ...")
+        replace_originals = self.replace_var.get()
+        def _worker():
+            try:
+                result, err = dry_run(path, self._loaded_mappings(), replace_originals), None
+            except Exception as e:
+                result, err = None, e
+            self.after(0, lambda: self._dry_run_done(result, err))
+        threading.Thread(target=_worker, daemon=True).start()
+    def _dry_run_done(self, result, err):
+        if err is not None:
+            self.ui_log(f"{now_str()} — Dry run failed: {err}")
+            return
+        summary, diff = result
+        self.preview_count_label.configure(text=f"Files to modify: {summary['files_to_modify']}")
+        self._append_log_lines(diff)
+        kinds = ", ".join(f"{n} {k}" for k, n in summary["kinds"].items())
+        self.ui_log(f"{now_str()} — Dry run: {summary['operations']} operations ({kinds}) on {summary['files_to_modify']} files, "
+                    f"{summary['duplicates_dropped']} duplicates dropped. Nothing was written.")
+    def toggle_pause(self):
+        if not self.queue.active():
+            return
+        if self.queue.paused:
+            self.queue.resume()
+            self.ui_log(f"{now_str()} — Resumed")
+        else:
+            self.queue.pause()
+            self.ui_log(f"{now_str()} — Paused (running jobs stop at their next file, queued jobs wait)")
+    def cancel_update(self):
+        if not self.queue.active():
+            return
+        self.queue.cancel_all()
+        self.ui_log(f"{now_str()} — Cancelling all jobs; cleaning up partial output...")
+    def clear_finished_jobs(self):
+        for job in self.queue.clear_finished():
+            row = self._job_rows.pop(job.id, None)
+            if row is not None:
+                row["frame"].destroy()
+    def toggle_watch(self):
+        """Start or stop keeping <folder>-mewupdated converted live while the selected pack folder is edited."""
+        if self._watch is not None:
+            self._watch.cancel()
+            return
+        path = self.path_var.get().strip()
+        if not path or not os.path.isdir(path):
+            messagebox.showwarning(APP_NAME, "Select a pack folder to watch.")
+            return
+        out_dir = os.path.abspath(path).rstrip(os.sep) + SUFFIX
+        self._watch = cancel = CancelToken()
+        self.watch_btn.configure(text="Stop Watching")
+        replace_originals = self.replace_var.get()
+        log = lambda msg: self.after(0, lambda: self.ui_log(msg))
+        def _worker():
+            try:
+                PackWatcher(path, out_dir, self._loaded_mappings(), replace_originals, log=log).run(cancel=cancel)
+                log(f"{now_str()} — Stopped watching {path}")
+            except Exception as e:
+                log(f"{now_str()} — Watch stopped: {e}")
+            self.after(0, self._watch_stopped)
+        threading.Thread(target=_worker, daemon=True).start()
+    def _watch_stopped(self):
+        self._watch = None
+        self.watch_btn.configure(text="Watch Folder")
+    def quit_app(self):
+        """Quit, first cancelling running jobs so they can delete their partial output."""
+        if self._watch is not None:
+            self._watch.cancel()
+        if self.queue.active():
+            self._quitting = True
+            self.cancel_update()
+            return
+        self.quit()
+    def toggle_theme_animated(self):
+        if self.animating:
+            return
+        self.animating = True
+        steps = 10
+        def animate(i):
+            if i == steps // 2:
+                new = "light" if self.current_theme == "dark" else "dark"
+                ctk.set_appearance_mode(new)
+                self.current_theme = new
+            if i < steps:
+                self.after(30, lambda: animate(i+1))
+            else:
+                self.animating = False
+        animate(0)
+    def show_help(self):
+        txt = (
+            "MewUpdater — Help\n\n"
+            "1) Select a resource pack .zip or folder.\n"
+            "2) Click Update Pack to convert textures to 1.21.7 layout using the official slicer mapping (slicer.txt).\n"
+            "3) By default the tool copies files to new locations and leaves originals; check 'Replace originals' to move them.\n"
+            "4) Pause / Cancel stop running updates at the next file; a cancelled update writes nothing.\n"
+            "5) Queue Packs... (or dropping several packs or a folder of packs) converts them all, up to 'Parallel jobs' at once.\n"
+            "6) Watch Folder keeps <folder>-mewupdated converted while you edit the selected pack folder.\n\n"
+            "The updater will:\n- Move armor/equipment to textures/entity/equipment/*\n- Slice GUI sprites using the official slicer mapping from slicer.txt\n- Update texture references in model/item/equipment/atlas/blockstate JSON (best-effort)\n- Update pack.mcmeta to pack_format=64 and set the gradient description\n- Write mewupdater_changelog.txt inside the updated pack\n"
+        )
+        messagebox.showinfo(APP_NAME + " — Help", txt)
+    def update_pack(self):
+        path = self.path_var.get().strip()
+        if not path:
+            messagebox.showwarning(APP_NAME, "No pack selected.")
+            return
+        self.queue_paths([path])
+    def queue_packs(self):
+        paths = filedialog.askopenfilenames(title="Queue pack .zip files", filetypes=[("Zip files","*.zip"),("All files","*.*")])
+        if paths:
+            self.queue_paths(list(paths))
+    def queue_paths(self, paths):
+        """Queue packs for conversion with the current options; they start as soon as a job slot is free."""
+        options = dict(replace_originals=self.replace_var.get(), incremental=self.incremental_var.get(), prune_sprites=self.prune_var.get())
+        if self._mappings_thread.is_alive():
+            self.ui_log(f"{now_str()} — Waiting for slicer.txt to load before queueing {len(paths)} pack(s)")
+            self._submit_when_loaded(paths, options)
+        else:
+            self._submit_paths(paths, options)
+    def _submit_when_loaded(self, paths, options):
+        """Poll the startup mapping load from the Tk loop (joining it here would freeze the window)."""
+        if self._mappings_thread.is_alive():
+            self.after(LOG_DRAIN_MS, lambda: self._submit_when_loaded(paths, options))
+        else:
+            self._submit_paths(paths, options)
+    def _submit_paths(self, paths, options):
+        if not self.queue.active():
+            self._clear_log()
+            self.set_progress(0.0)
+        for path in paths:
+            try:
+                job = self.queue.submit(path, log_path=new_log_path(path), **options)
+            except OSError:
+                job = self.queue.submit(path, **options)
+            self._batch.append(job)
+            self._add_job_row(job)
+            self.ui_log(f"{now_str()} — Queued {path} -> {job.out_zip}")
+def main():
+    """Open the MewUpdater window on a drag-and-drop capable root when tkinterdnd2 is installed."""
+    try:
+        from tkinterdnd2 import TkinterDnD, DND_FILES
+        dnd_available = True
+        root = TkinterDnD.Tk()
+    except Exception:
+        import tkinter as tk
+        dnd_available = False
+        root = tk.Tk()
+    ctk.set_appearance_mode("system")
+    ctk.set_default_color_theme("dark-blue")
+    app = MewApp(master=root)
+    if dnd_available:
+        def handle_drop(event):
+            raw = event.data
+            if not raw:
+                app.ui_log(f"{now_str()} — Drag & drop received empty data.")
+                return
+            raw = raw.strip()
+            files = []
+            temp = ""
+            depth = 0
+            for ch in raw:
+                if ch == "{":
+                    depth += 1
+                    if depth == 1:
+                        temp = ""
+                        continue
+                elif ch == "}":
+                    depth -= 1
+                    if depth == 0:
+                        files.append(temp)
+                        continue
+                if depth > 0:
+                    temp += ch
+            if not files:
+                files = raw.split()
+            first_file = files[0] if files else None
+            if not first_file:
+                app.ui_log(f"{now_str()} — Failed to parse DnD data: {event.data}")
+                return
+            packs = collect_pack_inputs(files)
+            if len(packs) > 1:
+                app.ui_log(f"{now_str()} — Dropped {len(packs)} packs; queueing them all")
+                app.queue_paths(packs)
+                return
+            app.ui_log(f"{now_str()} — Dropped file detected: {first_file}")
+            app.path_var.set(first_file)
+            app.detect_pack(first_file)
+        root.drop_target_register(DND_FILES)
+        root.dnd_bind("<<Drop>>", handle_drop)
+        app.ui_log(f"{now_str()} — Drag & Drop enabled (tkinterdnd2).")
+    else:
+        app.ui_log(f"{now_str()} — tkinterdnd2 not installed. Run: pip install tkinterdnd2")
+    root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+from io import BytesIO
+import pytest
+from PIL import Image
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+def png(size=(64, 32), color=(200, 40, 40, 255)):
+    buf = BytesIO()
+    Image.new("RGBA", size, color).save(buf, "PNG")
+    return buf.getvalue()
+def write_files(root, files):
+    for rel, data in files.items():
+        full = os.path.join(root, rel.replace("/", os.sep))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "wb") as f:
+            f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+    return str(root)
+@pytest.fixture(scope="session")
+def mappings():
+    import MewUpdater
+    return MewUpdater.load_slicer_mappings(MewUpdater.SLICER_TXT)
+def zip_members(path):
+    """{name: bytes} of every member of a zip."""
+    import zipfile
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+def zip_folder(root, out):
+    import zipfile
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
+        for folder, _, files in sorted(os.walk(root)):
+            for name in sorted(files):
+                full = os.path.join(folder, name)
+                z.write(full, os.path.relpath(full, root).replace(os.sep, "/"))
+    return str(out)
+CONVERT_OPTIONS = {"sprite_cache": False, "write_report": False, "reproducible": True, "slice_workers": 2, "json_workers": 1,
+                   "zip_workers": 2}
+def convert(src, out, mappings, **options):
+    """convert_pack with small, deterministic defaults; fails the test if the conversion does."""
+    import MewUpdater
+    summary = MewUpdater.convert_pack(src, str(out), mappings=mappings, **{**CONVERT_OPTIONS, **options})
+    assert summary["ok"], summary.get("error")
+    return summary
+@pytest.fixture
+def small_pack(tmp_path):
+    """A pack folder with armor layers, a trim, an armor-referencing model and a GUI texture in two namespaces."""
+    root = tmp_path / "pack"
+    return write_files(root, {
+        "pack.mcmeta": json.dumps({"pack": {"pack_format": 15, "description": "test"}}),
+        "assets/minecraft/textures/models/armor/diamond_layer_1.png": png(),
+        "assets/minecraft/textures/models/armor/diamond_layer_2.png": png(color=(10, 200, 10, 255)),
+        "assets/minecraft/textures/trims/models/armor/coast.png": png(),
+        "assets/minecraft/textures/gui/widgets.png": png((256, 256)),
+        "assets/minecraft/models/item/diamond_helmet.json": json.dumps({"textures": {"layer0": "minecraft:models/armor/diamond_layer_1"}}),
+        "assets/mymod/textures/models/armor/steel_layer_1.png": png(color=(90, 90, 90, 255)),
+        "assets/mymod/models/item/steel_helmet.json": json.dumps({"textures": {"layer0": "mymod:models/armor/steel_layer_1"}}),
+    })
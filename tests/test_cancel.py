@@ -0,0 +1,52 @@
+import glob
+import os
+import tempfile
+import threading
+import pytest
+from conftest import convert, zip_folder, zip_members
+import MewUpdater as M
+def workdirs():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), M.WORKDIR_PREFIX + "*")))
+@pytest.mark.parametrize("source", ["zip", "folder"])
+@pytest.mark.parametrize("stream", [True, False])
+@pytest.mark.parametrize("at", [1, 10, "zip"])
+def test_cancel_leaves_the_previous_output_untouched(small_pack, mappings, tmp_path, source, stream, at):
+    src = zip_folder(small_pack, tmp_path / "in.zip") if source == "zip" else small_pack
+    out = tmp_path / "out.zip"
+    out.write_bytes(b"previous")
+    before = workdirs()
+    token = M.CancelToken()
+    steps = []
+    def progress(value):
+        steps.append(value)
+        if len(steps) == at:
+            token.cancel()
+    def log(msg):
+        if at == "zip" and ("Streaming" in msg or "Zipping" in msg):
+            token.cancel()
+    summary = M.convert_pack(src, str(out), mappings=mappings, stream=stream, ui_log_fn=log, ui_progress_set=progress,
+                             cancel=token, sprite_cache=False, incremental=True)
+    assert not summary["ok"] and summary["cancelled"]
+    assert out.read_bytes() == b"previous"
+    assert not os.path.exists(str(out) + ".part")
+    assert not os.path.exists(M.report_path_for(str(out)))
+    assert workdirs() == before
+def test_pause_then_resume_finishes_the_conversion(small_pack, mappings, tmp_path):
+    token = M.CancelToken()
+    def progress(value):
+        if not token.paused and not hasattr(progress, "done"):
+            progress.done = True
+            token.pause()
+            threading.Timer(0.2, token.resume).start()
+    convert(small_pack, tmp_path / "paused.zip", mappings, ui_progress_set=progress, cancel=token)
+    convert(small_pack, tmp_path / "plain.zip", mappings)
+    assert zip_members(tmp_path / "paused.zip") == zip_members(tmp_path / "plain.zip")
+def test_cancel_wakes_a_paused_conversion(small_pack, mappings, tmp_path):
+    token = M.CancelToken()
+    def progress(value):
+        if not token.paused and not token.cancelled:
+            token.pause()
+            threading.Timer(0.2, token.cancel).start()
+    summary = M.convert_pack(small_pack, str(tmp_path / "out.zip"), mappings=mappings, ui_progress_set=progress, cancel=token,
+                             sprite_cache=False, write_report=False)
+    assert summary["cancelled"] and not (tmp_path / "out.zip").exists()
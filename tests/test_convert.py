@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+import pytest
+from conftest import convert, png, write_files, zip_folder, zip_members
+def test_conversion_output(small_pack, mappings, tmp_path):
+    summary = convert(small_pack, tmp_path / "out.zip", mappings)
+    assert summary["counts"]["unresolved_refs"] == 0
+    members = zip_members(tmp_path / "out.zip")
+    assert "assets/minecraft/textures/entity/equipment/humanoid/diamond.png" in members
+    assert "assets/minecraft/textures/entity/equipment/humanoid_leggings/diamond.png" in members
+    assert "assets/minecraft/textures/trims/entity/humanoid/coast.png" in members
+    assert "assets/mymod/textures/entity/equipment/humanoid/steel.png" in members
+    assert json.loads(members["assets/mymod/models/item/steel_helmet.json"])["textures"]["layer0"] == "mymod:entity/equipment/humanoid/steel"
+    assert any(name.startswith("assets/minecraft/textures/gui/sprites/") for name in members)
+    assert json.loads(members["pack.mcmeta"])["pack"]["pack_format"] == 64
+@pytest.mark.parametrize("source", ["zip", "folder"])
+def test_stream_matches_no_stream(small_pack, mappings, tmp_path, source):
+    src = zip_folder(small_pack, tmp_path / "in.zip") if source == "zip" else small_pack
+    convert(src, tmp_path / "stream.zip", mappings, stream=True)
+    convert(src, tmp_path / "extract.zip", mappings, stream=False)
+    streamed, extracted = zip_members(tmp_path / "stream.zip"), zip_members(tmp_path / "extract.zip")
+    # Only a real folder gets empty skeleton dirs (they never reach the zip), so only its changelog lists them.
+    extracted["mewupdater_changelog.txt"] = b"".join(line for line in extracted["mewupdater_changelog.txt"].splitlines(True)
+                                                     if not line.startswith(b"Created dir: "))
+    assert streamed == extracted
+def test_reproducible_output_is_byte_identical(small_pack, mappings, tmp_path):
+    src = zip_folder(small_pack, tmp_path / "in.zip")
+    convert(src, tmp_path / "a.zip", mappings, zip_workers=1)
+    convert(src, tmp_path / "b.zip", mappings, zip_workers=4)
+    assert (tmp_path / "a.zip").read_bytes() == (tmp_path / "b.zip").read_bytes()
+def test_incremental_matches_a_full_conversion(small_pack, mappings, tmp_path):
+    out = tmp_path / "inc.zip"
+    convert(small_pack, out, mappings)
+    write_files(small_pack, {
+        "assets/minecraft/models/item/diamond_chestplate.json": json.dumps({"textures": {"layer0": "minecraft:models/armor/diamond_layer_2"}}),
+        "assets/minecraft/textures/models/armor/diamond_layer_1.png": png(color=(1, 2, 3, 255)),
+    })
+    summary = convert(small_pack, out, mappings, incremental=True)
+    assert summary["counts"]["reused"] > 0
+    convert(small_pack, tmp_path / "full.zip", mappings)
+    incremental, full = zip_members(out), zip_members(tmp_path / "full.zip")
+    # The changelog lists what was reused; everything else, the manifest included, must match.
+    incremental.pop("mewupdater_changelog.txt")
+    full.pop("mewupdater_changelog.txt")
+    assert incremental == full
+def test_no_stream_leaves_the_source_folder_alone(small_pack, mappings, tmp_path):
+    # The work copy is hardlinked to the source, so a write through a linked twin would change the user's file.
+    write_files(small_pack, {"assets/minecraft/textures/entity/equipment/humanoid/diamond.png": png(color=(9, 9, 9, 255))})
+    def contents():
+        return {p: p.read_bytes() for p in sorted(Path(small_pack).rglob("*")) if p.is_file()}
+    before = contents()
+    convert(small_pack, tmp_path / "out.zip", mappings, stream=False)
+    assert contents() == before
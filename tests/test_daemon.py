@@ -0,0 +1,64 @@
+import json
+import threading
+import http.client
+import pytest
+from conftest import zip_folder
+MewDaemon = pytest.importorskip("MewDaemon")
+@pytest.fixture
+def daemon():
+    d = MewDaemon.ConversionDaemon(port=0, limit=1, sprite_cache=False, json_workers=1)
+    thread = threading.Thread(target=d.serve_forever, daemon=True)
+    thread.start()
+    yield d
+    d.shutdown()
+    thread.join(10)
+def request(d, method, path, body=None, **headers):
+    headers = {"Authorization": f"Bearer {d.token}", "Content-Type": "application/json", **headers}
+    conn = http.client.HTTPConnection(*d.address, timeout=30)
+    conn.request(method, path, None if body is None else json.dumps(body), {k: v for k, v in headers.items() if v is not None})
+    resp = conn.getresponse()
+    data = resp.read()
+    conn.close()
+    return resp.status, data
+def test_token_is_generated_and_required(daemon):
+    assert len(daemon.token) >= 24
+    assert request(daemon, "GET", "/health")[0] == 200
+    assert request(daemon, "GET", "/health", Authorization=None)[0] == 401
+    assert request(daemon, "GET", "/health", Authorization="Bearer wrong")[0] == 401
+def test_browser_requests_are_refused(daemon, small_pack, tmp_path):
+    victim = tmp_path / "victim.txt"
+    victim.write_text("keep")
+    job = {"input": small_pack, "output": str(victim)}
+    assert request(daemon, "POST", "/jobs", job, Origin="http://evil.example")[0] == 403
+    assert request(daemon, "POST", "/jobs", job, Host="evil.example")[0] == 403
+    assert request(daemon, "POST", "/jobs", job, Host=f"evil.example:{daemon.address[1]}")[0] == 403
+    assert request(daemon, "POST", "/jobs", job, **{"Content-Type": "text/plain"})[0] == 415
+    assert request(daemon, "GET", "/health", Host=f"localhost:{daemon.address[1]}")[0] == 200
+    assert victim.read_text() == "keep"
+@pytest.mark.parametrize("body, message", [
+    ({}, '"input"'),
+    ({"input": "/no/such/pack.zip"}, "does not exist"),
+    ({"input": "{pack}", "options": {"bogus": True}}, "unknown option"),
+    ({"input": "{pack}", "options": {"zip_level": True}}, "must be int"),
+    ({"input": "{pack}", "options": {"zip_level": 12}}, "0-9"),
+    ({"input": "{pack}", "output": "{tmp}/missing/out.zip"}, "is not a folder"),
+    ({"input": "{pack}", "output": "{tmp}/victim.txt"}, "refusing to replace"),
+])
+def test_submit_validation(daemon, small_pack, tmp_path, body, message):
+    (tmp_path / "victim.txt").write_text("keep")
+    body = json.loads(json.dumps(body).replace("{pack}", small_pack).replace("{tmp}", str(tmp_path)))
+    status, data = request(daemon, "POST", "/jobs", body)
+    assert status == 400 and message in json.loads(data)["error"]
+    assert (tmp_path / "victim.txt").read_text() == "keep"
+def test_job_runs_and_may_replace_a_previous_output(daemon, small_pack, tmp_path):
+    src = zip_folder(small_pack, tmp_path / "in.zip")
+    out = tmp_path / "in-mewupdated.zip"
+    for _ in range(2):
+        status, data = request(daemon, "POST", "/jobs", {"input": src, "output": str(out), "options": {"write_report": False}})
+        assert status == 201
+        job = json.loads(data)
+        status, data = request(daemon, "GET", f"/jobs/{job['id']}/events")
+        events = [json.loads(line) for line in data.splitlines()]
+        assert events[0]["status"] == "queued" and events[-1]["type"] == "done"
+        assert events[-1]["summary"]["ok"], events[-1]["summary"]
+    assert MewDaemon.previous_output_zip(str(out))
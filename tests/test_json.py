@@ -0,0 +1,34 @@
+import json
+from conftest import write_files
+import MewUpdater as M
+def test_rewrite_keeps_formatting_and_handles_escapes():
+    data = b'{\n  "textures": {"layer0": "minecraft:models/armor/iron_layer_1",  "x": "keep_layer_1_me"}\n}'
+    new, n = M.rewrite_json_refs(data)
+    assert n == 1
+    assert new == data.replace(b"models/armor/iron_layer_1", b"entity/equipment/humanoid/iron")
+    new, n = M.rewrite_json_refs(b'{"a": "models\\/armor\\/gold_layer_2"}')
+    assert n == 1 and json.loads(new) == {"a": "entity/equipment/humanoid_leggings/gold"}
+    assert M.rewrite_json_refs(b'{"parent": "block/cube_all"}') == (None, 0)
+def test_process_pool_matches_in_process_rewrite(tmp_path, monkeypatch):
+    files = {}
+    for ns in ("minecraft", "mymod"):
+        for d in M.JSON_REF_DIRS:
+            for i in range(3):
+                files[f"assets/{ns}/{d}/f{i}.json"] = json.dumps({"layer0": f"{ns}:models/armor/m{i}_layer_{i % 2 + 1}"})
+        files[f"assets/{ns}/models/item/plain.json"] = '{"parent": "item/generated"}'
+        files[f"assets/{ns}/models/item/broken_layer_1.json"] = '{"layer0": "models/armor/x_layer_1"'
+    root = write_files(tmp_path / "pack", files)
+    monkeypatch.setattr(M, "JSON_POOL_THRESHOLD", 4)
+    monkeypatch.setattr(M, "JSON_POOL_CHUNK", 3)
+    pools = []
+    real_pool = M.json_process_pool
+    monkeypatch.setattr(M, "json_process_pool", lambda workers: pools.append(workers) or real_pool(workers))
+    def rewrites(workers):
+        plan = M.plan_model_json(M.DirPack(root), workers=workers)
+        return {op.dst: op.data[:2] for op in plan.ops if op is not None}
+    pooled = rewrites(2)
+    assert pools == [2]
+    assert pooled == rewrites(1)
+    assert pools == [2]
+    assert len(pooled) == 2 * 3 * len(M.JSON_REF_DIRS)
+    assert json.loads(pooled["assets/mymod/items/f1.json"][0]) == {"layer0": "mymod:entity/equipment/humanoid_leggings/m1"}
@@ -0,0 +1,24 @@
+import os
+import time
+import MewUpdater as M
+def test_prune_logs_keeps_newest_and_drops_old(tmp_path):
+    now = time.time()
+    for i in range(6):
+        p = tmp_path / f"{i}.log"
+        p.write_text("x")
+        os.utime(p, (now - i, now - i))
+    old = tmp_path / "old.log"
+    old.write_text("x")
+    os.utime(old, (now - 30 * 86400,) * 2)
+    (tmp_path / "notes.txt").write_text("x")
+    assert M.prune_logs(str(tmp_path), keep=4, max_age=86400) == 3
+    assert sorted(os.listdir(tmp_path)) == ["0.log", "1.log", "2.log", "3.log", "notes.txt"]
+def test_new_log_path_prunes_the_log_folder(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEWUPDATER_CONFIG_DIR", str(tmp_path))
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for i in range(M.LOG_KEEP_FILES + 5):
+        (logs / f"{i:04d}.log").write_text("x")
+    path = M.new_log_path("/packs/a.zip")
+    assert os.path.dirname(path) == str(logs)
+    assert len(os.listdir(logs)) == M.LOG_KEEP_FILES - 1
@@ -0,0 +1,42 @@
+import os
+import pytest
+from conftest import png, write_files, zip_folder, zip_members
+import MewUpdater as M
+def test_superseded_move_still_removes_its_source():
+    plan = M.UpdatePlan()
+    plan.add(M.PlanOp("move", "a.png", "out.png", stage="armor"))
+    plan.add(M.PlanOp("move", "b.png", "out.png", stage="armor"))
+    ops = [op for op in plan.ops if op is not None]
+    assert [(op.kind, op.src, op.dst) for op in ops] == [("delete", "a.png", None), ("move", "b.png", "out.png")]
+    assert plan.dropped == 1
+    assert plan.files_to_modify() == 3
+    assert "D a.png" in plan.diff(M.DirPack("."))
+def test_replanned_move_of_the_same_source_is_dropped():
+    plan = M.UpdatePlan()
+    plan.add(M.PlanOp("move", "a.png", "out.png", stage="armor"))
+    plan.add(M.PlanOp("move", "a.png", "out.png", stage="armor"))
+    assert [(op.kind, op.src) for op in plan.ops if op is not None] == [("move", "a.png")]
+def test_replace_originals_removes_both_colliding_sources(tmp_path):
+    root = write_files(tmp_path / "pack", {
+        "assets/minecraft/textures/models/armor/iron_layer_1.png": png(color=(1, 1, 1, 255)),
+        "assets/minecraft/textures/models/old/iron_layer_1.png": png(color=(2, 2, 2, 255)),
+    })
+    plan = M.plan_relocations(root, copy_only=False)
+    kinds = sorted(op.kind for op in plan.ops if op is not None)
+    assert kinds == ["delete", "move"]
+    M.run_full_update(root, lambda msg: None, lambda v: None, replace_originals=True, validate=False)
+    textures = os.path.join(root, "assets", "minecraft", "textures")
+    assert os.path.isfile(os.path.join(textures, "entity", "equipment", "humanoid", "iron.png"))
+    assert not os.path.exists(os.path.join(textures, "models", "armor", "iron_layer_1.png"))
+    assert not os.path.exists(os.path.join(textures, "models", "old", "iron_layer_1.png"))
+@pytest.mark.parametrize("replace_originals", [False, True])
+def test_dry_run_counts_match_the_conversion(small_pack, mappings, tmp_path, replace_originals):
+    summary, diff = M.dry_run(small_pack, mappings, replace_originals, json_workers=1)
+    before = zip_members(zip_folder(small_pack, tmp_path / "in.zip"))
+    M.convert_pack(small_pack, str(tmp_path / "out.zip"), mappings=mappings, replace_originals=replace_originals,
+                   json_workers=1, sprite_cache=False, write_report=False)
+    after = zip_members(tmp_path / "out.zip")
+    changed = {name for name in set(before) | set(after) if before.get(name) != after.get(name)}
+    # "R src -> dst" touches two paths, every other line one.
+    assert {path for line in diff for path in line.split("  (")[0].split()[1:] if path != "->"} == changed
+    assert summary["files_to_modify"] == len(changed)
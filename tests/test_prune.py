@@ -0,0 +1,45 @@
+import zipfile
+from io import BytesIO
+from PIL import Image
+from conftest import convert, write_files, zip_members
+import MewUpdater as M
+def widgets_png():
+    """Opaque only in the top rows, so the hotbar sprites are kept and most buttons are empty."""
+    img = Image.new("RGBA", (256, 256))
+    img.paste((90, 60, 30, 255), (0, 0, 256, 46))
+    buf = BytesIO()
+    img.save(buf, "PNG")
+    return img, buf.getvalue()
+def test_pruner_counts_empty_and_shared_sprites(small_pack, mappings, tmp_path):
+    img, data = widgets_png()
+    write_files(small_pack, {"assets/minecraft/textures/gui/widgets.png": data})
+    pack = M.DirPack(small_pack)
+    crops = [(out_path, img.crop(M.slicer_crop_box(256, 256, box))) for in_path, outs in mappings.items()
+             if M.find_slicer_input(pack, in_path) for out_path, box, _ in outs]
+    empty = {out_path for out_path, crop in crops if crop.getchannel("A").getbbox() is None}
+    digests = [M.sprite_digest(crop) for out_path, crop in crops if out_path not in empty]
+    assert empty and len(set(digests)) < len(digests)
+    summary = convert(small_pack, tmp_path / "pruned.zip", mappings, prune_sprites=True)
+    counters = summary["report"]["counters"]
+    assert counters["sprites_empty"] == len(empty) == summary["counts"]["sprites_dropped"]
+    assert counters["sprites_shared"] == len(digests) - len(set(digests))
+    assert counters["images_encoded"] == len(set(digests))
+    assert summary["counts"]["missing_slicer_outputs"] == 0
+    pruned = zip_members(tmp_path / "pruned.zip")
+    assert not empty & set(pruned) and not {p + ".mcmeta" for p in empty} & set(pruned)
+    convert(small_pack, tmp_path / "plain.zip", mappings)
+    plain = zip_members(tmp_path / "plain.zip")
+    assert all(plain[name] == body for name, body in pruned.items() if name not in ("pack.mcmeta", "mewupdater_changelog.txt"))
+def test_pruner_drops_sprites_equal_to_vanilla(small_pack, mappings, tmp_path):
+    _, data = widgets_png()
+    write_files(small_pack, {"assets/minecraft/textures/gui/widgets.png": data})
+    convert(small_pack, tmp_path / "plain.zip", mappings)
+    vanilla = tmp_path / "vanilla"
+    with zipfile.ZipFile(tmp_path / "plain.zip") as z:
+        z.extractall(vanilla)
+    summary = convert(small_pack, tmp_path / "pruned.zip", mappings, prune_sprites=True, vanilla_assets=str(vanilla))
+    counters = summary["report"]["counters"]
+    sprites = {name for name in zip_members(tmp_path / "plain.zip") if "/gui/sprites/" in name and name.endswith(".png")}
+    assert counters["sprites_empty"] + counters["sprites_vanilla"] == len(sprites)
+    assert counters["sprite_bytes_saved"] > 0
+    assert not sprites & set(zip_members(tmp_path / "pruned.zip"))
@@ -0,0 +1,62 @@
+import os
+import re
+import itertools
+import MewUpdater as M
+# The per-file checks RELOCATION_RULES replaced, kept verbatim as the reference.
+OLD_LAYER_1_RE = re.compile(r"(?P<mat>.+?)_layer_1(\.png)$", re.IGNORECASE)
+OLD_LAYER_2_RE = re.compile(r"(?P<mat>.+?)_layer_2(\.png)$", re.IGNORECASE)
+OLD_LEATHER_OVERLAY_RE = re.compile(r"leather_layer_(?P<n>[12])_overlay(\.png)$", re.IGNORECASE)
+def old_armor_destination(fn, parent):
+    lower = fn.lower()
+    m1 = OLD_LAYER_1_RE.match(fn)
+    m2 = OLD_LAYER_2_RE.match(fn)
+    m3 = OLD_LEATHER_OVERLAY_RE.match(fn)
+    if m1:
+        return f"entity/equipment/humanoid/{m1.group('mat')}.png"
+    if m2:
+        return f"entity/equipment/humanoid_leggings/{m2.group('mat')}.png"
+    if m3:
+        if m3.group("n") == "1":
+            return "entity/equipment/humanoid/leather_overlay.png"
+        return "entity/equipment/humanoid_leggings/leather_overlay.png"
+    if lower in ("wolf_armor.png", "wolf_armor_overlay.png"):
+        base = "armadillo_scute" if "overlay" not in lower else "armadillo_scute_overlay"
+        return f"entity/equipment/wolf_body/{base}.png"
+    if lower.startswith("turtle_layer_1"):
+        return "entity/equipment/turtle_scute.png"
+    if "llama" in lower and ("decor" in lower or "decor" in parent.lower()):
+        return f"entity/equipment/llama_body/{fn}"
+    if "horse" in lower and "armor" in lower:
+        return f"entity/equipment/horse_body/{fn}"
+    if lower == "elytra.png" or lower.endswith("elytra.png"):
+        return "entity/equipment/wings/elytra.png"
+    return None
+def old_relocation(rel):
+    """
+    (stage, destination) the old plan_trims/plan_armor_textures gave a path under textures/. A file directly in
+    trims/models/armor/ got its trims op there and could get an armor op as well; the table keeps only the first.
+    """
+    trims = "trims/models/armor/"
+    if rel.startswith(trims) and "/" not in rel[len(trims):]:
+        fn = rel[len(trims):]
+        if "_leggings" in fn:
+            return "trims", "trims/entity/humanoid_leggings/" + fn.replace("_leggings", "")
+        return "trims", "trims/entity/humanoid/" + fn
+    parent, fn = os.path.split(rel)
+    dst = old_armor_destination(fn, os.path.basename(parent))
+    return None if dst is None else ("armor", dst)
+PARENTS = ["", "models/armor/", "models/armor/sub/", "entity/", "entity/llama/decor/", "entity/Decor/", "trims/models/armor/",
+           "trims/models/armor/deep/", "gui/", "block/"]
+NAMES = ["diamond_layer_1.png", "Iron_Layer_2.PNG", "leather_layer_1_overlay.png", "leather_layer_2_overlay.png",
+         "wolf_armor.png", "WOLF_ARMOR_OVERLAY.png", "turtle_layer_1.png", "turtle_layer_1_old.png", "blue_llama.png",
+         "llama_decor_red.png", "decor_llama.png", "horse_armor_gold.png", "armor_HORSE.png", "elytra.png", "my_elytra.png",
+         "coast.png", "coast_leggings.png", "stone.png", "layer_1.png", "a_layer_1.png.mcmeta", "x_layer_3.png"]
+def test_matcher_agrees_with_the_old_rules():
+    for parent, name in itertools.product(PARENTS, NAMES):
+        rel = parent + name
+        assert M.RELOCATIONS.match(rel) == old_relocation(rel), rel
+def test_relocation_for_stays_in_its_namespace():
+    assert M.relocation_for("assets/mymod/textures/models/armor/steel_layer_1.png") == \
+        ("armor", "assets/mymod/textures/entity/equipment/humanoid/steel.png")
+    assert M.relocation_for("assets/mymod/models/armor/steel_layer_1.png") is None
+    assert M.relocation_for("assets/minecraft/textures/block/stone.png") is None
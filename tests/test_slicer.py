@@ -0,0 +1,56 @@
+import shutil
+import threading
+from io import BytesIO
+from PIL import Image
+from conftest import png, write_files
+import MewUpdater as M
+def test_slicer_cache_is_reused_until_slicer_txt_changes(tmp_path):
+    slicer = tmp_path / "slicer.txt"
+    shutil.copy(M.SLICER_TXT, slicer)
+    cache = tmp_path / "cache"
+    parsed, info = M.load_slicer_mappings_cached(str(slicer), str(cache))
+    assert info["source"] == "parsed" and parsed == M.load_slicer_mappings(str(slicer))
+    cached, info = M.load_slicer_mappings_cached(str(slicer), str(cache))
+    assert info["source"] == "cache" and cached == parsed
+    slicer.write_text(slicer.read_text(encoding="utf-8") + "\n// edited\n", encoding="utf-8")
+    _, info = M.load_slicer_mappings_cached(str(slicer), str(cache))
+    assert info["source"] == "parsed"
+    (cache / "slicer_cache.json").write_text("{not json", encoding="utf-8")
+    recovered, info = M.load_slicer_mappings_cached(str(slicer), str(cache))
+    assert info["source"] == "parsed" and recovered == parsed
+class TrackingBudget(M.PixelBudget):
+    """A PixelBudget that remembers the most units held at once."""
+    def __init__(self, max_pixels):
+        super().__init__(max_pixels)
+        self.held = self.peak = 0
+        self._count = threading.Lock()
+    def acquire(self, pixels):
+        units = super().acquire(pixels)
+        with self._count:
+            self.held += units
+            self.peak = max(self.peak, self.held)
+        return units
+    def release(self, units):
+        with self._count:
+            self.held -= units
+        super().release(units)
+def test_hd_slicing_stays_within_the_pixel_budget(tmp_path, mappings):
+    gui = "assets/minecraft/textures/gui/"
+    palette = Image.new("RGBA", (1024, 1024), (30, 160, 90, 255)).convert("P")
+    buf = BytesIO()
+    palette.save(buf, "PNG")
+    files = {gui + name: png((1024, 1024), (40 * i, 80, 120, 255)) for i, name in enumerate(("widgets.png", "bars.png", "spectator_widgets.png"))}
+    files[gui + "icons.png"] = buf.getvalue()
+    root = write_files(tmp_path / "hd", files)
+    def slice_with(budget):
+        pack = M.OverlayPack(root)
+        assert M.apply_slicer_mappings(pack, mappings, [], lambda: None, workers=4, budget=budget) > 0
+        return {rel: pack.read(rel) for rel in pack.overlay}
+    budget = TrackingBudget(2 * M.PIXEL_BUDGET_UNIT)
+    bounded = slice_with(budget)
+    assert 1 <= budget.peak <= 2 and budget.held == 0
+    assert bounded == slice_with(M.PixelBudget(1 << 40))
+    # A palette input is cropped in its own mode; the sprite must equal a crop of the RGBA image.
+    out_path, box, _ = mappings[gui + "icons.png"][0]
+    expected = palette.convert("RGBA").crop(M.slicer_crop_box(1024, 1024, box))
+    assert Image.open(BytesIO(bounded[out_path])).convert("RGBA").tobytes() == expected.tobytes()
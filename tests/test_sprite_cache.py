@@ -0,0 +1,33 @@
+import os
+from conftest import convert, png, write_files, zip_members
+import MewUpdater as M
+def test_second_conversion_is_served_from_the_cache(small_pack, mappings, tmp_path):
+    cache = M.SpriteCache(str(tmp_path / "cache"))
+    first = convert(small_pack, tmp_path / "a.zip", mappings, sprite_cache=cache)["report"]["counters"]
+    second = convert(small_pack, tmp_path / "b.zip", mappings, sprite_cache=cache)["report"]["counters"]
+    assert first["sprite_cache_hits"] == 0 and first["images_encoded"] > 0
+    assert second["sprite_cache_hits"] == first["images_encoded"] and second["images_encoded"] == 0
+    convert(small_pack, tmp_path / "c.zip", mappings, sprite_cache=False)
+    assert zip_members(tmp_path / "b.zip") == zip_members(tmp_path / "c.zip")
+def test_changed_input_misses_the_cache(small_pack, mappings, tmp_path):
+    cache = M.SpriteCache(str(tmp_path / "cache"))
+    convert(small_pack, tmp_path / "a.zip", mappings, sprite_cache=cache)
+    write_files(small_pack, {"assets/minecraft/textures/gui/widgets.png": png((256, 256), (0, 0, 255, 255))})
+    counters = convert(small_pack, tmp_path / "b.zip", mappings, sprite_cache=cache)["report"]["counters"]
+    assert counters["sprite_cache_hits"] == 0 and counters["images_encoded"] > 0
+def test_trim_evicts_least_recently_used_entries(tmp_path):
+    cache = M.SpriteCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    keys = [cache.key(f"digest{i}", (0, 0, 1, 1, 1, 1)) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, b"x" * 100)
+        cache.put_facts(key, {"empty": False, "digest": str(i)})
+        for ext in (".png", ".json"):
+            path = cache._path(key)[:-len(".png")] + ext
+            os.utime(path, (1000 + i, 1000 + i))
+    # A hit reads both files, which makes entry 0 the most recently used.
+    assert cache.get(keys[0]) == b"x" * 100 and cache.facts(keys[0]) == {"empty": False, "digest": "0"}
+    cache.max_bytes = 2 * (100 + len(b'{"empty": false, "digest": "0"}'))
+    assert cache.trim() > 0
+    assert cache.get(keys[0]) is not None and cache.facts(keys[0]) == {"empty": False, "digest": "0"}
+    assert cache.get(keys[3]) is not None
+    assert cache.get(keys[1]) is None and cache.facts(keys[1]) is None
@@ -0,0 +1,33 @@
+import json
+from conftest import convert, write_files
+import MewUpdater as M
+def test_rewritten_armor_ref_must_resolve(small_pack, mappings):
+    # No netherite layer texture in the pack, so the rewritten reference points at nothing the pack provides.
+    write_files(small_pack, {"assets/minecraft/models/item/netherite_boots.json":
+                             json.dumps({"textures": {"layer0": "minecraft:models/armor/netherite_layer_1"}})})
+    report = M.ConversionReport(small_pack)
+    M.run_full_update(small_pack, lambda msg: None, lambda v: None, mappings=mappings, json_workers=1, report=report)
+    assert report.validation["unresolved"] == [("assets/minecraft/models/item/netherite_boots.json",
+                                                 "minecraft:entity/equipment/humanoid/netherite")]
+def test_validate_reports_what_the_pack_must_provide(tmp_path, mappings):
+    root = write_files(tmp_path / "pack", {
+        "assets/minecraft/models/item/a.json": json.dumps({"parent": "builtin/generated", "textures": {
+            "layer0": "mymod:item/missing", "layer1": "item/stick", "layer2": "#layer0", "layer3": "mymod:item/ok"}}),
+        "assets/minecraft/items/a.json": json.dumps({"model": {"type": "model", "model": "mymod:item/gone"}}),
+        "assets/mymod/textures/item/ok.png": b"",
+        "assets/minecraft/textures/gui/sprites/x.png.mcmeta": "{}",
+        "assets/minecraft/textures/entity/equipment/humanoid/steel.png": b"",
+        "assets/minecraft/textures/entity/equipment/humanoid/iron.png": b"",
+        "assets/minecraft/textures/gui/bars.png": b"",
+    })
+    result = M.validate_pack(root, mappings)
+    assert sorted(result["unresolved"]) == [("assets/minecraft/items/a.json", "mymod:item/gone"),
+                                            ("assets/minecraft/models/item/a.json", "mymod:item/missing")]
+    assert sorted(result["orphaned"]) == ["assets/minecraft/textures/entity/equipment/humanoid/steel.png",
+                                          "assets/minecraft/textures/gui/sprites/x.png.mcmeta"]
+    outputs = mappings["assets/minecraft/textures/gui/bars.png"]
+    assert len(result["missing_slicer_outputs"]) == len(outputs) + sum(1 for _, _, meta in outputs if meta)
+    assert M.cli_main(["validate", root]) == 1
+def test_converted_pack_validates_clean(small_pack, mappings, tmp_path):
+    convert(small_pack, tmp_path / "out.zip", mappings)
+    assert M.cli_main(["validate", str(tmp_path / "out.zip")]) == 0
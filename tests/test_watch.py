@@ -0,0 +1,51 @@
+import json
+import os
+import pytest
+from conftest import convert, png, write_files, zip_members
+import MewUpdater as M
+SKIP = ("pack.mcmeta", "mewupdater_changelog.txt")
+def folder_members(root):
+    found = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            full = os.path.join(folder, name)
+            with open(full, "rb") as f:
+                found[os.path.relpath(full, root).replace(os.sep, "/")] = f.read()
+    return found
+@pytest.mark.parametrize("replace_originals", [False, True])
+def test_watch_refresh_matches_a_full_conversion(small_pack, mappings, tmp_path, replace_originals):
+    watcher = M.PackWatcher(small_pack, str(tmp_path / "live"), mappings, replace_originals, out_zip=str(tmp_path / "live.zip"),
+                            debounce=0, sprite_cache=False)
+    watcher.start()
+    assert watcher.poll() == []
+    mc = "assets/minecraft/"
+    edits = {
+        mc + "textures/gui/widgets.png": png((256, 256), (1, 2, 3, 255)),
+        "assets/mymod/textures/models/armor/steel_layer_1.png": png(color=(7, 7, 7, 255)),
+        mc + "textures/models/armor/gold_layer_2.png": png(color=(200, 200, 0, 255)),
+        mc + "models/item/diamond_helmet.json": json.dumps({"textures": {"layer0": "minecraft:models/armor/gold_layer_2"}}),
+    }
+    write_files(small_pack, edits)
+    for rel in edits:
+        os.utime(os.path.join(small_pack, rel), (1, 1))
+    os.remove(os.path.join(small_pack, mc + "textures/trims/models/armor/coast.png"))
+    assert watcher.poll() == []
+    assert watcher.poll() == sorted([*edits, mc + "textures/trims/models/armor/coast.png"])
+    convert(small_pack, tmp_path / "full.zip", mappings, replace_originals=replace_originals)
+    full = {k: v for k, v in zip_members(tmp_path / "full.zip").items() if k not in SKIP}
+    live = {k: v for k, v in folder_members(tmp_path / "live").items() if k not in SKIP}
+    assert live == full
+    assert {k: v for k, v in zip_members(tmp_path / "live.zip").items() if k not in SKIP} == live
+    assert mc + "textures/trims/entity/humanoid/coast.png" not in live
+def test_deleting_a_slicer_input_removes_its_sprites(small_pack, mappings, tmp_path):
+    watcher = M.PackWatcher(small_pack, str(tmp_path / "live"), mappings, debounce=0, sprite_cache=False)
+    watcher.start()
+    sprites = [rel for rel in folder_members(tmp_path / "live") if "/gui/sprites/" in rel]
+    assert sprites
+    os.remove(os.path.join(small_pack, "assets/minecraft/textures/gui/widgets.png"))
+    watcher.poll()
+    assert watcher.poll() == ["assets/minecraft/textures/gui/widgets.png"]
+    assert not [rel for rel in folder_members(tmp_path / "live") if "/gui/" in rel]
+def test_live_output_must_not_be_inside_the_pack(small_pack, tmp_path):
+    with pytest.raises(ValueError):
+        M.PackWatcher(small_pack, os.path.join(small_pack, "live"))
@@ -0,0 +1,50 @@
+import zipfile
+from conftest import png, write_files
+import MewUpdater as M
+def test_pack_prefix_at_root_and_nested():
+    assert M.zip_pack_prefix(["pack.mcmeta", "assets/minecraft/x.png"]) == ""
+    assert M.zip_pack_prefix(["MyPack/", "MyPack/pack.mcmeta", "MyPack/assets/minecraft/x.png"]) == "MyPack/"
+    assert M.zip_pack_prefix(["a/pack.mcmeta", "b/pack.mcmeta"]) == ""
+def test_pack_prefix_ignores_macos_metadata():
+    names = ["MyPack/pack.mcmeta", "MyPack/assets/minecraft/x.png", "__MACOSX/MyPack/._pack.mcmeta", ".DS_Store"]
+    assert M.zip_pack_prefix(names) == "MyPack/"
+def test_macos_zipped_pack_is_detected(tmp_path):
+    path = tmp_path / "mac.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("MyPack/pack.mcmeta", '{"pack": {"pack_format": 15, "description": "x"}}')
+        z.writestr("MyPack/assets/minecraft/models/item/a.json", "{}")
+        z.writestr("__MACOSX/MyPack/._pack.mcmeta", b"\0\5\26\7")
+    info = M.detect_pack_info(str(path))
+    assert info["pack_format"] == 15 and info["root"] == "MyPack/"
+def test_preview_bounds_the_dry_run(small_pack, mappings):
+    # A JSON without armor references counts toward the bound but is not modified.
+    write_files(small_pack, {"assets/minecraft/models/block/stone.json": '{"parent": "block/cube_all"}'})
+    info = M.detect_pack_info(small_pack, mappings)
+    summary, _ = M.dry_run(small_pack, mappings, json_workers=1)
+    assert info["reference_jsons"] == 3
+    assert summary["files_to_modify"] == info["files_to_modify_max"] - 1
+def test_zip_write_raw_copies_members_byte_for_byte(tmp_path):
+    """zip_write_raw relies on private ZipFile internals; this fails if a Python upgrade changes them."""
+    for name in ("_lock", "_writecheck", "_didModify", "fp", "filelist", "NameToInfo", "start_dir"):
+        with zipfile.ZipFile(tmp_path / "probe.zip", "w") as z:
+            assert hasattr(z, name), name
+    assert callable(getattr(zipfile.ZipInfo, "FileHeader", None))
+    src = tmp_path / "src.zip"
+    with zipfile.ZipFile(src, "w") as z:
+        z.writestr("a.json", b'{"x": 1}' * 100, zipfile.ZIP_DEFLATED)
+        z.writestr("b.png", png(), zipfile.ZIP_STORED)
+        z.writestr("dir/c.txt", b"", zipfile.ZIP_DEFLATED)
+    out = tmp_path / "out.zip"
+    with zipfile.ZipFile(src) as zin, M.ParallelZipWriter(str(out), workers=2) as zout:
+        for info in zin.infolist():
+            zout.copy_raw(zin, info, "copy/" + info.filename)
+        zout.writestr("new.json", b"{}")
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        for info in zin.infolist():
+            copied = z.getinfo("copy/" + info.filename)
+            assert (copied.CRC, copied.compress_type, copied.compress_size) == (info.CRC, info.compress_type, info.compress_size)
+            assert z.read(copied) == zin.read(info)
+            assert M.zip_read_raw(z, copied) == M.zip_read_raw(zin, info)
+            assert M.zip_read_member(z, copied) == zin.read(info)
+        assert z.read("new.json") == b"{}"